@@ -11,17 +11,12 @@ import traceback
 import uuid
 import secrets
 import hashlib
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
 from openai import OpenAI
 from dotenv import load_dotenv
 import fitz  # PyMuPDF
-from docx import Document
-import io
 # from sentence_transformers import SentenceTransformer  # Version précédente
 import ollama  # Version optimisée avec Ollama
-import chromadb
-from chromadb.config import Settings
 import json
 import math
 from collections import Counter
@@ -42,9 +37,21 @@ from providers import (
     AlbertLLM,
 )
 
+# Instances de providers et connexions HTTP partagées entre les requêtes
+from providers.chroma import create_chroma_client
+from providers.http_pool import get_http_client
+from providers.concurrency import PRIORITY_INGESTION, call_priority
+from providers.registry import get_provider_registry
+from providers.token_bucket import MemoryTokenBucket
+
+# Extraction DOCX en flux (texte + références des images en une passe)
+from providers.documents import DocxContent, extract_docx, extract_pdf, generate_table_chunks
+
 # Import des providers vision pour l'analyse d'images
 from providers.vision.albert_vision import AlbertVision
+from providers.vision.vision_cache import get_vision_cache
 from providers.vision.pdf_image_extractor import PDFImageExtractor
+from providers.vision.docx_image_extractor import DOCXImageExtractor
 
 # =============================================================================
 # CONFIGURATION SÉCURITÉ
@@ -64,6 +71,7 @@ MAX_HISTORY_LENGTH = 20  # Nombre maximum d'échanges dans l'historique
 # Répertoire de persistance pour ChromaDB
 PERSIST_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db")
 METADATA_FILE = os.path.join(PERSIST_DIRECTORY, "documents_metadata.json")
+VISION_CACHE_FILE = os.path.join(PERSIST_DIRECTORY, "vision_cache.sqlite3")
 ALLOWED_MIME_TYPES = {
     "application/pdf": ".pdf",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx"
@@ -94,12 +102,12 @@ DANGEROUS_PATTERNS = [
 # =============================================================================
 
 class RateLimiter:
-    """Rate limiter simple basé sur une fenêtre glissante."""
+    """Rate limiter par seau à jetons (coût constant à chaque appel)."""
 
     def __init__(self, max_requests: int = 20, window_seconds: int = 60):
         self.max_requests = max_requests
-        self.window = timedelta(seconds=window_seconds)
-        self.requests = defaultdict(list)
+        # Rafale de max_requests, rechargée au rythme de max_requests par fenêtre
+        self._bucket = MemoryTokenBucket(max_requests, max_requests / window_seconds)
 
     def is_allowed(self, key: str = "default") -> tuple[bool, int]:
         """
@@ -108,22 +116,8 @@ class RateLimiter:
         Returns:
             Tuple (autorisé, secondes_avant_retry)
         """
-        now = datetime.now()
-        window_start = now - self.window
-
-        # Nettoyer les anciennes requêtes
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
-        ]
-
-        if len(self.requests[key]) >= self.max_requests:
-            oldest = min(self.requests[key])
-            retry_after = int((oldest + self.window - now).total_seconds()) + 1
-            return False, max(retry_after, 1)
-
-        self.requests[key].append(now)
-        return True, 0
+        decision = self._bucket.take(key)
+        return decision.allowed, decision.retry_after_seconds
 
 
 # =============================================================================
@@ -264,6 +258,22 @@ EMBEDDING_MODEL = "nomic-embed-text"
 #     return SentenceTransformer(EMBEDDING_MODEL)
 
 
+def get_albert_embedder(api_key: str) -> AlbertEmbeddings:
+    """Retourne le provider d'embeddings Albert partagé pour une clé API."""
+    return get_provider_registry().get(
+        "albert_embeddings", lambda: AlbertEmbeddings(api_key=api_key), api_key=api_key
+    )
+
+
+def get_albert_vision(api_key: str) -> AlbertVision:
+    """Retourne le provider de vision Albert partagé pour une clé API."""
+    return get_provider_registry().get(
+        "albert_vision",
+        lambda: AlbertVision(api_key=api_key, cache=get_vision_cache(VISION_CACHE_FILE)),
+        api_key=api_key,
+    )
+
+
 def get_embedding(text: str) -> list[float]:
     """
     Génère l'embedding d'un texte via le provider sélectionné (Ollama ou Albert).
@@ -284,8 +294,7 @@ def get_embedding(text: str) -> list[float]:
                 st.error("Clé API Albert requise pour les embeddings Albert")
                 raise ValueError("ALBERT_API_KEY non configurée")
 
-            embedder = AlbertEmbeddings(api_key=albert_key)
-            return embedder.embed_query(text)
+            return get_albert_embedder(albert_key).embed_query(text)
         else:
             # Utiliser Ollama (par défaut)
             response = ollama.embeddings(
@@ -314,22 +323,13 @@ def get_embedding_dimension() -> int:
 @st.cache_resource
 def get_chroma_client():
     """
-    Initialise le client ChromaDB persistant (singleton).
+    Initialise le client ChromaDB (singleton).
 
     Returns:
-        Client ChromaDB avec stockage sur disque
+        Client ChromaDB avec stockage sur disque, ou client HTTP du serveur
+        Chroma si CHROMA_SERVER_HOST est défini (base partagée entre processus)
     """
-    # Créer le répertoire de persistance s'il n'existe pas
-    os.makedirs(PERSIST_DIRECTORY, exist_ok=True)
-
-    client = chromadb.PersistentClient(
-        path=PERSIST_DIRECTORY,
-        settings=Settings(
-            anonymized_telemetry=False,
-            allow_reset=True
-        )
-    )
-    return client
+    return create_chroma_client(PERSIST_DIRECTORY)
 
 
 def get_chroma_collection(session_id: str = None):
@@ -434,19 +434,21 @@ def get_client(api_key: str = None):
         key = st.session_state.get("albert_api_key") or os.getenv("ALBERT_API_KEY", "")
         if not key:
             raise ValueError("Clé API Albert non configurée")
-        return OpenAI(
-            api_key=key,
-            base_url="https://albert.api.etalab.gouv.fr/v1"
-        )
+        base_url = "https://albert.api.etalab.gouv.fr/v1"
     else:
         # Utiliser Aristote (par défaut)
         key = api_key or st.session_state.get("api_key") or os.getenv("ARISTOTE_API_KEY", "")
         if not key:
             raise ValueError("Clé API Aristote non configurée")
-        return OpenAI(
-            api_key=key,
-            base_url=os.getenv("ARISTOTE_API_BASE", "https://llm.ilaas.fr/v1")
-        )
+        base_url = os.getenv("ARISTOTE_API_BASE", "https://llm.ilaas.fr/v1")
+
+    # Client réutilisé tant que le provider, l'URL et la clé ne changent pas
+    return get_provider_registry().get(
+        f"{llm_provider}_client",
+        lambda: OpenAI(api_key=key, base_url=base_url, http_client=get_http_client(base_url)),
+        base_url=base_url,
+        api_key=key,
+    )
 
 
 def get_selected_model() -> str:
@@ -600,14 +602,13 @@ def extract_images_from_pdf(
     image_chunks = []
     try:
         # Créer le provider de vision
-        vision = AlbertVision(api_key=albert_key)
+        vision = get_albert_vision(albert_key)
         extractor = PDFImageExtractor(vision_provider=vision)
 
-        # Extraire et analyser les images
-        analyzed_images = extractor.extract_and_analyze_all(file_bytes, max_images)
-
-        # Générer les chunks
-        image_chunks = extractor.generate_image_chunks(analyzed_images, filename)
+        # Extraire, analyser et générer les chunks au fil des pages
+        # (les chunks déjà produits sont conservés en cas d'erreur en cours de route)
+        for chunk in extractor.iter_image_chunks(file_bytes, filename, max_images):
+            image_chunks.append(chunk)
 
         if image_chunks:
             logging.info(f"PDF {filename}: {len(image_chunks)} images analysées")
@@ -619,34 +620,15 @@ def extract_images_from_pdf(
 
 
 def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extrait le texte d'un fichier DOCX, y compris les tableaux."""
-    doc = Document(io.BytesIO(file_bytes))
-    text_parts = []
-
-    # Extraire les paragraphes
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():
-            text_parts.append(paragraph.text)
-
-    # Extraire le contenu des tableaux
-    for table in doc.tables:
-        table_text = []
-        for row in table.rows:
-            row_cells = [cell.text.strip() for cell in row.cells]
-            # Joindre les cellules avec " | " pour garder la structure
-            row_text = " | ".join(row_cells)
-            if row_text.strip():
-                table_text.append(row_text)
-        if table_text:
-            text_parts.append("\n".join(table_text))
-
-    return "\n".join(text_parts)
+    """Extrait le texte d'un fichier DOCX, tableaux compris, dans l'ordre du document."""
+    return extract_docx(file_bytes).text
 
 
 def extract_images_from_docx(
     file_bytes: bytes,
     filename: str,
-    max_images: int = 20
+    max_images: int = 20,
+    docx_content: DocxContent = None,
 ) -> list[dict]:
     """
     Extrait et analyse les images d'un fichier DOCX avec Albert Vision.
@@ -655,6 +637,7 @@ def extract_images_from_docx(
         file_bytes: Contenu du fichier DOCX
         filename: Nom du fichier source
         max_images: Nombre maximum d'images à analyser
+        docx_content: Résultat de extract_docx si déjà calculé (évite une seconde lecture)
 
     Returns:
         Liste de chunks d'images analysées
@@ -673,53 +656,12 @@ def extract_images_from_docx(
     image_chunks = []
     try:
         # Créer le provider de vision
-        vision = AlbertVision(api_key=albert_key)
+        vision = get_albert_vision(albert_key)
+        extractor = DOCXImageExtractor(vision_provider=vision)
 
-        # Ouvrir le document DOCX
-        doc = Document(io.BytesIO(file_bytes))
-
-        # Les images DOCX sont stockées dans les "related parts"
-        image_index = 0
-        for rel in doc.part.rels.values():
-            if "image" in rel.reltype:
-                if image_index >= max_images:
-                    break
-
-                try:
-                    # Récupérer les bytes de l'image
-                    image_part = rel.target_part
-                    image_bytes = image_part.blob
-
-                    # Filtrer les petites images (icônes, logos)
-                    # On ne peut pas facilement obtenir les dimensions sans PIL,
-                    # donc on filtre par taille de fichier (> 5KB)
-                    if len(image_bytes) < 5000:
-                        continue
-
-                    # Analyser l'image avec Albert Vision
-                    description = vision.analyze_image(
-                        image_bytes,
-                        prompt="Décris cette image de document. "
-                               "Est-ce un tableau, un graphique, un schéma ou autre chose ? "
-                               "Extrais les informations importantes."
-                    )
-
-                    # Créer le chunk
-                    image_chunks.append({
-                        "text": f"[IMAGE {image_index + 1} - Document {filename}]\n{description}",
-                        "metadata": {
-                            "filename": filename,
-                            "type": "image",
-                            "is_visual_content": True,
-                            "image_index": image_index,
-                        },
-                    })
-
-                    image_index += 1
-
-                except Exception as img_error:
-                    logging.warning(f"Erreur analyse image DOCX {image_index}: {img_error}")
-                    continue
+        # Images dédoublonnées, filtrées sur leurs dimensions et analysées en parallèle
+        for chunk in extractor.iter_image_chunks(file_bytes, filename, max_images, docx_content):
+            image_chunks.append(chunk)
 
         if image_chunks:
             logging.info(f"DOCX {filename}: {len(image_chunks)} images analysées")
@@ -863,7 +805,7 @@ def create_embeddings(chunks: list[dict]) -> list[dict]:
         if not albert_key:
             raise ValueError("ALBERT_API_KEY non configurée")
 
-        embedder = AlbertEmbeddings(api_key=albert_key)
+        embedder = get_albert_embedder(albert_key)
         texts = [chunk["text"] for chunk in chunks]
 
         # Utiliser embed_documents pour le batch processing
@@ -1479,10 +1421,16 @@ with st.sidebar:
                         file.seek(0)  # Remettre le curseur au début
 
                         # Extraire le texte
+                        docx_content = None
+                        table_chunks = []
                         if file.name.lower().endswith(".pdf"):
-                            text = extract_text_from_pdf(file_bytes)
+                            # Tableaux natifs extraits localement, hors du texte courant
+                            pdf_content = extract_pdf(file_bytes)
+                            text = pdf_content.text
+                            table_chunks = generate_table_chunks(pdf_content.tables, file.name)
                         elif file.name.lower().endswith(".docx"):
-                            text = extract_text_from_docx(file_bytes)
+                            docx_content = extract_docx(file_bytes)
+                            text = docx_content.text
                         else:
                             text = ""
 
@@ -1491,49 +1439,42 @@ with st.sidebar:
                             chunk_size=params["chunk_size"],
                             overlap=params["chunk_overlap"]
                         )
+                        for table_chunk in table_chunks:
+                            table_chunk["id"] = len(chunks)
+                            chunks.append(table_chunk)
 
                     # Extraire et analyser les images si l'option est activée
                     image_chunks = []
                     if params.get("analyze_images", False):
                         max_images = params.get("max_images", 20)
-                        with st.spinner(f"Analyse des images de {file.name}..."):
+                        # Les questions posées pendant l'import restent servies en premier
+                        with st.spinner(f"Analyse des images de {file.name}..."), call_priority(PRIORITY_INGESTION):
                             if file.name.lower().endswith(".pdf"):
                                 image_chunks = extract_images_from_pdf(file_bytes, file.name, max_images)
                             elif file.name.lower().endswith(".docx"):
-                                image_chunks = extract_images_from_docx(file_bytes, file.name, max_images)
+                                image_chunks = extract_images_from_docx(
+                                    file_bytes, file.name, max_images, docx_content=docx_content
+                                )
 
                         if image_chunks:
                             st.info(f"🖼️ {len(image_chunks)} image(s) analysée(s) dans {file.name}")
 
-                    # Créer les embeddings pour les chunks de texte
+                    # Texte et images : un seul lot d'embeddings et une seule écriture
+                    for i, image_chunk in enumerate(image_chunks):
+                        image_chunk["id"] = f"img_{i}"
                     total_chunks = len(chunks) + len(image_chunks)
-                    with st.spinner(f"Création des embeddings ({total_chunks} chunks)..."):
-                        chunks_with_embeddings = create_embeddings(chunks)
-
-                        # Créer les embeddings pour les chunks d'images
-                        if image_chunks:
-                            # Convertir les image_chunks au format attendu par create_embeddings
-                            image_chunks_formatted = [
-                                {"id": f"img_{i}", "text": ic["text"]}
-                                for i, ic in enumerate(image_chunks)
-                            ]
-                            image_chunks_with_embeddings = create_embeddings(image_chunks_formatted)
-
-                            # Restaurer les métadonnées des images
-                            for i, ic in enumerate(image_chunks_with_embeddings):
-                                ic["metadata"] = image_chunks[i]["metadata"]
+                    with st.spinner(f"Création des embeddings ({total_chunks} chunks)..."), call_priority(PRIORITY_INGESTION):
+                        all_chunks = create_embeddings(chunks + image_chunks)
+                        chunks_with_embeddings = all_chunks[:len(chunks)]
+                        image_chunks_with_embeddings = all_chunks[len(chunks):]
 
                     with st.spinner(f"Indexation dans la base vectorielle..."):
-                        add_to_vectorstore(chunks_with_embeddings, file.name)
-
-                        # Indexer aussi les chunks d'images
-                        if image_chunks:
-                            add_to_vectorstore(image_chunks_with_embeddings, f"{file.name}_images")
+                        add_to_vectorstore(all_chunks, file.name)
 
                     st.session_state.documents_text[file.name] = {
                         "text": text,
                         "chunks": chunks_with_embeddings,
-                        "image_chunks": image_chunks_with_embeddings if image_chunks else []
+                        "image_chunks": image_chunks_with_embeddings
                     }
                     # Sauvegarder les métadonnées sur disque
                     save_documents_metadata(st.session_state.documents_text)
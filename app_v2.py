@@ -21,14 +21,11 @@ import traceback
 import uuid
 import secrets
 import hashlib
-from datetime import datetime, timedelta
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from openai import OpenAI
 import fitz  # PyMuPDF
-from docx import Document
-import io
-import chromadb
-from chromadb.config import Settings
 import json
 import math
 from collections import Counter
@@ -79,7 +76,25 @@ load_dev_config()
 from providers.embeddings import OllamaEmbeddings, AlbertEmbeddings
 from providers.llm import AristoteLLM, AlbertLLM
 from providers.rerank import AlbertReranker
-from providers.vision import AlbertVision, PDFImageExtractor, extract_pdf_with_vision
+from providers.vision import (
+    AlbertVision,
+    DOCXImageExtractor,
+    PDFImageExtractor,
+    extract_pdf_with_vision,
+    get_vision_cache,
+)
+from providers.chroma import create_chroma_client, get_server_address
+from providers.http_pool import get_http_client
+from providers.concurrency import PRIORITY_BACKGROUND, PRIORITY_INGESTION, call_priority
+from providers.registry import get_provider_registry
+from providers.token_bucket import MemoryTokenBucket
+from providers.documents import (
+    ArtifactStore,
+    ExtractionArtifact,
+    extract_docx,
+    extract_pdf,
+    generate_table_chunks,
+)
 
 # Essayer d'importer python-magic pour la validation des fichiers
 try:
@@ -104,6 +119,10 @@ MAX_HISTORY_LENGTH = 20
 
 PERSIST_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db_v2")
 METADATA_FILE = os.path.join(PERSIST_DIRECTORY, "documents_metadata.json")
+VISION_CACHE_FILE = os.path.join(PERSIST_DIRECTORY, "vision_cache.sqlite3")
+ARTIFACTS_DIRECTORY = os.path.join(PERSIST_DIRECTORY, "artifacts")
+INDEX_STATS_TTL = 30  # Durée (s) des statistiques en cache : écritures des autres processus
+VISUAL_INDEXING_WORKERS = 1  # Analyses vision en arrière-plan (le débit Albert est partagé)
 ALLOWED_MIME_TYPES = {
     "application/pdf": ".pdf",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx"
@@ -126,6 +145,9 @@ DANGEROUS_PATTERNS = [
     r"(?i)jailbreak",
     r"(?i)DAN\s+mode",
 ]
+# Compilés une fois au démarrage (appliqués à chaque chunk de contexte)
+DANGEROUS_REGEXES = [re.compile(pattern) for pattern in DANGEROUS_PATTERNS]
+PUNCTUATION_REGEX = re.compile(r'[^\w\s]')
 
 # =============================================================================
 # CONFIGURATION DES PROVIDERS
@@ -169,26 +191,15 @@ PROVIDER_CONFIG = {
 # =============================================================================
 
 class RateLimiter:
-    """Rate limiter simple basé sur une fenêtre glissante."""
+    """Rate limiter par seau à jetons (coût constant à chaque appel)."""
 
     def __init__(self, max_requests: int = 20, window_seconds: int = 60):
         self.max_requests = max_requests
-        self.window = timedelta(seconds=window_seconds)
-        self.requests = defaultdict(list)
+        self._bucket = MemoryTokenBucket(max_requests, max_requests / window_seconds)
 
     def is_allowed(self, key: str = "default") -> tuple[bool, int]:
-        now = datetime.now()
-        window_start = now - self.window
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
-        ]
-        if len(self.requests[key]) >= self.max_requests:
-            oldest = min(self.requests[key])
-            retry_after = int((oldest + self.window - now).total_seconds()) + 1
-            return False, max(retry_after, 1)
-        self.requests[key].append(now)
-        return True, 0
+        decision = self._bucket.take(key)
+        return decision.allowed, decision.retry_after_seconds
 
 
 # =============================================================================
@@ -206,8 +217,8 @@ def handle_error(error: Exception, context: str = "") -> str:
 
 def sanitize_document_content(text: str, max_length: int = 2000) -> str:
     sanitized = text
-    for pattern in DANGEROUS_PATTERNS:
-        sanitized = re.sub(pattern, "[CONTENU FILTRÉ]", sanitized)
+    for regex in DANGEROUS_REGEXES:
+        sanitized = regex.sub("[CONTENU FILTRÉ]", sanitized)
     if len(sanitized) > max_length:
         sanitized = sanitized[:max_length] + "... [TRONQUÉ]"
     return sanitized
@@ -267,6 +278,20 @@ def validate_uploaded_file(uploaded_file) -> tuple[bool, str]:
 # GESTION DES PROVIDERS
 # =============================================================================
 
+def build_embedding_provider(provider_type: str, api_key: str = None, model: str = None, base_url: str = None):
+    """Instancie un provider d'embeddings, réutilisé tant que sa configuration ne change pas."""
+    if provider_type == "albert":
+        return get_provider_registry().get(
+            "albert_embeddings", lambda: AlbertEmbeddings(api_key=api_key), api_key=api_key
+        )
+    return get_provider_registry().get(
+        "ollama_embeddings",
+        lambda: OllamaEmbeddings(model=model, base_url=base_url),
+        model=model,
+        base_url=base_url,
+    )
+
+
 def get_embedding_provider():
     """Retourne le provider d'embeddings configuré."""
     config = st.session_state.get("provider_config", PROVIDER_CONFIG)
@@ -277,13 +302,14 @@ def get_embedding_provider():
         if not api_key:
             st.error("Clé API Albert requise pour les embeddings Albert")
             return None
-        return AlbertEmbeddings(api_key=api_key)
+        return build_embedding_provider("albert", api_key=api_key)
     else:
         # Ollama par défaut
         ollama_config = config["embeddings"]["ollama"]
-        return OllamaEmbeddings(
+        return build_embedding_provider(
+            "ollama",
             model=ollama_config["model"],
-            base_url=ollama_config["base_url"]
+            base_url=ollama_config["base_url"],
         )
 
 
@@ -298,7 +324,9 @@ def get_llm_provider():
             st.error("Clé API Albert requise pour le LLM Albert")
             return None
         model = config["llm"]["albert"]["model"]
-        return AlbertLLM(api_key=api_key, model=model)
+        return get_provider_registry().get(
+            "albert_llm", lambda: AlbertLLM(api_key=api_key, model=model), model=model, api_key=api_key
+        )
     else:
         # Aristote par défaut
         api_key = st.session_state.get("aristote_api_key") or os.getenv("ARISTOTE_API_KEY")
@@ -312,7 +340,57 @@ def get_llm_provider():
             st.error("Clé API Aristote requise. Configurez-la dans la sidebar.")
             return None
         model = st.session_state.get("selected_model") or config["llm"]["aristote"]["model"]
-        return AristoteLLM(api_key=api_key, base_url=api_base, model=model)
+        return get_provider_registry().get(
+            "aristote_llm",
+            lambda: AristoteLLM(api_key=api_key, base_url=api_base, model=model),
+            model=model,
+            base_url=api_base,
+            api_key=api_key,
+        )
+
+
+def stream_llm_response(llm, messages: list[dict], placeholder) -> str:
+    """
+    Affiche la réponse du LLM au fil des tokens et l'ajoute à l'historique.
+
+    Si l'exécution est interrompue (bouton « Arrêter » : Streamlit relance le
+    script), le flux est fermé, ce qui coupe la génération côté API, et le
+    texte déjà reçu est conservé dans l'historique.
+
+    Args:
+        llm: Provider LLM (AlbertLLM, AristoteLLM...)
+        messages: Messages de la conversation
+        placeholder: Conteneur st.empty() où afficher la réponse
+
+    Returns:
+        Réponse complète
+    """
+    if not llm.supports_streaming:
+        response = llm.chat(messages, stream=False)
+        placeholder.markdown(response)
+        st.session_state.messages.append({"role": "assistant", "content": response})
+        return response
+
+    placeholder.markdown("_Réflexion en cours..._")
+    stream = llm.chat(messages, stream=True)
+    response = ""
+    completed = False
+    try:
+        for token in stream:
+            response += token
+            placeholder.markdown(response + "▌")
+        completed = True
+    finally:
+        stream.close()
+        if completed:
+            placeholder.markdown(response)
+            st.session_state.messages.append({"role": "assistant", "content": response})
+        elif response:
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": response + "\n\n*⏹️ Génération interrompue*"
+            })
+    return response
 
 
 def get_reranker():
@@ -325,7 +403,10 @@ def get_reranker():
     if not api_key:
         return None
 
-    return AlbertReranker(api_key=api_key, model=config["rerank"]["model"])
+    model = config["rerank"]["model"]
+    return get_provider_registry().get(
+        "albert_rerank", lambda: AlbertReranker(api_key=api_key, model=model), model=model, api_key=api_key
+    )
 
 
 def get_vision_provider():
@@ -338,7 +419,13 @@ def get_vision_provider():
     if not api_key:
         return None
 
-    return AlbertVision(api_key=api_key, model=config["vision"]["model"])
+    model = config["vision"]["model"]
+    return get_provider_registry().get(
+        "albert_vision",
+        lambda: AlbertVision(api_key=api_key, model=model, cache=get_vision_cache(VISION_CACHE_FILE)),
+        model=model,
+        api_key=api_key,
+    )
 
 
 # =============================================================================
@@ -364,15 +451,8 @@ def get_embedding(text: str) -> list[float]:
 
 @st.cache_resource
 def get_chroma_client():
-    os.makedirs(PERSIST_DIRECTORY, exist_ok=True)
-    client = chromadb.PersistentClient(
-        path=PERSIST_DIRECTORY,
-        settings=Settings(
-            anonymized_telemetry=False,
-            allow_reset=True
-        )
-    )
-    return client
+    # Serveur Chroma si CHROMA_SERVER_HOST est défini, base locale sinon
+    return create_chroma_client(PERSIST_DIRECTORY)
 
 
 def get_chroma_collection(session_id: str = None, embedding_provider: str = None):
@@ -409,17 +489,118 @@ def get_collection_for_current_provider():
     return get_chroma_collection(embedding_provider=provider)
 
 
+@st.cache_resource
+def get_catalog_lock() -> threading.Lock:
+    """Verrou du catalogue, partagé avec les tâches d'indexation en arrière-plan."""
+    return threading.Lock()
+
+
+def update_documents_metadata(update, lock: threading.Lock = None) -> dict:
+    """
+    Relit, modifie et réécrit le catalogue sous verrou.
+
+    Les tâches d'arrière-plan modifient le catalogue pendant que l'interface
+    s'exécute : toute écriture repart de la version sur disque.
+
+    Args:
+        update: Fonction modifiant le catalogue (dict) en place
+        lock: Verrou du catalogue (get_catalog_lock() par défaut)
+
+    Returns:
+        Catalogue à jour
+    """
+    with lock or get_catalog_lock():
+        metadata = load_documents_metadata()
+        update(metadata)
+        write_documents_metadata(metadata)
+    return metadata
+
+
 def save_documents_metadata(documents_text: dict):
+    """
+    Met à jour le catalogue des documents avec ceux traités dans la session.
+
+    Les entrées existantes (autres sessions, alias) sont conservées ; la date
+    d'indexation n'est rafraîchie que si le contenu a changé.
+    """
+    def update(metadata: dict):
+        for filename, data in documents_text.items():
+            entry = metadata.get(filename, {})
+            content_hash = data.get("content_hash")
+            if "indexed_at" not in entry or entry.get("content_hash") != content_hash:
+                entry["indexed_at"] = datetime.now().isoformat()
+                # Nouveau contenu : les visuels de l'ancienne version ne comptent plus
+                entry.pop("image_chunks", None)
+                entry.pop("visuals", None)
+            entry["text_length"] = len(data.get("text", ""))
+            entry["chunks_count"] = len(data.get("chunks", [])) + entry.get("image_chunks", 0)
+            entry["content_hash"] = content_hash
+            entry["text_ready"] = True
+            entry.setdefault("aliases", [])
+            metadata[filename] = entry
+
+    update_documents_metadata(update)
+
+
+def supersede_document(filename: str, content_hash: str):
+    """
+    Enregistre la nouvelle version d'un document avant le retrait de l'ancienne.
+
+    Une analyse vision de l'ancienne version vérifie l'empreinte sous le même
+    verrou avant d'ajouter ses chunks : une fois l'empreinte remplacée, elle
+    n'ajoute plus rien. Le texte n'est déclaré prêt qu'après l'indexation
+    (save_documents_metadata).
+
+    Args:
+        filename: Nom du document dans le catalogue
+        content_hash: Empreinte de la nouvelle version
+    """
+    def update(metadata: dict):
+        entry = metadata.setdefault(filename, {})
+        entry["content_hash"] = content_hash
+        entry["text_ready"] = False
+        entry["indexed_at"] = datetime.now().isoformat()
+        entry.pop("image_chunks", None)
+        entry.pop("visuals", None)
+
+    update_documents_metadata(update)
+
+
+def set_document_status(filename: str, content_hash: str, lock: threading.Lock = None, **fields) -> bool:
+    """
+    Met à jour l'état d'indexation d'un document (ex: visuals="ready").
+
+    L'entrée n'est modifiée que si elle désigne toujours le même contenu :
+    une tâche d'arrière-plan n'écrase pas l'état d'une version plus récente.
+
+    Args:
+        filename: Nom du document dans le catalogue
+        content_hash: Empreinte du contenu traité
+        lock: Verrou du catalogue (obligatoire hors du thread Streamlit)
+        **fields: Champs à mettre à jour
+
+    Returns:
+        True si l'entrée a été mise à jour
+    """
+    updated = []
+
+    def update(metadata: dict):
+        entry = metadata.get(filename)
+        if entry is not None and entry.get("content_hash") == content_hash:
+            entry.update(fields)
+            updated.append(filename)
+
+    update_documents_metadata(update, lock)
+    return bool(updated)
+
+
+def write_documents_metadata(metadata: dict):
+    """Écrit le catalogue des documents sur disque (remplacement atomique)."""
     os.makedirs(PERSIST_DIRECTORY, exist_ok=True)
-    metadata = {}
-    for filename, data in documents_text.items():
-        metadata[filename] = {
-            "text_length": len(data.get("text", "")),
-            "chunks_count": len(data.get("chunks", [])),
-            "indexed_at": datetime.now().isoformat()
-        }
-    with open(METADATA_FILE, "w", encoding="utf-8") as f:
+    tmp_file = f"{METADATA_FILE}.{threading.get_ident()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, METADATA_FILE)
 
 
 def load_documents_metadata() -> dict:
@@ -432,8 +613,59 @@ def load_documents_metadata() -> dict:
     return {}
 
 
-def get_indexed_documents() -> list[str]:
+def compute_content_hash(file_bytes: bytes) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier uploadé."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def find_document_by_hash(catalog: dict, content_hash: str) -> str | None:
+    """Retourne le nom du document du catalogue ayant ce contenu, s'il existe."""
+    for filename, entry in catalog.items():
+        # Version en cours de remplacement : texte pas encore indexé
+        if entry.get("content_hash") == content_hash and entry.get("text_ready", True):
+            return filename
+    return None
+
+
+def register_document_alias(catalog: dict, filename: str, alias: str):
+    """Enregistre `alias` comme autre nom d'un document déjà indexé."""
+    aliases = catalog.setdefault(filename, {}).setdefault("aliases", [])
+    if alias != filename and alias not in aliases:
+        aliases.append(alias)
+
+        def update(metadata: dict):
+            stored = metadata.setdefault(filename, {}).setdefault("aliases", [])
+            if alias not in stored:
+                stored.append(alias)
+
+        update_documents_metadata(update)
+
+
+def remove_document_alias(catalog: dict, alias: str):
+    """Retire `alias` du catalogue (le nom désigne désormais un autre contenu)."""
+    changed = False
+    for entry in catalog.values():
+        if alias in entry.get("aliases", []):
+            entry["aliases"].remove(alias)
+            changed = True
+    if changed:
+        def update(metadata: dict):
+            for entry in metadata.values():
+                if alias in entry.get("aliases", []):
+                    entry["aliases"].remove(alias)
+
+        update_documents_metadata(update)
+
+
+def delete_document_chunks(filename: str):
+    """Supprime de la collection courante tous les chunks d'un document."""
     collection = get_chroma_collection()
+    collection.delete(where={"filename": filename})
+    bump_index_version()
+
+
+def get_indexed_documents(embedding_provider: str = None) -> list[str]:
+    collection = get_chroma_collection(embedding_provider=embedding_provider)
     if collection.count() == 0:
         return []
     try:
@@ -448,6 +680,67 @@ def get_indexed_documents() -> list[str]:
         return []
 
 
+@st.cache_resource
+def get_index_version() -> dict:
+    """Compteur de version de l'index, partagé par toutes les sessions."""
+    return {"value": 0}
+
+
+def bump_index_version():
+    """Invalide les statistiques en cache après une indexation, suppression ou réinitialisation."""
+    version = get_index_version()
+    with get_catalog_lock():
+        version["value"] += 1
+
+
+def get_catalog_mtime() -> int:
+    """Date de dernière écriture du catalogue (écrit aussi par les tâches d'arrière-plan)."""
+    try:
+        return os.stat(METADATA_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=INDEX_STATS_TTL)
+def get_index_stats(embedding_provider: str, version: int, catalog_mtime: int, remote_count: int = None) -> dict:
+    """
+    Instantané des statistiques de l'index pour un provider d'embeddings.
+
+    Le cache est indexé par la version de l'index et la date du catalogue :
+    un rerun Streamlit ne touche à ChromaDB que si quelque chose a changé.
+    Les écritures d'autres processus (API via le serveur Chroma) ne changent
+    ni l'un ni l'autre : elles sont vues par le nombre de chunks en mode
+    client/serveur, et au plus tard après INDEX_STATS_TTL secondes.
+
+    Args:
+        embedding_provider: Provider d'embeddings (une collection par provider)
+        version: Valeur de get_index_version() (clé de cache)
+        catalog_mtime: Valeur de get_catalog_mtime() (clé de cache)
+        remote_count: Nombre de chunks lu sur le serveur Chroma (clé de cache, None en mode embarqué)
+
+    Returns:
+        {"count": nombre de chunks, "documents": noms indexés, "catalog": catalogue}
+    """
+    collection = get_chroma_collection(embedding_provider=embedding_provider)
+    count = collection.count()
+    return {
+        "count": count,
+        "documents": sorted(get_indexed_documents(embedding_provider)) if count else [],
+        "catalog": load_documents_metadata(),
+    }
+
+
+def get_current_index_stats(embedding_provider: str = None) -> dict:
+    """Statistiques en cache du provider donné (provider courant par défaut)."""
+    if embedding_provider is None:
+        embedding_provider = st.session_state.get("provider_config", {}).get("embeddings", {}).get("default", "ollama")
+    remote_count = None
+    if get_server_address() is not None:
+        # Base partagée avec l'API : un count() (une requête HTTP) détecte ses écritures
+        remote_count = get_chroma_collection(embedding_provider=embedding_provider).count()
+    return get_index_stats(embedding_provider, get_index_version()["value"], get_catalog_mtime(), remote_count)
+
+
 # =============================================================================
 # API ARISTOTE (pour liste des modèles)
 # =============================================================================
@@ -456,9 +749,12 @@ def get_client(api_key: str = None):
     key = api_key or st.session_state.get("aristote_api_key") or os.getenv("ARISTOTE_API_KEY", "")
     if not key:
         raise ValueError("Clé API non configurée")
-    return OpenAI(
+    base_url = os.getenv("ARISTOTE_API_BASE", "https://llm.ilaas.fr/v1")
+    return get_provider_registry().get(
+        "aristote_client",
+        lambda: OpenAI(api_key=key, base_url=base_url, http_client=get_http_client(base_url)),
+        base_url=base_url,
         api_key=key,
-        base_url=os.getenv("ARISTOTE_API_BASE", "https://llm.ilaas.fr/v1")
     )
 
 
@@ -491,8 +787,7 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
 
 
 def extract_text_from_docx(file_bytes: bytes) -> str:
-    doc = Document(io.BytesIO(file_bytes))
-    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    return extract_docx(file_bytes).text
 
 
 def extract_text(uploaded_file) -> str:
@@ -538,6 +833,7 @@ def extract_pdf_with_images(
                         document_name=filename,
                         vision_api_key=api_key,
                         max_images=max_images,
+                        vision_cache=get_vision_cache(VISION_CACHE_FILE),
                     )
                 except Exception as e:
                     logging.warning(f"Erreur extraction images: {e}")
@@ -608,7 +904,31 @@ def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> list[dic
     return chunks
 
 
-def create_embeddings(chunks: list[dict], progress_callback=None) -> list[dict]:
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """Artefacts d'extraction (texte, pages, tableaux, images) par empreinte de contenu."""
+    return ArtifactStore(ARTIFACTS_DIRECTORY)
+
+
+def build_document_chunks(artifact: ExtractionArtifact, chunk_size: int, overlap: int) -> list[dict]:
+    """
+    Construit les chunks d'un document à partir de son artefact d'extraction.
+
+    Args:
+        artifact: Artefact du document
+        chunk_size: Taille cible des chunks de texte
+        overlap: Chevauchement entre chunks de texte
+
+    Returns:
+        Chunks de texte, puis de tableaux, puis d'images (si analysées), identifiants consécutifs
+    """
+    chunks = chunk_text(artifact.text, chunk_size=chunk_size, overlap=overlap)
+    for extra in artifact.table_chunks + (artifact.image_chunks or []):
+        chunks.append({"id": len(chunks), "text": extra["text"], "metadata": dict(extra["metadata"])})
+    return chunks
+
+
+def create_embeddings(chunks: list[dict], progress_callback=None, provider=None) -> list[dict]:
     """
     Génère les embeddings pour une liste de chunks.
     Utilise embed_documents en batch pour de meilleures performances.
@@ -616,11 +936,14 @@ def create_embeddings(chunks: list[dict], progress_callback=None) -> list[dict]:
     Args:
         chunks: Liste de chunks avec leur texte
         progress_callback: Fonction optionnelle (current, total) pour la progression
+        provider: Provider d'embeddings (par défaut celui de la session ; obligatoire
+            hors du thread Streamlit)
 
     Returns:
         Chunks avec leurs embeddings ajoutés
     """
-    provider = get_embedding_provider()
+    if provider is None:
+        provider = get_embedding_provider()
     if provider is None:
         raise ValueError("Provider d'embeddings non disponible")
 
@@ -655,14 +978,16 @@ def create_embeddings(chunks: list[dict], progress_callback=None) -> list[dict]:
     return chunks
 
 
-def add_to_vectorstore(chunks: list[dict], filename: str):
-    collection = get_chroma_collection()
+def add_to_vectorstore(chunks: list[dict], filename: str, collection=None, upsert: bool = False):
+    if collection is None:
+        collection = get_chroma_collection()
     ids = [f"{filename}_{chunk['id']}" for chunk in chunks]
     embeddings = [chunk["embedding"] for chunk in chunks]
     documents = [chunk["text"] for chunk in chunks]
     metadatas = [{"filename": filename, "chunk_id": chunk["id"]} for chunk in chunks]
 
-    collection.add(
+    write = collection.upsert if upsert else collection.add
+    write(
         ids=ids,
         embeddings=embeddings,
         documents=documents,
@@ -671,6 +996,212 @@ def add_to_vectorstore(chunks: list[dict], filename: str):
     return len(chunks)
 
 
+def replace_document_chunks(chunks: list[dict], filename: str):
+    """
+    Remplace les chunks d'un document par une nouvelle version déjà vectorisée.
+
+    Les nouveaux chunks sont écrits (upsert) avant la suppression des anciens
+    qu'ils ne remplacent pas : en cas d'échec, la version précédente reste
+    interrogeable.
+
+    Args:
+        chunks: Nouveaux chunks avec embeddings
+        filename: Nom du document
+    """
+    collection = get_chroma_collection()
+    old_ids = set(collection.get(where={"filename": filename}, include=[])["ids"])
+    add_to_vectorstore(chunks, filename, collection=collection, upsert=True)
+    stale_ids = old_ids - {f"{filename}_{chunk['id']}" for chunk in chunks}
+    if stale_ids:
+        collection.delete(ids=list(stale_ids))
+    bump_index_version()
+
+
+# =============================================================================
+# INDEXATION PROGRESSIVE (VISUELS EN ARRIÈRE-PLAN)
+# =============================================================================
+
+# États du catalogue pour les visuels d'un document
+VISUALS_NONE = "none"          # Pas d'analyse vision (désactivée)
+VISUALS_PENDING = "pending"    # En file d'attente
+VISUALS_RUNNING = "running"    # Analyse en cours
+VISUALS_READY = "ready"        # Chunks visuels indexés
+VISUALS_FAILED = "failed"      # Analyse échouée (le texte reste interrogeable)
+
+
+@st.cache_resource
+def get_visual_indexing_executor() -> ThreadPoolExecutor:
+    """Pool partagé des analyses vision d'arrière-plan (survit aux reruns)."""
+    return ThreadPoolExecutor(max_workers=VISUAL_INDEXING_WORKERS, thread_name_prefix="visual-indexing")
+
+
+def index_visual_chunks(
+    file_bytes: bytes,
+    filename: str,
+    content_hash: str,
+    first_chunk_id: int,
+    vision,
+    embedding_provider,
+    collection,
+    catalog_lock: threading.Lock,
+    artifact_store: ArtifactStore = None,
+    max_images: int = 10,
+) -> int:
+    """
+    Analyse les images d'un PDF ou d'un DOCX et ajoute leurs chunks à un document déjà indexé.
+
+    Exécutée hors du thread Streamlit : tout ce qui dépend de la session
+    (vision, embeddings, collection, verrou) est passé en argument.
+
+    Args:
+        file_bytes: Contenu du document
+        filename: Nom du document
+        content_hash: Empreinte du contenu (abandon si le document a changé entre-temps)
+        first_chunk_id: Identifiant du premier chunk visuel (après les chunks texte)
+        vision: Provider de vision
+        embedding_provider: Provider d'embeddings de la collection
+        collection: Collection ChromaDB du document
+        catalog_lock: Verrou du catalogue
+        artifact_store: Artefacts d'extraction (les descriptions y sont conservées)
+        max_images: Nombre maximum d'images à analyser
+
+    Returns:
+        Nombre de chunks visuels ajoutés
+    """
+    if not set_document_status(filename, content_hash, catalog_lock, visuals=VISUALS_RUNNING):
+        return 0
+
+    try:
+        if filename.lower().endswith(".docx"):
+            extractor = DOCXImageExtractor(vision_provider=vision)
+        else:
+            extractor = PDFImageExtractor(vision_provider=vision)
+        # Appels vision et embeddings servis après les questions et les imports en cours
+        with call_priority(PRIORITY_BACKGROUND):
+            image_chunks = list(extractor.iter_image_chunks(file_bytes, filename, max_images))
+        if artifact_store is not None:
+            artifact_store.set_image_chunks(content_hash, image_chunks)
+
+        if image_chunks:
+            for i, chunk in enumerate(image_chunks):
+                chunk["id"] = first_chunk_id + i
+            with call_priority(PRIORITY_BACKGROUND):
+                create_embeddings(image_chunks, provider=embedding_provider)
+
+            # Le document a pu être mis à jour ou supprimé pendant l'analyse :
+            # vérification et ajout sous le verrou (voir supersede_document)
+            with catalog_lock:
+                entry = load_documents_metadata().get(filename, {})
+                if entry.get("content_hash") != content_hash:
+                    return 0
+                add_to_vectorstore(image_chunks, filename, collection=collection)
+
+        set_document_status(
+            filename, content_hash, catalog_lock,
+            visuals=VISUALS_READY,
+            image_chunks=len(image_chunks),
+            chunks_count=first_chunk_id + len(image_chunks),
+        )
+        logging.info(f"Visuels de {filename} indexés: {len(image_chunks)} chunk(s)")
+        return len(image_chunks)
+
+    except Exception as e:
+        logging.error(f"Erreur indexation des visuels de {filename}: {e}")
+        set_document_status(filename, content_hash, catalog_lock, visuals=VISUALS_FAILED)
+        return 0
+
+
+def schedule_visual_indexing(file_bytes: bytes, filename: str, content_hash: str, first_chunk_id: int) -> bool:
+    """
+    Met en file l'analyse vision d'un document dont le texte est déjà indexé.
+
+    Args:
+        file_bytes: Contenu du PDF ou du DOCX
+        filename: Nom du document
+        content_hash: Empreinte du contenu
+        first_chunk_id: Identifiant du premier chunk visuel
+
+    Returns:
+        True si l'analyse a été programmée
+    """
+    vision = get_vision_provider()
+    embedding_provider = get_embedding_provider()
+    if vision is None or embedding_provider is None:
+        return False
+
+    catalog_lock = get_catalog_lock()
+    set_document_status(filename, content_hash, catalog_lock, visuals=VISUALS_PENDING)
+    get_visual_indexing_executor().submit(
+        index_visual_chunks,
+        file_bytes,
+        filename,
+        content_hash,
+        first_chunk_id,
+        vision,
+        embedding_provider,
+        get_chroma_collection(),
+        catalog_lock,
+        get_artifact_store(),
+    )
+    return True
+
+
+def rechunk_document(filename: str, chunk_size: int, overlap: int) -> int | None:
+    """
+    Re-découpe un document indexé à partir de son artefact d'extraction.
+    Seuls les embeddings sont recalculés : ni extraction, ni appel vision.
+
+    Args:
+        filename: Nom du document dans le catalogue
+        chunk_size: Taille cible des chunks de texte
+        overlap: Chevauchement entre chunks de texte
+
+    Returns:
+        Nombre de chunks indexés, ou None si le document ne peut pas être re-découpé
+        (absent de la collection courante, pas d'artefact, ou analyse des images en cours)
+    """
+    collection = get_chroma_collection()
+    if not collection.get(where={"filename": filename}, limit=1, include=[])["ids"]:
+        return None
+
+    entry = load_documents_metadata().get(filename, {})
+    content_hash = entry.get("content_hash")
+    if not content_hash or entry.get("visuals") in (VISUALS_PENDING, VISUALS_RUNNING):
+        return None
+
+    artifact = get_artifact_store().load(content_hash)
+    if artifact is None:
+        return None
+
+    with call_priority(PRIORITY_BACKGROUND):
+        chunks = create_embeddings(build_document_chunks(artifact, chunk_size, overlap))
+    replace_document_chunks(chunks, filename)
+
+    image_count = len(artifact.image_chunks or [])
+    session_doc = st.session_state.get("documents_text", {}).get(filename)
+    if session_doc is not None:
+        session_doc["chunks"] = chunks[:len(chunks) - image_count]
+    set_document_status(
+        filename, content_hash,
+        chunks_count=len(chunks),
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+    )
+    return len(chunks)
+
+
+def describe_document_status(entry: dict) -> str:
+    """Libellé de l'état d'indexation d'un document pour la sidebar."""
+    visuals = entry.get("visuals", VISUALS_NONE)
+    if visuals in (VISUALS_PENDING, VISUALS_RUNNING):
+        return "texte prêt · ⏳ visuels en cours"
+    if visuals == VISUALS_READY:
+        return f"texte et visuels prêts ({entry.get('image_chunks', 0)} visuels)"
+    if visuals == VISUALS_FAILED:
+        return "texte prêt · ⚠️ visuels en échec"
+    return "texte prêt"
+
+
 # =============================================================================
 # RECHERCHE HYBRIDE
 # =============================================================================
@@ -698,7 +1229,7 @@ def normalize_text_for_search(text: str) -> str:
 
 def tokenize(text: str) -> list[str]:
     text = normalize_text_for_search(text)
-    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    text = PUNCTUATION_REGEX.sub(' ', text.lower())
     stop_words = {'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'est',
                   'en', 'que', 'qui', 'dans', 'pour', 'sur', 'avec', 'ce', 'cette',
                   'au', 'aux', 'a', 'son', 'sa', 'ses', 'se', 'ou', 'ne', 'pas',
@@ -970,6 +1501,10 @@ with st.sidebar:
         )
 
         if aristote_key:
+            previous_key = st.session_state.get("aristote_api_key")
+            if previous_key and previous_key != aristote_key:
+                # Clé remplacée : les clients construits avec l'ancienne clé sont retirés
+                get_provider_registry().invalidate(api_key=previous_key)
             st.session_state.aristote_api_key = aristote_key
             st.session_state.aristote_api_url = aristote_url
             # Aussi mettre dans os.environ pour compatibilité
@@ -1015,6 +1550,9 @@ with st.sidebar:
             help="Obtenez votre clé sur https://albert.api.etalab.gouv.fr"
         )
         if albert_key:
+            previous_key = st.session_state.get("albert_api_key")
+            if previous_key and previous_key != albert_key:
+                get_provider_registry().invalidate(api_key=previous_key)
             st.session_state.albert_api_key = albert_key
             os.environ["ALBERT_API_KEY"] = albert_key
 
@@ -1040,15 +1578,15 @@ with st.sidebar:
 
     # Récupérer la collection pour le provider actuel
     current_emb_provider = st.session_state.provider_config["embeddings"]["default"]
-    collection = get_chroma_collection()
-    collection_count = collection.count()
+    # Statistiques en cache : recalculées seulement après indexation, reset ou écriture du catalogue
+    index_stats = get_current_index_stats(current_emb_provider)
+    collection_count = index_stats["count"]
 
     # Avertissement si collection vide pour ce provider
     if collection_count == 0:
         # Vérifier si l'autre provider a des documents
         other_provider = "albert" if current_emb_provider == "ollama" else "ollama"
-        other_collection = get_chroma_collection(embedding_provider=other_provider)
-        other_count = other_collection.count()
+        other_count = get_current_index_stats(other_provider)["count"]
 
         if other_count > 0:
             st.warning(
@@ -1062,15 +1600,30 @@ with st.sidebar:
     # Afficher le provider actuel
     st.caption(f"🔌 Provider embeddings: **{current_emb_provider}**")
 
-    indexed_docs = get_indexed_documents()
+    indexed_docs = index_stats["documents"]
 
     if collection_count > 0:
         st.success(f"💾 {collection_count} chunks indexés")
-        with st.expander("📂 Documents indexés"):
-            metadata = load_documents_metadata()
-            for doc_name in indexed_docs:
-                doc_meta = metadata.get(doc_name, {})
-                st.caption(f"📄 {doc_name} - {doc_meta.get('chunks_count', '?')} chunks")
+        visuals_pending = any(
+            entry.get("visuals") in (VISUALS_PENDING, VISUALS_RUNNING) for entry in index_stats["catalog"].values()
+        )
+
+        # Rafraîchi périodiquement tant que des visuels sont en cours d'analyse
+        @st.fragment(run_every=5 if visuals_pending else None)
+        def show_indexed_documents():
+            stats = get_current_index_stats(current_emb_provider)
+            catalog = stats["catalog"]
+            with st.expander("📂 Documents indexés"):
+                for doc_name in stats["documents"]:
+                    doc_meta = catalog.get(doc_name, {})
+                    st.caption(
+                        f"📄 {doc_name} - {doc_meta.get('chunks_count', '?')} chunks "
+                        f"({describe_document_status(doc_meta)})"
+                    )
+                    if doc_meta.get("aliases"):
+                        st.caption(f"　↳ aussi reçu sous : {', '.join(doc_meta['aliases'])}")
+
+        show_indexed_documents()
     else:
         st.info("📭 Aucun document indexé pour ce provider")
 
@@ -1095,6 +1648,30 @@ with st.sidebar:
             "use_rerank": st.session_state.provider_config["rerank"]["enabled"]
         }
 
+        if st.button(
+            "♻️ Appliquer aux documents indexés",
+            help="Re-découpe les documents déjà indexés avec ces paramètres, "
+                 "sans ré-extraction ni nouvelle analyse des images",
+        ):
+            # Seuls les documents de la collection du provider courant : ceux indexés
+            # avec l'autre provider d'embeddings restent dans leur propre collection
+            current_docs = sorted(get_indexed_documents())
+            rechunked, skipped = 0, []
+            progress_bar = st.progress(0, text="Re-découpage...")
+            for i, doc_name in enumerate(current_docs):
+                try:
+                    if rechunk_document(doc_name, chunk_size, chunk_overlap) is None:
+                        skipped.append(doc_name)
+                    else:
+                        rechunked += 1
+                except Exception as e:
+                    skipped.append(doc_name)
+                    logging.error(f"Erreur re-découpage {doc_name}: {e}")
+                progress_bar.progress((i + 1) / max(len(current_docs), 1), text=doc_name)
+            st.success(f"✅ {rechunked} document(s) re-découpé(s)")
+            if skipped:
+                st.warning(f"⚠️ Non re-découpés (à ré-importer ou analyse en cours) : {', '.join(skipped)}")
+
     # Upload
     uploaded_files = st.file_uploader(
         "Charger des documents",
@@ -1106,9 +1683,35 @@ with st.sidebar:
         if "documents_text" not in st.session_state:
             st.session_state.documents_text = {}
 
+        catalog = load_documents_metadata()
+
         for file in uploaded_files:
-            already_indexed = file.name in st.session_state.documents_text or file.name in indexed_docs
-            if not already_indexed:
+            # Empreinte du contenu : la déduplication se fait sur les octets,
+            # pas sur le nom du fichier
+            content_hash = compute_content_hash(file.getvalue())
+            session_doc = st.session_state.documents_text.get(file.name)
+            if session_doc and session_doc.get("content_hash") == content_hash:
+                continue
+
+            # Contenu identique déjà indexé (éventuellement sous un autre nom) :
+            # simple alias dans le catalogue, sans extraction ni embeddings
+            canonical_name = find_document_by_hash(catalog, content_hash)
+            if canonical_name and canonical_name in indexed_docs:
+                if canonical_name != file.name and file.name not in catalog[canonical_name].get("aliases", []):
+                    register_document_alias(catalog, canonical_name, file.name)
+                    st.info(f"🔁 {file.name} : contenu identique à {canonical_name}, déjà indexé")
+                continue
+
+            known_entry = catalog.get(file.name, {})
+            known_hash = (session_doc or {}).get("content_hash") or known_entry.get("content_hash")
+            already_indexed = session_doc is not None or file.name in indexed_docs
+            # Même nom, contenu différent (ou mise à jour précédente interrompue) :
+            # mise à jour. Les documents indexés avant l'introduction des
+            # empreintes (known_hash None) sont conservés.
+            is_update = already_indexed and known_hash is not None and (
+                known_hash != content_hash or not known_entry.get("text_ready", True)
+            )
+            if is_update or not already_indexed:
                 is_valid, validation_msg = validate_uploaded_file(file)
                 if not is_valid:
                     st.error(f"❌ {file.name}: {validation_msg}")
@@ -1119,82 +1722,92 @@ with st.sidebar:
                 use_vision = config["vision"]["enabled"]
 
                 try:
+                    remove_document_alias(catalog, file.name)
+
                     # Extraction du texte
                     with st.spinner(f"Extraction de {file.name}..."):
                         file_bytes = file.read()
                         file.seek(0)  # Reset pour extract_text
 
+                        table_chunks = []
+                        page_starts = []
                         if file.name.lower().endswith(".pdf"):
-                            text = extract_text_from_pdf(file_bytes)
+                            # Tableaux natifs extraits localement, hors du texte courant
+                            pdf_content = extract_pdf(file_bytes)
+                            text = pdf_content.text
+                            page_starts = pdf_content.page_starts
+                            table_chunks = generate_table_chunks(pdf_content.tables, file.name)
                         elif file.name.lower().endswith(".docx"):
                             text = extract_text_from_docx(file_bytes)
                         else:
                             text = ""
 
-                        chunks = chunk_text(
-                            text,
+                        # Artefact conservé pour re-découper sans ré-extraire
+                        artifact = ExtractionArtifact(
+                            content_hash=content_hash,
+                            filename=file.name,
+                            text=text,
+                            page_starts=page_starts,
+                            table_chunks=table_chunks,
+                        )
+                        get_artifact_store().save(artifact)
+
+                        chunks = build_document_chunks(
+                            artifact,
                             chunk_size=params.get("chunk_size", 800),
                             overlap=params.get("chunk_overlap", 100)
                         )
+                        if table_chunks:
+                            st.info(f"📋 {len(table_chunks)} tableau(x) extrait(s) localement")
 
-                    # Extraction des images si vision activée
-                    image_chunks = []
-                    if use_vision and file.name.lower().endswith(".pdf"):
-                        api_key = st.session_state.get("albert_api_key") or os.getenv("ALBERT_API_KEY")
-                        if api_key:
-                            with st.spinner(f"Analyse des images avec Albert Vision..."):
-                                try:
-                                    _, image_chunks = extract_pdf_with_vision(
-                                        pdf_bytes=file_bytes,
-                                        document_name=file.name,
-                                        vision_api_key=api_key,
-                                        max_images=10,
-                                    )
-                                    if image_chunks:
-                                        st.info(f"🖼️ {len(image_chunks)} image(s) analysée(s)")
-                                except Exception as e:
-                                    logging.warning(f"Erreur vision: {e}")
-                                    st.warning(f"⚠️ Analyse images échouée: {e}")
-
-                    # Créer les embeddings pour le texte avec barre de progression
-                    total_chunks = len(chunks) + len(image_chunks)
-                    st.write(f"📊 Génération des embeddings ({total_chunks} chunks)...")
+                    # Texte indexé d'abord : le document est interrogeable sans attendre la vision
+                    st.write(f"📊 Génération des embeddings ({len(chunks)} chunks)...")
                     progress_bar = st.progress(0, text="Initialisation...")
 
                     def update_progress(current, total):
                         progress = current / total
                         progress_bar.progress(progress, text=f"Chunk {current}/{total}")
 
-                    chunks_with_embeddings = create_embeddings(chunks, progress_callback=update_progress)
-
-                    # Ajouter les embeddings pour les chunks d'images
-                    if image_chunks:
-                        st.write(f"🖼️ Embeddings des images ({len(image_chunks)})...")
-                        for i, img_chunk in enumerate(image_chunks):
-                            img_chunk["id"] = len(chunks_with_embeddings)
-                            img_chunk["embedding"] = get_embedding(img_chunk["text"])
-                            progress_bar.progress(
-                                (len(chunks) + i + 1) / total_chunks,
-                                text=f"Image {i+1}/{len(image_chunks)}"
-                            )
-                        chunks_with_embeddings.extend(image_chunks)
-
+                    # Les questions posées pendant l'import restent servies en premier
+                    with call_priority(PRIORITY_INGESTION):
+                        chunks_with_embeddings = create_embeddings(chunks, progress_callback=update_progress)
                     progress_bar.progress(1.0, text="Terminé !")
 
+                    # Mise à jour : l'ancienne version n'est retirée qu'une fois la nouvelle écrite
                     with st.spinner(f"Indexation dans ChromaDB..."):
-                        add_to_vectorstore(chunks_with_embeddings, file.name)
+                        if is_update:
+                            supersede_document(file.name, content_hash)
+                            replace_document_chunks(chunks_with_embeddings, file.name)
+                        else:
+                            add_to_vectorstore(chunks_with_embeddings, file.name)
+                    bump_index_version()
 
                     st.session_state.documents_text[file.name] = {
                         "text": text,
                         "chunks": chunks_with_embeddings,
-                        "image_chunks": len(image_chunks)
+                        "content_hash": content_hash,
                     }
                     save_documents_metadata(st.session_state.documents_text)
+                    if is_update and known_hash != content_hash:
+                        # Artefact de l'ancienne version : plus référencé par le catalogue
+                        if find_document_by_hash(load_documents_metadata(), known_hash) is None:
+                            get_artifact_store().delete(known_hash)
+
+                    # Images analysées en arrière-plan, chunks ajoutés à la fin de l'analyse
+                    visuals_scheduled = False
+                    if use_vision and file.name.lower().endswith((".pdf", ".docx")):
+                        visuals_scheduled = schedule_visual_indexing(
+                            file_bytes, file.name, content_hash, first_chunk_id=len(chunks_with_embeddings)
+                        )
+                    if not visuals_scheduled:
+                        set_document_status(file.name, content_hash, visuals=VISUALS_NONE)
+                    catalog = load_documents_metadata()
 
-                    if image_chunks:
-                        st.success(f"✅ {file.name} indexé ({len(chunks)} texte + {len(image_chunks)} images)")
+                    status_label = "mis à jour" if is_update else "indexé"
+                    if visuals_scheduled:
+                        st.success(f"✅ {file.name} {status_label} ({len(chunks)} chunks texte) · 🖼️ images en cours d'analyse")
                     else:
-                        st.success(f"✅ {file.name} indexé")
+                        st.success(f"✅ {file.name} {status_label}")
                 except Exception as e:
                     st.error(f"❌ {file.name}: {handle_error(e, 'Indexation')}")
 
@@ -1213,7 +1826,10 @@ with st.sidebar:
                 pass
             if os.path.exists(METADATA_FILE):
                 os.remove(METADATA_FILE)
+            get_artifact_store().clear()
             st.session_state.documents_text = {}
+            # Le compteur de version vit dans cache_resource : vider aussi les statistiques
+            get_index_stats.clear()
             st.cache_resource.clear()
             st.rerun()
 
@@ -1223,13 +1839,13 @@ provider_info = f"Embeddings: {st.session_state.provider_config['embeddings']['d
 st.caption(f"🔌 {provider_info}")
 
 if rag_params.get("enabled", True):
-    collection = get_chroma_collection()
-    if collection.count() > 0:
+    chunk_count = get_current_index_stats()["count"]
+    if chunk_count > 0:
         mode_text = "🔒 RAG EXCLUSIF" if rag_params.get("exclusive", False) else "📚 RAG actif"
         extra = ""
         if st.session_state.provider_config["rerank"]["enabled"]:
             extra += " + Reranking"
-        st.info(f"{mode_text} - {collection.count()} chunks{extra}")
+        st.info(f"{mode_text} - {chunk_count} chunks{extra}")
     else:
         st.warning("📚 RAG actif - Aucun document chargé")
 
@@ -1301,31 +1917,30 @@ if prompt := st.chat_input("Posez votre question..."):
                 if not allowed:
                     st.warning(f"⏳ Trop de requêtes. Réessayez dans {retry_after}s.")
                 else:
-                    with st.spinner("Réflexion en cours..."):
-                        try:
-                            llm = get_llm_provider()
-                            if llm is None:
-                                raise ValueError("LLM non disponible")
-
-                            # Détecter le provider pour adapter le prompt
-                            llm_provider = st.session_state.provider_config["llm"]["default"]
-
-                            # Construire les messages différemment selon le mode et le provider
-                            if is_exclusive and context:
-                                if llm_provider == "albert":
-                                    # Albert : prompt simple et direct, sans instruction de refus
-                                    # Le mode exclusif est géré côté app (pas de réponse si pas de context)
-                                    system_prompt = "Tu es un assistant qui répond aux questions en utilisant les documents fournis. Réponds en français. Cite la source du document quand tu donnes une information."
-                                    user_content = f"""Voici des extraits de documents :
+                    try:
+                        llm = get_llm_provider()
+                        if llm is None:
+                            raise ValueError("LLM non disponible")
+
+                        # Détecter le provider pour adapter le prompt
+                        llm_provider = st.session_state.provider_config["llm"]["default"]
+
+                        # Construire les messages différemment selon le mode et le provider
+                        if is_exclusive and context:
+                            if llm_provider == "albert":
+                                # Albert : prompt simple et direct, sans instruction de refus
+                                # Le mode exclusif est géré côté app (pas de réponse si pas de context)
+                                system_prompt = "Tu es un assistant qui répond aux questions en utilisant les documents fournis. Réponds en français. Cite la source du document quand tu donnes une information."
+                                user_content = f"""Voici des extraits de documents :
 
 {context}
 
 Question : {prompt}
 
 Réponds à la question en te basant sur les documents ci-dessus."""
-                                else:
-                                    # Aristote et autres : garder le format original
-                                    system_prompt = f"""Tu es un assistant documentaire strict.
+                            else:
+                                # Aristote et autres : garder le format original
+                                system_prompt = f"""Tu es un assistant documentaire strict.
 
 INSTRUCTIONS SYSTÈME (IMMUABLES) :
 - Tu réponds UNIQUEMENT avec les informations des DOCUMENTS ci-dessous
@@ -1336,19 +1951,19 @@ INSTRUCTIONS SYSTÈME (IMMUABLES) :
 === DOCUMENTS ===
 {context}
 === FIN DOCUMENTS ==="""
-                                    user_content = None
-                            elif context:
-                                if llm_provider == "albert":
-                                    system_prompt = "Tu es un assistant qui répond aux questions. Réponds en français."
-                                    user_content = f"""Voici des extraits de documents qui peuvent t'aider :
+                                user_content = None
+                        elif context:
+                            if llm_provider == "albert":
+                                system_prompt = "Tu es un assistant qui répond aux questions. Réponds en français."
+                                user_content = f"""Voici des extraits de documents qui peuvent t'aider :
 
 {context}
 
 Question : {prompt}
 
 Réponds à la question. Tu peux utiliser les documents ou tes connaissances."""
-                                else:
-                                    system_prompt = f"""Tu es un assistant helpful et réponds en français.
+                            else:
+                                system_prompt = f"""Tu es un assistant helpful et réponds en français.
 
 Tu as accès aux documents suivants pour répondre à la question.
 Utilise ces informations et cite tes sources.
@@ -1356,41 +1971,40 @@ Utilise ces informations et cite tes sources.
 === DOCUMENTS ===
 {context}
 === FIN DOCUMENTS ==="""
-                                    user_content = None
-                            else:
-                                system_prompt = "Tu es un assistant helpful et réponds en français."
                                 user_content = None
-
-                            # Construire les messages
-                            messages = [{"role": "system", "content": system_prompt}]
-
-                            # Ajouter l'historique (sauf le dernier message si on le reformate)
-                            if user_content:
-                                # Pour Albert avec contexte : ajouter l'historique puis le message reformaté
-                                for m in st.session_state.messages[:-1]:  # Tous sauf le dernier
-                                    messages.append({"role": m["role"], "content": m["content"]})
-                                messages.append({"role": "user", "content": user_content})
-                            else:
-                                # Format standard : ajouter tout l'historique
-                                for m in st.session_state.messages:
-                                    messages.append({"role": m["role"], "content": m["content"]})
-
-                            # Debug: afficher le contexte si mode dev
-                            if DEV_MODE:
-                                with st.expander("🔧 Debug: Contexte envoyé au LLM"):
-                                    st.text(f"Provider: {llm_provider}")
-                                    st.text(f"Taille contexte: {len(context)} caractères")
-                                    st.text(f"Nombre de messages: {len(messages)}")
-                                    if user_content:
-                                        st.text(f"User content (tronqué): {user_content[:500]}...")
-
-                            response = llm.chat(messages, stream=False)
-                            st.markdown(response)
-
-                            st.session_state.messages.append({
-                                "role": "assistant",
-                                "content": response
-                            })
-
-                        except Exception as e:
-                            st.error(f"Erreur: {handle_error(e, 'Appel LLM')}")
+                        else:
+                            system_prompt = "Tu es un assistant helpful et réponds en français."
+                            user_content = None
+
+                        # Construire les messages
+                        messages = [{"role": "system", "content": system_prompt}]
+
+                        # Ajouter l'historique (sauf le dernier message si on le reformate)
+                        if user_content:
+                            # Pour Albert avec contexte : ajouter l'historique puis le message reformaté
+                            for m in st.session_state.messages[:-1]:  # Tous sauf le dernier
+                                messages.append({"role": m["role"], "content": m["content"]})
+                            messages.append({"role": "user", "content": user_content})
+                        else:
+                            # Format standard : ajouter tout l'historique
+                            for m in st.session_state.messages:
+                                messages.append({"role": m["role"], "content": m["content"]})
+
+                        # Debug: afficher le contexte si mode dev
+                        if DEV_MODE:
+                            with st.expander("🔧 Debug: Contexte envoyé au LLM"):
+                                st.text(f"Provider: {llm_provider}")
+                                st.text(f"Taille contexte: {len(context)} caractères")
+                                st.text(f"Nombre de messages: {len(messages)}")
+                                if user_content:
+                                    st.text(f"User content (tronqué): {user_content[:500]}...")
+
+                        # Réponse affichée au fil des tokens ; « Arrêter » relance le
+                        # script, ce qui interrompt le flux (voir stream_llm_response)
+                        stop_slot = st.empty()
+                        stop_slot.button("⏹️ Arrêter", key="stop_generation")
+                        stream_llm_response(llm, messages, st.empty())
+                        stop_slot.empty()
+
+                    except Exception as e:
+                        st.error(f"Erreur: {handle_error(e, 'Appel LLM')}")
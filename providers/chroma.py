@@ -0,0 +1,58 @@
+"""
+Client ChromaDB partagé entre les applications.
+Deux modes de déploiement :
+- embarqué (défaut) : le processus ouvre lui-même la base sur disque
+  (`PersistentClient`). Un seul processus doit alors y accéder.
+- client/serveur : un serveur Chroma unique possède la base et les autres
+  processus (workers uvicorn, app v1, app v2) y accèdent en HTTP
+  (`HttpClient`). Activé dès que CHROMA_SERVER_HOST est défini.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import chromadb
+from chromadb.config import Settings
+
+
+DEFAULT_SERVER_PORT = 8000
+
+
+def get_server_address() -> Optional[Tuple[str, int]]:
+    """
+    Adresse du serveur Chroma configurée par l'environnement.
+
+    Returns:
+        (hôte, port) si CHROMA_SERVER_HOST est défini, None en mode embarqué
+    """
+    host = os.getenv("CHROMA_SERVER_HOST", "").strip()
+    if not host:
+        return None
+    return host, int(os.getenv("CHROMA_SERVER_PORT", str(DEFAULT_SERVER_PORT)))
+
+
+def create_chroma_client(persist_directory: str, host: Optional[str] = None, port: Optional[int] = None):
+    """
+    Crée le client ChromaDB selon le mode de déploiement.
+
+    Args:
+        persist_directory: Répertoire de la base (mode embarqué uniquement)
+        host: Hôte du serveur Chroma (None = CHROMA_SERVER_HOST, puis mode embarqué)
+        port: Port du serveur Chroma (None = CHROMA_SERVER_PORT ou 8000)
+
+    Returns:
+        `HttpClient` en mode client/serveur, `PersistentClient` sinon
+    """
+    settings = Settings(anonymized_telemetry=False, allow_reset=True)
+
+    if host is None:
+        address = get_server_address()
+        if address is not None:
+            host, env_port = address
+            port = port or env_port
+
+    if host:
+        return chromadb.HttpClient(host=host, port=port or DEFAULT_SERVER_PORT, settings=settings)
+
+    os.makedirs(persist_directory, exist_ok=True)
+    return chromadb.PersistentClient(path=persist_directory, settings=settings)
@@ -0,0 +1,418 @@
+"""
+Limitation de débit partagée entre les clients d'une même API.
+Un limiteur par nom d'API (ex: "albert") est partagé par tout le processus,
+de sorte que vision, embeddings, LLM et reranking consomment le même quota.
+
+Le régulateur (Governor) y ajoute une limite d'appels simultanés et une file
+d'attente : un appel au-delà des limites attend son tour au lieu d'être
+envoyé puis rejeté (429) par l'API.
+
+Chaque appel porte une priorité (variable de contexte, voir call_priority) :
+les questions des utilisateurs passent avant l'ingestion de documents, elle-même
+avant les traitements d'arrière-plan, et une part des appels simultanés et du
+quota leur est réservée.
+"""
+
+import logging
+import math
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+ALBERT_RATE_LIMITER = "albert"
+
+# Requêtes par minute par défaut (surchargeable via <NOM>_RATE_LIMIT_RPM, 0 = illimité)
+DEFAULT_REQUESTS_PER_MINUTE = 100
+
+# Appels simultanés par défaut (surchargeable via <NOM>_MAX_CONCURRENCY, 0 = illimité)
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Classes de priorité (la plus petite valeur est servie en premier)
+PRIORITY_INTERACTIVE = 0  # Question d'un utilisateur : embedding de la requête, reranking, réponse
+PRIORITY_INGESTION = 1    # Document importé par un utilisateur qui attend le résultat
+PRIORITY_BACKGROUND = 2   # Analyse vision différée, re-découpage des documents indexés
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_INGESTION: "ingestion",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Appels simultanés réservés aux questions (surchargeable via <NOM>_INTERACTIVE_RESERVED)
+DEFAULT_INTERACTIVE_RESERVED = 2
+
+# Part du quota par minute réservée aux questions
+INTERACTIVE_RPM_SHARE = 0.1
+
+# Priorité des appels du contexte courant (thread, tâche asyncio) ; défaut : interactif
+_call_priority: ContextVar[int] = ContextVar("call_priority", default=PRIORITY_INTERACTIVE)
+
+
+def _env_int(variable: str, default: int) -> int:
+    """
+    Lit un entier dans une variable d'environnement.
+
+    Args:
+        variable: Nom de la variable
+        default: Valeur si la variable est absente ou invalide
+
+    Returns:
+        Valeur lue, ou default (avec un avertissement si la valeur est invalide)
+    """
+    value = os.getenv(variable)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.warning(f"{variable}={value!r} n'est pas un entier, valeur par défaut utilisée ({default})")
+        return default
+
+
+def current_priority() -> int:
+    """Retourne la priorité des appels du contexte courant."""
+    return _call_priority.get()
+
+
+@contextmanager
+def call_priority(priority: int) -> Iterator[None]:
+    """
+    Fixe la priorité des appels sortants émis dans un bloc `with`.
+
+    La priorité suit le contexte : elle est transmise aux tâches asyncio et à
+    run_in_threadpool, mais pas aux threads d'un ThreadPoolExecutor (soumettre
+    via contextvars.copy_context().run).
+
+    Args:
+        priority: PRIORITY_INTERACTIVE, PRIORITY_INGESTION ou PRIORITY_BACKGROUND
+    """
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+class GovernorTimeout(TimeoutError):
+    """Le créneau n'a pas été obtenu dans le délai demandé."""
+
+
+class RateLimiter:
+    """
+    Limiteur de débit à fenêtre glissante, thread-safe.
+    Au plus `requests_per_minute` acquisitions sur toute fenêtre de `period` secondes.
+    """
+
+    def __init__(self, requests_per_minute: int, period: float = 60.0):
+        """
+        Initialise le limiteur.
+
+        Args:
+            requests_per_minute: Nombre maximum de requêtes par fenêtre (0 = illimité)
+            period: Durée de la fenêtre glissante en secondes
+        """
+        self.requests_per_minute = requests_per_minute
+        self._period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None, reserve: int = 0) -> bool:
+        """
+        Réserve un créneau, en attendant si le quota de la fenêtre est atteint.
+
+        Args:
+            timeout: Attente maximale en secondes (None = attendre indéfiniment)
+            reserve: Créneaux de la fenêtre laissés libres pour d'autres appelants
+
+        Returns:
+            True si le créneau est obtenu, False si le délai a expiré
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        limit = self.requests_per_minute - reserve
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self._period:
+                    self._timestamps.popleft()
+
+                if self.requests_per_minute <= 0 or len(self._timestamps) < limit:
+                    self._timestamps.append(now)
+                    return True
+
+                # Créneau libéré quand l'horodatage qui dépasse la limite sort de la fenêtre
+                oldest = self._timestamps[max(0, len(self._timestamps) - limit)]
+                wait = self._period - (now - oldest)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    name: str = ALBERT_RATE_LIMITER,
+    requests_per_minute: Optional[int] = None,
+) -> RateLimiter:
+    """
+    Retourne le limiteur partagé associé à une API, en le créant au premier appel.
+
+    Args:
+        name: Nom de l'API (ex: "albert")
+        requests_per_minute: Quota à utiliser à la création
+            (sinon variable d'env <NOM>_RATE_LIMIT_RPM, sinon DEFAULT_REQUESTS_PER_MINUTE)
+
+    Returns:
+        RateLimiter partagé par tout le processus
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            if requests_per_minute is None:
+                requests_per_minute = _env_int(
+                    f"{name.upper()}_RATE_LIMIT_RPM", DEFAULT_REQUESTS_PER_MINUTE
+                )
+            _limiters[name] = RateLimiter(requests_per_minute)
+        return _limiters[name]
+
+
+class Governor:
+    """
+    Régulateur des appels sortants vers une API, thread-safe.
+    Chaque appel obtient d'abord une place parmi `max_concurrency` appels
+    simultanés, puis un créneau du quota par minute. La place est conservée
+    jusqu'à la fin de l'appel (réponse en streaming comprise).
+
+    Les appels en attente sont servis par priorité, puis dans l'ordre
+    d'arrivée. Les appels non interactifs ne prennent jamais les
+    `interactive_reserved` dernières places ni la dernière part du quota :
+    une question passe aussitôt, même pendant une ingestion volumineuse.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_limiter: RateLimiter,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        interactive_reserved: int = DEFAULT_INTERACTIVE_RESERVED,
+    ):
+        """
+        Initialise le régulateur.
+
+        Args:
+            name: Nom de l'API (ex: "albert")
+            rate_limiter: Limiteur de requêtes par minute (partagé)
+            max_concurrency: Nombre maximum d'appels simultanés (0 = illimité)
+            interactive_reserved: Places réservées aux appels interactifs
+                (au moins une place reste ouverte aux autres)
+        """
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.interactive_reserved = (
+            max(0, min(interactive_reserved, max_concurrency - 1)) if max_concurrency > 0 else 0
+        )
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queues: Dict[int, deque] = {priority: deque() for priority in PRIORITY_NAMES}
+        self._paused_until = 0.0
+
+        # Métriques cumulées, par priorité
+        self._acquired = {priority: 0 for priority in PRIORITY_NAMES}
+        self._timeouts = 0
+        self._total_wait = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self._max_wait = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+    def _rpm_reserve(self, priority: int) -> int:
+        """Créneaux du quota par minute que cet appel doit laisser aux questions."""
+        rpm = self.rate_limiter.requests_per_minute
+        if priority == PRIORITY_INTERACTIVE or rpm <= 1:
+            return 0
+        return min(rpm - 1, max(1, math.ceil(rpm * INTERACTIVE_RPM_SHARE)))
+
+    def _has_capacity(self, priority: int) -> bool:
+        if self.max_concurrency <= 0:
+            return True
+        limit = self.max_concurrency
+        if priority != PRIORITY_INTERACTIVE:
+            limit -= self.interactive_reserved
+        return self._in_flight < limit
+
+    def _is_next(self, ticket, priority: int) -> bool:
+        """Le ticket est en tête de sa file et aucun appel plus prioritaire n'attend."""
+        if any(self._queues[p] for p in self._queues if p < priority):
+            return False
+        return self._queues[priority][0] is ticket
+
+    def acquire(self, timeout: Optional[float] = None, priority: Optional[int] = None) -> bool:
+        """
+        Réserve une place d'appel, en attendant son tour si les limites sont atteintes.
+
+        Args:
+            timeout: Attente maximale en secondes (None = attendre indéfiniment)
+            priority: Priorité de l'appel (None = priorité du contexte courant)
+
+        Returns:
+            True si la place est obtenue (à rendre via release()), False si le délai a expiré
+        """
+        if priority is None:
+            priority = current_priority()
+        if priority not in self._queues:
+            priority = PRIORITY_BACKGROUND
+
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        ticket = object()
+        with self._cond:
+            self._queues[priority].append(ticket)
+            try:
+                while not (self._is_next(ticket, priority) and self._has_capacity(priority)):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._timeouts += 1
+                        return False
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._queues[priority].remove(ticket)
+                self._cond.notify_all()
+
+        # Pause demandée après un 429 de l'API, puis quota par minute
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            if deadline is not None and time.monotonic() + pause > deadline:
+                self._abandon()
+                return False
+            time.sleep(pause)
+
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not self.rate_limiter.acquire(timeout=remaining, reserve=self._rpm_reserve(priority)):
+            self._abandon()
+            return False
+
+        wait = time.monotonic() - start
+        with self._cond:
+            self._acquired[priority] += 1
+            self._total_wait[priority] += wait
+            self._max_wait[priority] = max(self._max_wait[priority], wait)
+        return True
+
+    def _abandon(self) -> None:
+        """Rend une place obtenue sans créneau de quota (délai expiré)."""
+        with self._cond:
+            self._timeouts += 1
+        self.release()
+
+    def release(self) -> None:
+        """Rend une place obtenue par acquire()."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None, priority: Optional[int] = None) -> Iterator[None]:
+        """
+        Place d'appel le temps d'un bloc `with`.
+
+        Args:
+            timeout: Attente maximale en secondes (None = attendre indéfiniment)
+            priority: Priorité de l'appel (None = priorité du contexte courant)
+
+        Raises:
+            GovernorTimeout: Si la place n'est pas obtenue dans le délai
+        """
+        if not self.acquire(timeout, priority):
+            raise GovernorTimeout(f"Aucun créneau {self.name} disponible après {timeout} s")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Suspend les nouveaux appels (l'API a répondu 429) : tous les clients
+        patientent ensemble au lieu de réessayer chacun de leur côté.
+
+        Args:
+            seconds: Durée de la pause
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict:
+        """
+        Métriques du régulateur.
+
+        Returns:
+            Appels en cours, en file d'attente, limites, appels servis,
+            délais dépassés et temps d'attente moyen/maximal (ms), au total
+            et par priorité ("priorities")
+        """
+        with self._cond:
+            acquired = sum(self._acquired.values())
+            total_wait = sum(self._total_wait.values())
+            return {
+                "in_flight": self._in_flight,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "max_concurrency": self.max_concurrency,
+                "interactive_reserved": self.interactive_reserved,
+                "requests_per_minute": self.rate_limiter.requests_per_minute,
+                "acquired": acquired,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(1000 * total_wait / acquired, 1) if acquired else 0.0,
+                "max_wait_ms": round(1000 * max(self._max_wait.values()), 1),
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                "priorities": {
+                    name: {
+                        "queued": len(self._queues[priority]),
+                        "acquired": self._acquired[priority],
+                        "avg_wait_ms": (
+                            round(1000 * self._total_wait[priority] / self._acquired[priority], 1)
+                            if self._acquired[priority] else 0.0
+                        ),
+                        "max_wait_ms": round(1000 * self._max_wait[priority], 1),
+                    }
+                    for priority, name in PRIORITY_NAMES.items()
+                },
+            }
+
+
+_governors: Dict[str, Governor] = {}
+
+
+def get_governor(name: str = ALBERT_RATE_LIMITER, max_concurrency: Optional[int] = None) -> Governor:
+    """
+    Retourne le régulateur partagé associé à une API, en le créant au premier appel.
+
+    Args:
+        name: Nom de l'API (ex: "albert")
+        max_concurrency: Appels simultanés à la création
+            (sinon variable d'env <NOM>_MAX_CONCURRENCY, sinon DEFAULT_MAX_CONCURRENCY).
+            Les places réservées aux questions viennent de <NOM>_INTERACTIVE_RESERVED.
+
+    Returns:
+        Governor partagé par tout le processus (quota par minute de get_rate_limiter(name))
+    """
+    rate_limiter = get_rate_limiter(name)
+    with _limiters_lock:
+        if name not in _governors:
+            if max_concurrency is None:
+                max_concurrency = _env_int(
+                    f"{name.upper()}_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY
+                )
+            interactive_reserved = _env_int(
+                f"{name.upper()}_INTERACTIVE_RESERVED", DEFAULT_INTERACTIVE_RESERVED
+            )
+            _governors[name] = Governor(name, rate_limiter, max_concurrency, interactive_reserved)
+        return _governors[name]
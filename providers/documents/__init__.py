@@ -0,0 +1,30 @@
+from .artifacts import ArtifactStore, ExtractionArtifact
+from .docx_extractor import (
+    DocxContent,
+    DocxImageRef,
+    extract_docx,
+    iter_docx_blocks,
+    iter_docx_parts,
+)
+from .pdf_tables import (
+    PdfContent,
+    PdfTable,
+    extract_pdf,
+    find_page_tables,
+    generate_table_chunks,
+)
+
+__all__ = [
+    "ArtifactStore",
+    "ExtractionArtifact",
+    "DocxContent",
+    "DocxImageRef",
+    "extract_docx",
+    "iter_docx_blocks",
+    "iter_docx_parts",
+    "PdfContent",
+    "PdfTable",
+    "extract_pdf",
+    "find_page_tables",
+    "generate_table_chunks",
+]
@@ -0,0 +1,136 @@
+"""
+Stockage des résultats d'extraction par document.
+Le texte extrait, le découpage en pages et les chunks produits localement
+(tableaux) ou par la vision (images) sont conservés sur disque, compressés
+(JSON + gzip) et indexés par l'empreinte SHA-256 du fichier : re-découper un
+document ne demande ni nouvelle extraction ni nouvel appel vision.
+"""
+
+import os
+import gzip
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+from typing import List, Optional
+
+
+ARTIFACT_VERSION = 1
+
+
+@dataclass
+class ExtractionArtifact:
+    """Résultat d'extraction d'un document, indépendant du découpage en chunks."""
+    content_hash: str                     # SHA-256 du fichier source
+    filename: str                         # Nom du document à l'extraction
+    text: str                             # Texte extrait (hors tableaux natifs pour les PDF)
+    page_starts: List[int] = field(default_factory=list)  # Position de début de chaque page dans text
+    table_chunks: List[dict] = field(default_factory=list)  # Chunks des tableaux natifs (texte + métadonnées)
+    image_chunks: Optional[List[dict]] = None  # Chunks des images ; None tant que la vision n'a pas tourné
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    version: int = ARTIFACT_VERSION
+
+
+def _strip_chunk(chunk: dict) -> dict:
+    """Garde le texte et les métadonnées d'un chunk (ni embedding ni identifiant)."""
+    return {"text": chunk["text"], "metadata": dict(chunk.get("metadata", {}))}
+
+
+class ArtifactStore:
+    """
+    Répertoire d'artefacts d'extraction, un fichier `<sha256>.json.gz` par document.
+    Thread-safe : les tâches d'indexation en arrière-plan y ajoutent les chunks d'images.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialise le stockage.
+
+        Args:
+            directory: Répertoire des artefacts (créé si besoin)
+        """
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}.json.gz")
+
+    def save(self, artifact: ExtractionArtifact) -> None:
+        """
+        Enregistre un artefact (remplace l'éventuelle version précédente).
+
+        Args:
+            artifact: Artefact à enregistrer
+        """
+        data = asdict(artifact)
+        data["table_chunks"] = [_strip_chunk(c) for c in artifact.table_chunks]
+        if artifact.image_chunks is not None:
+            data["image_chunks"] = [_strip_chunk(c) for c in artifact.image_chunks]
+
+        path = self._path(artifact.content_hash)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def load(self, content_hash: str) -> Optional[ExtractionArtifact]:
+        """
+        Charge l'artefact d'un document.
+
+        Args:
+            content_hash: Empreinte SHA-256 du fichier
+
+        Returns:
+            ExtractionArtifact, ou None s'il est absent ou illisible
+        """
+        path = self._path(content_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logging.warning(f"Artefact illisible {path}: {e}")
+            return None
+
+        if data.get("version") != ARTIFACT_VERSION:
+            return None
+        known = {f.name for f in fields(ExtractionArtifact)}
+        return ExtractionArtifact(**{k: v for k, v in data.items() if k in known})
+
+    def set_image_chunks(self, content_hash: str, image_chunks: List[dict]) -> bool:
+        """
+        Ajoute les chunks d'images à un artefact existant.
+
+        Args:
+            content_hash: Empreinte SHA-256 du fichier
+            image_chunks: Chunks produits par l'analyse vision
+
+        Returns:
+            True si l'artefact existait et a été mis à jour
+        """
+        with self._lock:
+            artifact = self.load(content_hash)
+            if artifact is None:
+                return False
+            artifact.image_chunks = image_chunks
+            self.save(artifact)
+        return True
+
+    def delete(self, content_hash: str) -> None:
+        """Supprime l'artefact d'un document, s'il existe."""
+        with self._lock:
+            try:
+                os.remove(self._path(content_hash))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Supprime tous les artefacts."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json.gz"):
+                    os.remove(os.path.join(self.directory, name))
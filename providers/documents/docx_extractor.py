@@ -0,0 +1,255 @@
+"""
+Extraction en flux du texte d'un fichier DOCX.
+Lit directement `word/document.xml` dans le paquet OOXML (zip) avec iterparse,
+sans construire le modèle objet python-docx.
+"""
+
+import io
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+
+# Espaces de noms OOXML
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+V_NS = "urn:schemas-microsoft-com:vml"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+DOCUMENT_PART = "word/document.xml"
+DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+
+_W_P = f"{{{W_NS}}}p"
+_W_T = f"{{{W_NS}}}t"
+_W_TAB = f"{{{W_NS}}}tab"
+_W_BR = f"{{{W_NS}}}br"
+_W_CR = f"{{{W_NS}}}cr"
+_W_TBL = f"{{{W_NS}}}tbl"
+_W_TR = f"{{{W_NS}}}tr"
+_W_TC = f"{{{W_NS}}}tc"
+_W_BODY = f"{{{W_NS}}}body"
+_A_BLIP = f"{{{A_NS}}}blip"
+_V_IMAGEDATA = f"{{{V_NS}}}imagedata"
+_MC_ALTERNATE = f"{{{MC_NS}}}AlternateContent"
+_MC_CHOICE = f"{{{MC_NS}}}Choice"
+_MC_FALLBACK = f"{{{MC_NS}}}Fallback"
+_R_EMBED = f"{{{R_NS}}}embed"
+_R_ID = f"{{{R_NS}}}id"
+
+
+@dataclass
+class DocxImageRef:
+    """Référence vers une image insérée dans le document."""
+    rel_id: str                # Identifiant de relation (rId...)
+    target: str                # Chemin de l'image dans le paquet (ex: word/media/image1.png)
+    block_index: int           # Nombre de blocs de texte émis avant l'image
+
+
+@dataclass
+class DocxContent:
+    """Contenu extrait d'un DOCX, dans l'ordre du document."""
+    blocks: List[str] = field(default_factory=list)      # Paragraphes et lignes de tableaux
+    images: List[DocxImageRef] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Texte complet (un bloc par ligne)."""
+        return "\n".join(self.blocks)
+
+
+def iter_docx_blocks(file_bytes: bytes) -> Iterator[Tuple[str, str]]:
+    """
+    Parcourt `word/document.xml` en flux et émet les blocs dans l'ordre du document.
+
+    Les paragraphes sont émis tels quels, les lignes de tableaux sous la forme
+    "cellule | cellule | ...". Les éléments déjà traités sont libérés au fur
+    et à mesure, la mémoire reste donc stable quelle que soit la taille du document.
+
+    Args:
+        file_bytes: Contenu du fichier DOCX
+
+    Yields:
+        Tuples ("text", texte) ou ("image", rel_id)
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as package:
+        with package.open(DOCUMENT_PART) as xml_stream:
+            yield from _iter_blocks(xml_stream)
+
+
+def _iter_blocks(xml_stream) -> Iterator[Tuple[str, str]]:
+    """Machine à états iterparse sur le flux XML du corps du document."""
+    body = None
+    paragraph_stack: List[List[str]] = []   # Runs des paragraphes ouverts
+    cell_stack: List[List[str]] = []        # Paragraphes des cellules ouvertes
+    row_stack: List[List[str]] = []         # Cellules des lignes ouvertes
+    table_depth = 0
+    # mc:AlternateContent : une zone de texte est écrite deux fois (mc:Choice en
+    # DrawingML, mc:Fallback en VML). Seul mc:Choice est lu quand il est présent.
+    alternate_stack: List[bool] = []        # mc:Choice déjà vu, par AlternateContent ouvert
+    skip_depth = 0                          # Profondeur de mc:Fallback ignorés
+
+    for event, elem in ET.iterparse(xml_stream, events=("start", "end")):
+        tag = elem.tag
+
+        if skip_depth:
+            if tag == _MC_FALLBACK:
+                skip_depth += 1 if event == "start" else -1
+            continue
+
+        if tag == _MC_ALTERNATE:
+            if event == "start":
+                alternate_stack.append(False)
+            else:
+                alternate_stack.pop()
+            continue
+        if tag == _MC_CHOICE:
+            if event == "start" and alternate_stack:
+                alternate_stack[-1] = True
+            continue
+        if tag == _MC_FALLBACK:
+            if event == "start" and alternate_stack and alternate_stack[-1]:
+                skip_depth = 1
+            continue
+
+        if event == "start":
+            if tag == _W_P:
+                paragraph_stack.append([])
+            elif tag == _W_TBL:
+                table_depth += 1
+            elif tag == _W_TR:
+                row_stack.append([])
+            elif tag == _W_TC:
+                cell_stack.append([])
+            elif tag == _W_BODY:
+                body = elem
+            continue
+
+        # event == "end"
+        if tag == _W_T:
+            if paragraph_stack and elem.text:
+                paragraph_stack[-1].append(elem.text)
+        elif tag == _W_TAB:
+            if paragraph_stack:
+                paragraph_stack[-1].append("\t")
+        elif tag in (_W_BR, _W_CR):
+            if paragraph_stack:
+                paragraph_stack[-1].append("\n")
+        elif tag == _A_BLIP:
+            rel_id = elem.get(_R_EMBED)
+            if rel_id:
+                yield "image", rel_id
+        elif tag == _V_IMAGEDATA:
+            rel_id = elem.get(_R_ID)
+            if rel_id:
+                yield "image", rel_id
+        elif tag == _W_P:
+            text = "".join(paragraph_stack.pop())
+            if cell_stack:
+                cell_stack[-1].append(text)
+            elif paragraph_stack:
+                # Paragraphe imbriqué (zone de texte) : rattaché au paragraphe parent
+                paragraph_stack[-1].append(text)
+            elif text.strip():
+                yield "text", text
+        elif tag == _W_TC:
+            cell_text = "\n".join(p for p in cell_stack.pop() if p.strip()).strip()
+            if row_stack:
+                row_stack[-1].append(cell_text)
+        elif tag == _W_TR:
+            row_cells = row_stack.pop()
+            row_text = " | ".join(row_cells)
+            if cell_stack:
+                # Tableau imbriqué dans une cellule
+                cell_stack[-1].append(row_text)
+            elif row_text.strip(" |"):
+                yield "text", row_text
+        elif tag == _W_TBL:
+            table_depth -= 1
+
+        # Libérer les éléments déjà traités
+        if tag in (_W_P, _W_TR):
+            elem.clear()
+        if body is not None and table_depth == 0 and tag in (_W_P, _W_TBL) and not paragraph_stack:
+            body.clear()
+
+
+def read_docx_relationships(package: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    Lit les relations internes du document principal.
+
+    Args:
+        package: Paquet DOCX ouvert
+
+    Returns:
+        Dictionnaire rel_id -> chemin de la cible dans le paquet
+    """
+    try:
+        rels_xml = package.read(DOCUMENT_RELS_PART)
+    except KeyError:
+        return {}
+
+    relationships = {}
+    for rel in ET.fromstring(rels_xml).iter(f"{{{PKG_REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            part_name = target.lstrip("/")
+        else:
+            part_name = posixpath.normpath(posixpath.join("word", target))
+        relationships[rel.get("Id")] = part_name
+    return relationships
+
+
+def extract_docx(file_bytes: bytes) -> DocxContent:
+    """
+    Extrait en une seule passe le texte (paragraphes et tableaux dans l'ordre)
+    et les références des images d'un fichier DOCX.
+
+    Args:
+        file_bytes: Contenu du fichier DOCX
+
+    Returns:
+        DocxContent avec les blocs de texte et les images
+    """
+    content = DocxContent()
+
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as package:
+        relationships = read_docx_relationships(package)
+
+        with package.open(DOCUMENT_PART) as xml_stream:
+            for kind, value in _iter_blocks(xml_stream):
+                if kind == "text":
+                    content.blocks.append(value)
+                elif value in relationships:
+                    content.images.append(DocxImageRef(
+                        rel_id=value,
+                        target=relationships[value],
+                        block_index=len(content.blocks),
+                    ))
+
+    return content
+
+
+def iter_docx_parts(file_bytes: bytes, part_names: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Lit des parties du paquet DOCX (ex: les images référencées par DocxImageRef.target)
+    en n'ouvrant l'archive qu'une seule fois.
+
+    Args:
+        file_bytes: Contenu du fichier DOCX
+        part_names: Chemins des parties dans le zip
+
+    Yields:
+        Tuples (chemin, contenu binaire) ; les parties absentes sont ignorées
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as package:
+        for part_name in part_names:
+            try:
+                yield part_name, package.read(part_name)
+            except KeyError:
+                continue
@@ -0,0 +1,217 @@
+"""
+Extraction locale des tableaux natifs d'un PDF.
+Les tableaux dessinés en texte vectoriel sont détectés avec le détecteur de
+tableaux de PyMuPDF (`page.find_tables`) et convertis en Markdown, sans appel
+vision. Le texte de la page est extrait hors des zones de tableaux, pour ne
+pas indexer deux fois leur contenu (une fois aplati, une fois structuré).
+La vision reste réservée aux tableaux rastérisés (images, pages numérisées).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+
+MIN_TABLE_ROWS = 2         # En dessous : simple ligne encadrée, pas un tableau
+MIN_TABLE_COLS = 2
+MAX_TABLE_CHUNK_CHARS = 4000  # Un grand tableau est découpé (en-tête répété)
+
+
+@dataclass
+class PdfTable:
+    """Tableau natif détecté sur une page."""
+    page_number: int           # Numéro de page (1-indexed)
+    table_index: int           # Index du tableau sur la page
+    bbox: Tuple[float, float, float, float]  # Bounding box (x0, y0, x1, y1)
+    rows: List[List[str]]      # Cellules nettoyées, première ligne = en-tête
+
+    @property
+    def markdown(self) -> str:
+        """Tableau au format Markdown."""
+        return rows_to_markdown(self.rows)
+
+
+@dataclass
+class PdfContent:
+    """Contenu extrait d'un PDF : texte hors tableaux et tableaux natifs."""
+    text: str = ""
+    tables: List[PdfTable] = field(default_factory=list)
+    page_starts: List[int] = field(default_factory=list)  # Position de début de chaque page dans text
+
+
+def _clean_cell(value: Optional[str]) -> str:
+    """Normalise une cellule pour le Markdown (retours à la ligne, barres verticales)."""
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).replace("|", "\\|")
+
+
+def rows_to_markdown(rows: Sequence[Sequence[str]]) -> str:
+    """
+    Convertit des lignes de cellules en tableau Markdown.
+
+    Args:
+        rows: Lignes du tableau, la première servant d'en-tête
+
+    Returns:
+        Tableau Markdown (chaîne vide si aucune ligne)
+    """
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        cells = list(row) + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            lines.append("|" + "|".join(["---"] * width) + "|")
+    return "\n".join(lines)
+
+
+def find_page_tables(
+    page: "fitz.Page",
+    min_rows: int = MIN_TABLE_ROWS,
+    min_cols: int = MIN_TABLE_COLS,
+) -> List[PdfTable]:
+    """
+    Détecte les tableaux natifs d'une page.
+
+    Args:
+        page: Page PyMuPDF
+        min_rows: Nombre minimal de lignes non vides
+        min_cols: Nombre minimal de colonnes
+
+    Returns:
+        Tableaux détectés, dans l'ordre de la page
+    """
+    try:
+        finder = page.find_tables()
+    except Exception as e:
+        # PyMuPDF < 1.23 (pas de find_tables) ou page mal formée
+        logging.debug(f"Détection de tableaux indisponible page {page.number + 1}: {e}")
+        return []
+
+    tables = []
+    for table in finder.tables:
+        try:
+            rows = [[_clean_cell(cell) for cell in row] for row in table.extract()]
+        except Exception as e:
+            logging.warning(f"Erreur lecture tableau page {page.number + 1}: {e}")
+            continue
+
+        rows = [row for row in rows if any(row)]
+        if len(rows) < min_rows or table.col_count < min_cols:
+            continue
+
+        tables.append(PdfTable(
+            page_number=page.number + 1,
+            table_index=len(tables),
+            bbox=tuple(table.bbox),
+            rows=rows,
+        ))
+    return tables
+
+
+def _text_outside(page: "fitz.Page", tables: List[PdfTable]) -> str:
+    """Texte de la page sans les blocs situés dans un tableau."""
+    if not tables:
+        return page.get_text()
+
+    table_rects = [fitz.Rect(table.bbox) for table in tables]
+    parts = []
+    for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+        if block_type != 0:
+            continue
+        center = fitz.Point((x0 + x1) / 2, (y0 + y1) / 2)
+        if any(center in rect for rect in table_rects):
+            continue
+        parts.append(text if text.endswith("\n") else text + "\n")
+    return "".join(parts)
+
+
+def extract_pdf(
+    pdf_bytes: bytes,
+    extract_tables: bool = True,
+    min_rows: int = MIN_TABLE_ROWS,
+    min_cols: int = MIN_TABLE_COLS,
+) -> PdfContent:
+    """
+    Extrait le texte et les tableaux natifs d'un PDF.
+
+    Sans tableau détecté, le texte d'une page est identique à `page.get_text()`.
+
+    Args:
+        pdf_bytes: Contenu du fichier PDF
+        extract_tables: Détecter les tableaux (sinon texte brut de chaque page)
+        min_rows: Nombre minimal de lignes d'un tableau
+        min_cols: Nombre minimal de colonnes d'un tableau
+
+    Returns:
+        PdfContent (texte hors tableaux, tableaux, début de chaque page)
+    """
+    content = PdfContent()
+    parts = []
+    offset = 0
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            tables = find_page_tables(page, min_rows, min_cols) if extract_tables else []
+            page_text = _text_outside(page, tables)
+            content.page_starts.append(offset)
+            offset += len(page_text)
+            parts.append(page_text)
+            content.tables.extend(tables)
+    content.text = "".join(parts)
+    return content
+
+
+def generate_table_chunks(
+    tables: List[PdfTable],
+    document_name: str,
+    max_chars: int = MAX_TABLE_CHUNK_CHARS,
+) -> List[dict]:
+    """
+    Génère les chunks d'indexation des tableaux natifs.
+    Un tableau trop long est découpé par groupes de lignes, l'en-tête étant
+    répété dans chaque chunk.
+
+    Args:
+        tables: Tableaux extraits par extract_pdf
+        document_name: Nom du document source
+        max_chars: Taille maximale du Markdown d'un chunk
+
+    Returns:
+        Liste de chunks pour l'indexation (même format que les chunks d'images)
+    """
+    chunks = []
+    for table in tables:
+        header, body = table.rows[0], table.rows[1:]
+        label = f"[TABLEAU - Page {table.page_number}]"
+
+        header_size = len(rows_to_markdown([header]))
+        groups: List[List[List[str]]] = [[]]
+        size = header_size
+        for row in body:
+            row_size = len(" | ".join(row)) + 5  # "| " + cellules + " |" + saut de ligne
+            if groups[-1] and size + row_size > max_chars:
+                groups.append([])
+                size = header_size
+            groups[-1].append(row)
+            size += row_size
+
+        for part, rows in enumerate(groups):
+            chunks.append({
+                "text": f"{label}\n{rows_to_markdown([header] + rows)}",
+                "metadata": {
+                    "filename": document_name,
+                    "page": table.page_number,
+                    "pages": str(table.page_number),
+                    "type": "table",
+                    "is_visual_content": False,
+                    "extraction": "native",
+                    "table_index": table.table_index,
+                    "table_part": part,
+                },
+            })
+    return chunks
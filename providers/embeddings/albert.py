@@ -5,11 +5,19 @@ Gere les limites de tokens par batch processing.
 """
 
 import os
+import re
 import time
 import logging
 from typing import List, Optional
 import requests
 from .base import EmbeddingProvider
+from ..concurrency import get_governor
+from ..http_pool import get_http_session
+
+
+# Compilés une fois à l'import (appelés pour chaque texte encodé)
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+_WHITESPACE = re.compile(r'\s+')
 
 
 class AlbertEmbeddings(EmbeddingProvider):
@@ -54,14 +62,15 @@ class AlbertEmbeddings(EmbeddingProvider):
         self._model = model
         self._max_chars = max_chars_per_text
         self._batch_size = batch_size
+        # Connexions keep-alive partagées avec les autres clients du même hôte
+        self._session = get_http_session(self._base_url)
 
     def _clean_text(self, text: str) -> str:
         """Nettoie un texte pour l'API (caractères spéciaux, etc.)."""
-        import re
         # Remplacer les caractères de contrôle problématiques
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', ' ', text)
+        text = _CONTROL_CHARS.sub(' ', text)
         # Normaliser les espaces multiples
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
         # Supprimer les espaces en début/fin
         return text.strip()
 
@@ -86,25 +95,28 @@ class AlbertEmbeddings(EmbeddingProvider):
         Avec retry automatique en cas d'erreur.
         """
         try:
-            response = requests.post(
-                f"{self._base_url}/embeddings",
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self._model,
-                    "input": input_data,
-                    "encoding_format": "float",
-                },
-                timeout=120,  # Timeout plus long pour les gros batches
-            )
+            # Quota et appels simultanés partagés avec les autres clients Albert du processus
+            with get_governor().slot():
+                response = self._session.post(
+                    f"{self._base_url}/embeddings",
+                    headers={
+                        "Authorization": f"Bearer {self._api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "model": self._model,
+                        "input": input_data,
+                        "encoding_format": "float",
+                    },
+                    timeout=120,  # Timeout plus long pour les gros batches
+                )
             response.raise_for_status()
             return response.json()
 
         except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else 0
-            error_text = e.response.text if e.response else str(e)
+            # Une Response d'erreur est évaluée à False : tester explicitement None
+            status_code = e.response.status_code if e.response is not None else 0
+            error_text = e.response.text if e.response is not None else str(e)
 
             logging.warning(f"Albert API error {status_code}, attempt {attempt}: {error_text[:200]}")
 
@@ -112,11 +124,15 @@ class AlbertEmbeddings(EmbeddingProvider):
             if status_code == 422:
                 raise ValueError(f"Erreur de validation Albert API: {error_text}")
 
-            # Erreur 429 = rate limit, retry avec délai croissant
+            # Erreur 429 = rate limit : pause commune à tous les appels Albert, puis retry
             if status_code == 429 and attempt < self.RETRY_ATTEMPTS:
-                wait_time = self.RETRY_DELAY * (attempt ** 2)  # Backoff exponentiel
+                retry_after = e.response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    wait_time = int(retry_after)
+                else:
+                    wait_time = self.RETRY_DELAY * (attempt ** 2)  # Backoff exponentiel
                 logging.warning(f"Albert API rate limit, waiting {wait_time}s...")
-                time.sleep(wait_time)
+                get_governor().pause(wait_time)
                 return self._call_embeddings_api(input_data, attempt + 1)
 
             # Erreur 5xx ou autre erreur serveur = retry
@@ -0,0 +1,92 @@
+"""
+Connexions HTTP persistantes partagées par hôte.
+Une session `requests` et un client httpx (pour les clients OpenAI) par hôte
+amont sont partagés par tout le processus : les connexions keep-alive sont
+réutilisées d'une requête à l'autre, sans nouvelle poignée de main TLS.
+L'authentification reste portée par chaque requête (en-têtes), si bien que
+des providers configurés avec des clés différentes partagent le même pool.
+"""
+
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from openai import DefaultHttpxClient
+
+
+# Connexions conservées par hôte (au-delà, les connexions supplémentaires sont fermées après usage)
+POOL_MAXSIZE = 16
+
+
+def host_key(base_url: str) -> str:
+    """
+    Retourne l'hôte amont d'une URL (schéma + hôte + port).
+
+    Args:
+        base_url: URL de base d'une API
+
+    Returns:
+        Clé de pool, ex: "https://albert.api.etalab.gouv.fr"
+    """
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+_sessions: Dict[str, requests.Session] = {}
+_clients: Dict[str, DefaultHttpxClient] = {}
+_pool_lock = threading.Lock()
+
+
+def get_http_session(base_url: str) -> requests.Session:
+    """
+    Retourne la session `requests` partagée pour l'hôte d'une URL.
+
+    Args:
+        base_url: URL de base de l'API
+
+    Returns:
+        Session avec pool de connexions keep-alive (thread-safe pour des requêtes simples)
+    """
+    key = host_key(base_url)
+    with _pool_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def get_http_client(base_url: str) -> DefaultHttpxClient:
+    """
+    Retourne le client httpx partagé pour l'hôte d'une URL, à passer aux
+    clients OpenAI (`OpenAI(http_client=...)`).
+
+    Args:
+        base_url: URL de base de l'API
+
+    Returns:
+        Client httpx avec les réglages par défaut du SDK OpenAI
+    """
+    key = host_key(base_url)
+    with _pool_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = DefaultHttpxClient()
+            _clients[key] = client
+        return client
+
+
+def close_http_pools() -> None:
+    """Ferme toutes les connexions partagées (arrêt du processus, tests)."""
+    with _pool_lock:
+        for session in _sessions.values():
+            session.close()
+        for client in _clients.values():
+            client.close()
+        _sessions.clear()
+        _clients.clear()
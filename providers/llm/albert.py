@@ -7,6 +7,8 @@ import os
 from typing import List, Dict, Optional, Generator, Union
 from openai import OpenAI
 from .base import LLMProvider
+from ..concurrency import get_governor
+from ..http_pool import get_http_client
 
 
 class AlbertLLM(LLMProvider):
@@ -48,6 +50,7 @@ class AlbertLLM(LLMProvider):
         self._client = OpenAI(
             api_key=self._api_key,
             base_url=self._base_url,
+            http_client=get_http_client(self._base_url),
         )
 
     def chat(
@@ -81,15 +84,24 @@ class AlbertLLM(LLMProvider):
         if stream:
             return self._stream_response(**kwargs)
         else:
-            response = self._client.chat.completions.create(**kwargs)
+            with get_governor().slot():
+                response = self._client.chat.completions.create(**kwargs)
             return response.choices[0].message.content
 
     def _stream_response(self, **kwargs) -> Generator[str, None, None]:
         """Génère les tokens en streaming."""
-        stream = self._client.chat.completions.create(**kwargs)
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        # La place d'appel est conservée jusqu'à la fin du flux
+        with get_governor().slot():
+            stream = self._client.chat.completions.create(**kwargs)
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Générateur fermé avant la fin : la connexion est fermée, la génération interrompue
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
 
     def complete(
         self,
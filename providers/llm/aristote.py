@@ -7,6 +7,7 @@ import os
 from typing import List, Dict, Optional, Generator, Union
 from openai import OpenAI
 from .base import LLMProvider
+from ..http_pool import get_http_client
 
 
 class AristoteLLM(LLMProvider):
@@ -47,6 +48,7 @@ class AristoteLLM(LLMProvider):
         self._client = OpenAI(
             api_key=self._api_key,
             base_url=self._base_url,
+            http_client=get_http_client(self._base_url),
         )
 
     def chat(
@@ -86,9 +88,15 @@ class AristoteLLM(LLMProvider):
     def _stream_response(self, **kwargs) -> Generator[str, None, None]:
         """Génère les tokens en streaming."""
         stream = self._client.chat.completions.create(**kwargs)
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Générateur fermé avant la fin : la connexion est fermée, la génération interrompue
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
 
     def complete(
         self,
@@ -0,0 +1,117 @@
+"""
+Registre des instances de providers.
+Un provider (client LLM, embeddings, reranking, vision) est construit une
+seule fois par configuration — (provider, modèle, URL de base, empreinte de
+la clé API) — puis réutilisé par toutes les requêtes du processus. Changer un
+réglage donne une nouvelle clé, donc une nouvelle instance ; les instances
+construites avec une clé API remplacée sont retirées via invalidate().
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+# Nombre maximal d'instances conservées (les moins récemment utilisées sont retirées)
+MAX_PROVIDER_INSTANCES = 32
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """
+    Empreinte courte d'une clé API (la clé elle-même n'est jamais utilisée comme clé de cache).
+
+    Args:
+        api_key: Clé API (ou None)
+
+    Returns:
+        16 caractères hexadécimaux, chaîne vide sans clé
+    """
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class ProviderRegistry:
+    """
+    Cache LRU thread-safe d'instances de providers.
+    """
+
+    def __init__(self, max_entries: int = MAX_PROVIDER_INSTANCES):
+        """
+        Initialise le registre.
+
+        Args:
+            max_entries: Nombre maximal d'instances conservées
+        """
+        self.max_entries = max_entries
+        self._instances: "OrderedDict[tuple[str, str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        provider: str,
+        factory: Callable[[], Any],
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Any:
+        """
+        Retourne l'instance correspondant à une configuration, en la construisant au besoin.
+
+        Args:
+            provider: Nom du provider (ex: "albert_llm", "ollama_embeddings")
+            factory: Fonction sans argument construisant l'instance
+            model: Modèle utilisé
+            base_url: URL de base de l'API
+            api_key: Clé API (seule son empreinte est conservée)
+
+        Returns:
+            Instance partagée
+        """
+        key = (provider, model or "", (base_url or "").rstrip("/"), key_fingerprint(api_key))
+        with self._lock:
+            if key in self._instances:
+                self._instances.move_to_end(key)
+                return self._instances[key]
+
+            # Construction sous verrou : deux requêtes simultanées partagent la même instance
+            instance = factory()
+            self._instances[key] = instance
+            while len(self._instances) > self.max_entries:
+                self._instances.popitem(last=False)
+            return instance
+
+    def invalidate(self, provider: Optional[str] = None, api_key: Optional[str] = None) -> int:
+        """
+        Retire des instances du registre.
+
+        Args:
+            provider: Ne retirer que ce provider (None = tous)
+            api_key: Ne retirer que les instances construites avec cette clé (None = toutes)
+
+        Returns:
+            Nombre d'instances retirées
+        """
+        fingerprint = key_fingerprint(api_key) if api_key is not None else None
+        with self._lock:
+            keys = [
+                key for key in self._instances
+                if (provider is None or key[0] == provider)
+                and (fingerprint is None or key[3] == fingerprint)
+            ]
+            for key in keys:
+                del self._instances[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._instances)
+
+
+_registry = ProviderRegistry()
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Retourne le registre de providers partagé par tout le processus."""
+    return _registry
@@ -6,7 +6,8 @@ Permet de réordonner les résultats RAG par pertinence.
 import os
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
-import requests
+from ..concurrency import get_governor
+from ..http_pool import get_http_session
 
 
 @dataclass
@@ -48,6 +49,8 @@ class AlbertReranker:
 
         self._base_url = base_url.rstrip("/")
         self._model = model
+        # Connexions keep-alive partagées avec les autres clients du même hôte
+        self._session = get_http_session(self._base_url)
 
     def rerank(
         self,
@@ -71,20 +74,21 @@ class AlbertReranker:
         if not documents:
             return []
 
-        # Appel à l'API de reranking
-        response = requests.post(
-            f"{self._base_url}/rerank",
-            headers={
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": self._model,
-                "query": query,
-                "documents": documents,
-            },
-            timeout=60,
-        )
+        # Appel à l'API de reranking (quota partagé avec les autres appels Albert)
+        with get_governor().slot():
+            response = self._session.post(
+                f"{self._base_url}/rerank",
+                headers={
+                    "Authorization": f"Bearer {self._api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": self._model,
+                    "query": query,
+                    "documents": documents,
+                },
+                timeout=60,
+            )
         response.raise_for_status()
 
         data = response.json()
@@ -0,0 +1,236 @@
+"""
+Seaux à jetons (token bucket) pour la limitation de débit.
+Chaque clé (client, clé API, session) dispose d'un seau de `capacity` jetons
+rechargé à `refill_rate` jetons par seconde ; une opération consomme `cost`
+jetons. L'état d'un seau tient en deux nombres (jetons, date de mise à jour) :
+chaque décision est en O(1), quel que soit le débit.
+
+Deux stockages :
+- MemoryTokenBucket : dans le processus (un seul worker, applications Streamlit)
+- SQLiteTokenBucket : fichier SQLite partagé, cohérent entre plusieurs workers
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+
+
+DEFAULT_DB_PATH = os.path.join("rate_limit", "token_buckets.sqlite3")
+
+# Nombre maximal de seaux conservés en mémoire (les moins récemment utilisés sont retirés)
+MAX_MEMORY_BUCKETS = 10000
+
+# Délai maximal annoncé avant un nouvel essai (seau sans recharge)
+MAX_RETRY_AFTER = 3600
+
+
+@dataclass
+class BucketDecision:
+    """Résultat d'une demande de jetons."""
+
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Délai d'attente arrondi à la seconde supérieure (en-tête Retry-After)."""
+        if self.allowed:
+            return 0
+        return max(1, math.ceil(min(self.retry_after, MAX_RETRY_AFTER)))
+
+
+def refill(tokens: float, updated_at: float, now: float, capacity: float, refill_rate: float) -> float:
+    """
+    Recharge un seau depuis sa dernière mise à jour.
+
+    Args:
+        tokens: Jetons disponibles à la dernière mise à jour
+        updated_at: Date de la dernière mise à jour (secondes)
+        now: Date courante (secondes)
+        capacity: Nombre maximal de jetons
+        refill_rate: Jetons ajoutés par seconde
+
+    Returns:
+        Jetons disponibles maintenant
+    """
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+
+def consume(tokens: float, cost: float, capacity: float, refill_rate: float) -> Tuple[float, BucketDecision]:
+    """
+    Tente de retirer `cost` jetons d'un seau déjà rechargé.
+
+    Args:
+        tokens: Jetons disponibles
+        cost: Jetons demandés (ramenés à `capacity` : une demande reste toujours satisfiable)
+        capacity: Nombre maximal de jetons
+        refill_rate: Jetons ajoutés par seconde
+
+    Returns:
+        (jetons restants dans le seau, décision)
+    """
+    cost = min(cost, capacity)
+    if tokens >= cost:
+        return tokens - cost, BucketDecision(allowed=True, remaining=tokens - cost)
+    wait = (cost - tokens) / refill_rate if refill_rate > 0 else math.inf
+    return tokens, BucketDecision(allowed=False, remaining=tokens, retry_after=wait)
+
+
+class MemoryTokenBucket:
+    """
+    Seaux à jetons en mémoire, thread-safe.
+    """
+
+    blocking = False
+
+    def __init__(self, capacity: float, refill_rate: float, max_buckets: int = MAX_MEMORY_BUCKETS):
+        """
+        Initialise les seaux.
+
+        Args:
+            capacity: Nombre maximal de jetons par seau (rafale autorisée)
+            refill_rate: Jetons ajoutés par seconde
+            max_buckets: Nombre maximal de seaux conservés
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float = 1.0) -> BucketDecision:
+        """
+        Demande `cost` jetons pour une clé.
+
+        Args:
+            key: Identifiant du seau (client, clé API...)
+            cost: Jetons demandés
+
+        Returns:
+            Décision (autorisé, jetons restants, délai avant nouvel essai)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = refill(tokens, updated_at, now, self.capacity, self.refill_rate)
+            tokens, decision = consume(tokens, cost, self.capacity, self.refill_rate)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Un seau retiré repart plein : seuls les clients inactifs sont concernés
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return decision
+
+
+class SQLiteTokenBucket:
+    """
+    Seaux à jetons dans un fichier SQLite partagé entre processus.
+    Chaque demande est une transaction `BEGIN IMMEDIATE` : les workers d'un
+    même hôte voient et modifient le même état.
+    """
+
+    # Accès disque : à appeler hors de la boucle asyncio
+    blocking = True
+
+    # Une purge des seaux pleins toutes les N demandes
+    PRUNE_EVERY = 1000
+
+    def __init__(self, capacity: float, refill_rate: float, path: str = DEFAULT_DB_PATH):
+        """
+        Initialise les seaux et crée la table si besoin.
+
+        Args:
+            capacity: Nombre maximal de jetons par seau (rafale autorisée)
+            refill_rate: Jetons ajoutés par seconde
+            path: Chemin du fichier SQLite
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def take(self, key: str, cost: float = 1.0) -> BucketDecision:
+        """
+        Demande `cost` jetons pour une clé.
+
+        Args:
+            key: Identifiant du seau (client, clé API...)
+            cost: Jetons demandés
+
+        Returns:
+            Décision (autorisé, jetons restants, délai avant nouvel essai)
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Horloge murale : partagée par tous les processus de l'hôte
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (self.capacity, now)
+                tokens = refill(tokens, updated_at, now, self.capacity, self.refill_rate)
+                tokens, decision = consume(tokens, cost, self.capacity, self.refill_rate)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+
+                self._calls += 1
+                if self._calls % self.PRUNE_EVERY == 0 and self.refill_rate > 0:
+                    # Seaux redevenus pleins : équivalents à une clé absente
+                    conn.execute(
+                        "DELETE FROM buckets WHERE updated_at < ?",
+                        (now - self.capacity / self.refill_rate,),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return decision
+
+    def close(self) -> None:
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_token_bucket(backend: str, capacity: float, refill_rate: float, path: str = DEFAULT_DB_PATH):
+    """
+    Construit le stockage de seaux demandé.
+
+    Args:
+        backend: "memory" ou "sqlite"
+        capacity: Nombre maximal de jetons par seau
+        refill_rate: Jetons ajoutés par seconde
+        path: Chemin du fichier SQLite (backend "sqlite")
+
+    Returns:
+        MemoryTokenBucket ou SQLiteTokenBucket
+
+    Raises:
+        ValueError: Si le backend est inconnu
+    """
+    if backend == "memory":
+        return MemoryTokenBucket(capacity, refill_rate)
+    if backend == "sqlite":
+        return SQLiteTokenBucket(capacity, refill_rate, path)
+    raise ValueError(f"Backend de limitation inconnu: {backend} (memory ou sqlite)")
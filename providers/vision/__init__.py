@@ -1,15 +1,22 @@
 from .albert_vision import AlbertVision
+from .vision_cache import VisionCache, get_vision_cache
 from .pdf_image_extractor import (
     PDFImageExtractor,
     ExtractedImage,
     AnalyzedImage,
+    PageRoute,
     extract_pdf_with_vision,
 )
+from .docx_image_extractor import DOCXImageExtractor
 
 __all__ = [
     "AlbertVision",
+    "VisionCache",
+    "get_vision_cache",
     "PDFImageExtractor",
     "ExtractedImage",
     "AnalyzedImage",
+    "PageRoute",
     "extract_pdf_with_vision",
+    "DOCXImageExtractor",
 ]
@@ -4,11 +4,24 @@ Permet d'analyser les images (tableaux, graphiques) dans les documents.
 """
 
 import os
+import re
+import json
 import base64
+import logging
+import threading
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, List, Optional, Union
 from openai import OpenAI
 
+from ..concurrency import get_governor
+from ..http_pool import get_http_client
+from .image_preprocessing import prepare_image
+from .vision_cache import VisionCache
+
+
+# Objet JSON d'une réponse multi-images (éventuellement entouré de texte ou d'un bloc ```json)
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
 
 class AlbertVision:
     """
@@ -18,11 +31,28 @@ class AlbertVision:
 
     DEFAULT_MODEL = "openweight-medium"  # Anciennement albert-large (multimodal)
 
+    CHART_PROMPT = """Analyse ce graphique en détail :
+1. Type de graphique (barres, lignes, camembert, etc.)
+2. Données représentées (axes, légendes)
+3. Tendances principales
+4. Valeurs remarquables (min, max, moyennes si visibles)
+5. Conclusions ou insights"""
+
+    BATCH_PROMPT = """Tu reçois {count} images numérotées de 1 à {count}.
+Applique à chaque image, séparément, la consigne suivante :
+{prompt}
+
+Réponds uniquement avec un objet JSON de la forme
+{{"images": [{{"index": 1, "description": "..."}}, {{"index": 2, "description": "..."}}]}}
+avec exactement une entrée par image, dans l'ordre."""
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         base_url: str = "https://albert.api.etalab.gouv.fr/v1",
         model: str = DEFAULT_MODEL,
+        cache: Optional[VisionCache] = None,
+        preprocess: bool = True,
     ):
         """
         Initialise le provider de vision Albert.
@@ -31,6 +61,8 @@ class AlbertVision:
             api_key: Clé API Albert (ou variable d'env ALBERT_API_KEY)
             base_url: URL de l'API Albert
             model: Nom du modèle (doit supporter la vision)
+            cache: Cache persistant des analyses (optionnel)
+            preprocess: Réduire et ré-encoder les images avant envoi
         """
         self._api_key = api_key or os.getenv("ALBERT_API_KEY")
         if not self._api_key:
@@ -41,9 +73,14 @@ class AlbertVision:
 
         self._base_url = base_url
         self._model = model
+        self._cache = cache
+        self._preprocess = preprocess
+        self._stats_lock = threading.Lock()
+        self._preprocessing_stats = {"images": 0, "original_bytes": 0, "sent_bytes": 0}
         self._client = OpenAI(
             api_key=self._api_key,
             base_url=self._base_url,
+            http_client=get_http_client(self._base_url),
         )
 
     def analyze_image(
@@ -51,6 +88,8 @@ class AlbertVision:
         image: Union[str, Path, bytes],
         prompt: str = "Décris cette image en détail.",
         max_tokens: int = 1024,
+        timeout: Optional[float] = None,
+        analysis_type: str = "image",
     ) -> str:
         """
         Analyse une image avec le modèle de vision.
@@ -59,32 +98,174 @@ class AlbertVision:
             image: Chemin vers l'image, URL, ou bytes de l'image
             prompt: Question ou instruction pour l'analyse
             max_tokens: Nombre maximum de tokens dans la réponse
+            timeout: Délai maximal de l'appel en secondes (None = délai du client)
+            analysis_type: "table", "chart", "page" ou "image" (résolution conservée)
 
         Returns:
             Description textuelle de l'image
         """
-        image_content = self._prepare_image(image)
-
-        response = self._client.chat.completions.create(
-            model=self._model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        image_content,
-                    ],
-                }
-            ],
-            max_tokens=max_tokens,
-        )
+        # Les images en mémoire sont mises en cache (image + prompt + modèle)
+        cache_key = None
+        if self._cache is not None and isinstance(image, bytes):
+            cache_key = VisionCache.make_key(image, prompt, self._model)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        image_content = self._prepare_image(image, analysis_type)
+
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        # Quota et appels simultanés partagés avec les autres clients Albert du processus
+        # (l'attente d'une place ne compte pas dans `timeout`, qui borne l'appel HTTP)
+        with get_governor().slot():
+            response = self._client.chat.completions.create(
+                model=self._model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            image_content,
+                        ],
+                    }
+                ],
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+
+        content = response.choices[0].message.content
+        if cache_key is not None and content:
+            self._cache.set(cache_key, self._model, content)
+        return content
+
+    def analyze_images(
+        self,
+        images: List[bytes],
+        prompt: str = "Décris cette image en détail.",
+        max_tokens_per_image: int = 512,
+        timeout: Optional[float] = None,
+        analysis_type: str = "image",
+    ) -> List[str]:
+        """
+        Analyse plusieurs images en une seule requête multimodale.
+
+        Le modèle répond en JSON avec une description par image. Les images déjà
+        en cache ne sont pas renvoyées ; chaque description est mise en cache
+        sous la même clé qu'un appel analyze_image avec le même prompt.
+
+        Args:
+            images: Contenus des images
+            prompt: Consigne appliquée à chaque image
+            max_tokens_per_image: Budget de tokens par image
+            timeout: Délai maximal de l'appel en secondes
+            analysis_type: Type d'analyse (résolution conservée)
+
+        Returns:
+            Descriptions, dans l'ordre des images
+
+        Raises:
+            ValueError: Si la réponse ne contient pas une description par image
+        """
+        results: List[Optional[str]] = [None] * len(images)
+        cache_keys: List[Optional[str]] = [None] * len(images)
+
+        if self._cache is not None:
+            for i, image in enumerate(images):
+                cache_keys[i] = VisionCache.make_key(image, prompt, self._model)
+                results[i] = self._cache.get(cache_keys[i])
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = self.analyze_image(
+                images[i], prompt, max_tokens=max_tokens_per_image,
+                timeout=timeout, analysis_type=analysis_type,
+            )
+            return results
+
+        content = [{"type": "text", "text": self.BATCH_PROMPT.format(count=len(pending), prompt=prompt)}]
+        for position, i in enumerate(pending, start=1):
+            content.append({"type": "text", "text": f"Image {position} :"})
+            content.append(self._prepare_image(images[i], analysis_type))
+
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        # Une seule requête (et un seul créneau du quota) pour tout le lot
+        with get_governor().slot():
+            response = self._client.chat.completions.create(
+                model=self._model,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=max_tokens_per_image * len(pending),
+                **kwargs,
+            )
+
+        descriptions = self.parse_batch_response(response.choices[0].message.content, len(pending))
+        for i, description in zip(pending, descriptions):
+            results[i] = description
+            if cache_keys[i] is not None:
+                self._cache.set(cache_keys[i], self._model, description)
+
+        return results
+
+    @staticmethod
+    def parse_batch_response(content: Optional[str], count: int) -> List[str]:
+        """
+        Extrait les descriptions d'une réponse JSON multi-images.
+
+        Args:
+            content: Réponse brute du modèle
+            count: Nombre d'images attendues
 
-        return response.choices[0].message.content
+        Returns:
+            Descriptions, dans l'ordre des index
+
+        Raises:
+            ValueError: Si la réponse est invalide ou incomplète
+        """
+        if not content:
+            raise ValueError("Réponse vide")
+
+        # Tolérer un bloc ```json ... ``` ou du texte autour de l'objet
+        match = _JSON_OBJECT.search(content)
+        if not match:
+            raise ValueError("Aucun objet JSON dans la réponse")
+
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON invalide: {e}")
+
+        entries = data.get("images") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError("Clé 'images' absente")
+
+        descriptions = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index")
+            description = entry.get("description")
+            if isinstance(index, int) and isinstance(description, str) and description.strip():
+                descriptions[index] = description.strip()
+
+        missing = [i for i in range(1, count + 1) if i not in descriptions]
+        if missing:
+            raise ValueError(f"Descriptions manquantes pour les images {missing}")
+
+        return [descriptions[i] for i in range(1, count + 1)]
 
     def analyze_table(
         self,
         image: Union[str, Path, bytes],
         extract_data: bool = True,
+        timeout: Optional[float] = None,
     ) -> str:
         """
         Analyse un tableau dans une image.
@@ -92,6 +273,7 @@ class AlbertVision:
         Args:
             image: Image contenant le tableau
             extract_data: Si True, extrait les données structurées
+            timeout: Délai maximal de l'appel en secondes
 
         Returns:
             Description du tableau ou données extraites en markdown
@@ -107,29 +289,28 @@ Sois précis sur les valeurs numériques."""
 - Combien de lignes et colonnes ?
 - Quelles sont les principales informations ?"""
 
-        return self.analyze_image(image, prompt, max_tokens=2048)
+        return self.analyze_image(
+            image, prompt, max_tokens=2048, timeout=timeout, analysis_type="table"
+        )
 
     def analyze_chart(
         self,
         image: Union[str, Path, bytes],
+        timeout: Optional[float] = None,
     ) -> str:
         """
         Analyse un graphique dans une image.
 
         Args:
             image: Image contenant le graphique
+            timeout: Délai maximal de l'appel en secondes
 
         Returns:
             Description et interprétation du graphique
         """
-        prompt = """Analyse ce graphique en détail :
-1. Type de graphique (barres, lignes, camembert, etc.)
-2. Données représentées (axes, légendes)
-3. Tendances principales
-4. Valeurs remarquables (min, max, moyennes si visibles)
-5. Conclusions ou insights"""
-
-        return self.analyze_image(image, prompt, max_tokens=1536)
+        return self.analyze_image(
+            image, self.CHART_PROMPT, max_tokens=1536, timeout=timeout, analysis_type="chart"
+        )
 
     def extract_text_from_image(
         self,
@@ -148,25 +329,33 @@ Sois précis sur les valeurs numériques."""
 Conserve la mise en forme autant que possible (titres, paragraphes, listes).
 Ne décris pas l'image, retourne uniquement le texte."""
 
-        return self.analyze_image(image, prompt, max_tokens=2048)
+        return self.analyze_image(image, prompt, max_tokens=2048, analysis_type="page")
 
-    def _prepare_image(self, image: Union[str, Path, bytes]) -> dict:
+    def _prepare_image(self, image: Union[str, Path, bytes], analysis_type: str = "image") -> dict:
         """
         Prépare l'image pour l'API (URL ou base64).
 
         Args:
             image: Chemin, URL ou bytes de l'image
+            analysis_type: Type d'analyse, détermine la résolution maximale
 
         Returns:
             Dictionnaire formaté pour l'API OpenAI
         """
         if isinstance(image, bytes):
-            # Image en bytes -> base64
-            b64_image = base64.b64encode(image).decode("utf-8")
+            # Image en bytes -> réduction / ré-encodage puis base64
+            if self._preprocess:
+                prepared = prepare_image(image, analysis_type)
+                self._record_preprocessing(prepared.original_size, len(prepared.data))
+                data, mime_type = prepared.data, prepared.mime_type
+            else:
+                data, mime_type = image, "image/png"
+
+            b64_image = base64.b64encode(data).decode("utf-8")
             return {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/png;base64,{b64_image}",
+                    "url": f"data:{mime_type};base64,{b64_image}",
                 },
             }
 
@@ -205,6 +394,26 @@ Ne décris pas l'image, retourne uniquement le texte."""
             },
         }
 
+    def _record_preprocessing(self, original_bytes: int, sent_bytes: int) -> None:
+        """Comptabilise les octets économisés par la préparation des images."""
+        with self._stats_lock:
+            self._preprocessing_stats["images"] += 1
+            self._preprocessing_stats["original_bytes"] += original_bytes
+            self._preprocessing_stats["sent_bytes"] += sent_bytes
+        if sent_bytes < original_bytes:
+            logging.debug(
+                f"Image préparée: {original_bytes} -> {sent_bytes} octets "
+                f"({original_bytes - sent_bytes} économisés)"
+            )
+
+    @property
+    def preprocessing_stats(self) -> Dict[str, int]:
+        """Octets d'origine, octets envoyés et octets économisés depuis la création."""
+        with self._stats_lock:
+            stats = dict(self._preprocessing_stats)
+        stats["bytes_saved"] = stats["original_bytes"] - stats["sent_bytes"]
+        return stats
+
     @property
     def model_name(self) -> str:
         """Retourne le nom du modèle utilisé."""
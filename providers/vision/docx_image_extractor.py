@@ -0,0 +1,254 @@
+"""
+Module d'extraction et d'analyse des images depuis les fichiers DOCX.
+Les images sont lues dans le paquet OOXML (sans python-docx) puis analysées
+avec le même pipeline que les PDF : filtrage local, regroupement en lots et
+analyse concurrente par Albert Vision.
+"""
+
+import fitz  # PyMuPDF
+import hashlib
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..documents import DocxContent, extract_docx, iter_docx_parts
+
+from .albert_vision import AlbertVision
+from .image_classifier import DECORATIVE, classify_image_bytes
+from .image_preprocessing import read_image_size
+from .pdf_image_extractor import AnalyzedImage, ExtractedImage, PDFImageExtractor
+
+
+class DOCXImageExtractor(PDFImageExtractor):
+    """
+    Extracteur et analyseur d'images pour les documents DOCX.
+
+    Reprend l'analyse de PDFImageExtractor (prompts, lots multi-images,
+    concurrence bornée) ; seule l'extraction diffère. Un DOCX n'étant pas
+    paginé, la position d'une image est le nombre de blocs de texte qui la
+    précèdent (ExtractedImage.positions, page_number vaut 0).
+    """
+
+    def __init__(self, vision_provider: Optional[AlbertVision] = None, **kwargs):
+        """
+        Initialise l'extracteur d'images DOCX.
+
+        Args:
+            vision_provider: Provider de vision Albert (optionnel)
+            **kwargs: Paramètres de PDFImageExtractor (min_width, max_workers, batch_size...)
+        """
+        kwargs["route_pages"] = False
+        super().__init__(vision_provider=vision_provider, **kwargs)
+
+    @staticmethod
+    def _image_info(image_bytes: bytes) -> Optional[Tuple[int, int, str]]:
+        """Dimensions et format d'une image (en-tête, sinon décodage), None si illisible."""
+        size = read_image_size(image_bytes)
+        if size is not None:
+            if image_bytes.startswith(b"\x89PNG"):
+                image_type = "png"
+            elif image_bytes.startswith(b"\xff\xd8"):
+                image_type = "jpeg"
+            elif image_bytes.startswith(b"GIF"):
+                image_type = "gif"
+            else:
+                image_type = "bmp"
+            return size[0], size[1], image_type
+
+        try:
+            pix = fitz.Pixmap(image_bytes)
+            return pix.width, pix.height, "png"
+        except Exception:
+            # EMF, WMF... : non décodables, non analysables par la vision
+            return None
+
+    def iter_images_from_docx(
+        self,
+        docx_bytes: bytes,
+        max_images: int = 50,
+        docx_content: Optional[DocxContent] = None,
+    ) -> Iterator[ExtractedImage]:
+        """
+        Extrait les images significatives d'un DOCX, dans l'ordre du document (générateur).
+
+        Une image insérée plusieurs fois (même partie ou même contenu) n'est
+        émise qu'une fois, avec toutes ses positions. Les dimensions sont lues
+        dans l'en-tête de l'image, sans la décoder.
+
+        Args:
+            docx_bytes: Contenu du fichier DOCX
+            max_images: Nombre maximum d'images distinctes à extraire
+            docx_content: Résultat de extract_docx si déjà calculé
+
+        Yields:
+            Images extraites (distinctes)
+        """
+        try:
+            if docx_content is None:
+                docx_content = extract_docx(docx_bytes)
+        except Exception as e:
+            logging.error(f"Erreur ouverture DOCX: {e}")
+            return
+
+        # Positions de chaque partie image (une image peut être insérée plusieurs fois)
+        positions: Dict[str, List[int]] = {}
+        for ref in docx_content.images:
+            positions.setdefault(ref.target, []).append(ref.block_index)
+
+        by_hash: Dict[str, ExtractedImage] = {}
+        rejected_hashes = set()
+        count = 0
+
+        for target, image_bytes in iter_docx_parts(docx_bytes, list(positions)):
+            try:
+                content_hash = hashlib.sha256(image_bytes).hexdigest()
+                if content_hash in rejected_hashes:
+                    continue
+
+                # Même contenu sous une autre partie : positions rattachées à l'image déjà émise
+                # (y compris une fois le plafond atteint)
+                if content_hash in by_hash:
+                    known = by_hash[content_hash]
+                    known.positions = sorted(set(known.positions) | set(positions[target]))
+                    continue
+                if count >= max_images:
+                    continue
+
+                info = self._image_info(image_bytes)
+                if info is None:
+                    logging.debug(f"Image DOCX ignorée (format non supporté): {target}")
+                    rejected_hashes.add(content_hash)
+                    continue
+                width, height, image_type = info
+
+                # Filtrer les petites images (icônes, puces, logos)
+                if width < self.min_width or height < self.min_height or width * height < self.MIN_IMAGE_AREA:
+                    rejected_hashes.add(content_hash)
+                    continue
+
+                content_class = classify_image_bytes(image_bytes)
+                if self.skip_decorative and content_class == DECORATIVE:
+                    rejected_hashes.add(content_hash)
+                    continue
+
+                image = ExtractedImage(
+                    page_number=0,
+                    image_index=count,
+                    image_bytes=image_bytes,
+                    width=width,
+                    height=height,
+                    image_type=image_type,
+                    bbox=(0, 0, width, height),
+                    content_hash=content_hash,
+                    content_class=content_class,
+                    positions=list(positions[target]),
+                )
+                by_hash[content_hash] = image
+
+            except Exception as e:
+                logging.warning(f"Erreur extraction image DOCX {target}: {e}")
+                continue
+
+            count += 1
+            yield image
+
+    def extract_images_from_docx(
+        self,
+        docx_bytes: bytes,
+        max_images: int = 50,
+        docx_content: Optional[DocxContent] = None,
+    ) -> List[ExtractedImage]:
+        """
+        Extrait toutes les images significatives d'un DOCX.
+
+        Args:
+            docx_bytes: Contenu du fichier DOCX
+            max_images: Nombre maximum d'images distinctes à extraire
+            docx_content: Résultat de extract_docx si déjà calculé
+
+        Returns:
+            Liste des images extraites (distinctes), dans l'ordre du document
+        """
+        return list(self.iter_images_from_docx(docx_bytes, max_images, docx_content))
+
+    def extract_and_analyze_all(
+        self,
+        docx_bytes: bytes,
+        max_images: int = 20,
+        docx_content: Optional[DocxContent] = None,
+    ) -> List[AnalyzedImage]:
+        """
+        Extrait et analyse toutes les images d'un DOCX.
+
+        Args:
+            docx_bytes: Contenu du DOCX
+            max_images: Nombre maximum d'images à traiter
+            docx_content: Résultat de extract_docx si déjà calculé
+
+        Returns:
+            Liste des images analysées, dans l'ordre du document
+        """
+        images = self.iter_images_from_docx(docx_bytes, max_images, docx_content)
+        analyzed = list(self.iter_analyzed_images(images))
+        analyzed.sort(key=lambda a: a.extracted_image.image_index)
+        return analyzed
+
+    def iter_image_chunks(
+        self,
+        docx_bytes: bytes,
+        document_name: str,
+        max_images: int = 20,
+        docx_content: Optional[DocxContent] = None,
+    ) -> Iterator[dict]:
+        """
+        Extrait, analyse et émet les chunks d'images au fil de l'eau.
+
+        Args:
+            docx_bytes: Contenu du DOCX
+            document_name: Nom du document source
+            max_images: Nombre maximum d'images à traiter
+            docx_content: Résultat de extract_docx si déjà calculé
+
+        Yields:
+            Chunks pour l'indexation (voir generate_image_chunks)
+        """
+        # Positions définitives en fin de parcours seulement (settled_after_page vaut None)
+        images = self.iter_images_from_docx(docx_bytes, max_images, docx_content)
+        yield from self._iter_chunks(images, document_name)
+
+    def generate_image_chunks(
+        self,
+        analyzed_images: List[AnalyzedImage],
+        document_name: str,
+    ) -> List[dict]:
+        """
+        Génère des chunks de texte à partir des images analysées.
+
+        Args:
+            analyzed_images: Liste des images analysées
+            document_name: Nom du document source
+
+        Returns:
+            Liste de chunks pour l'indexation
+        """
+        chunks = []
+
+        for img in analyzed_images:
+            image = img.extracted_image
+            label, chunk_type, content = self._chunk_content(img)
+
+            chunks.append({
+                "text": f"[{label} {image.image_index + 1} - Document {document_name}]\n{content}",
+                "metadata": {
+                    "filename": document_name,
+                    "type": chunk_type,
+                    "is_visual_content": True,
+                    "image_index": image.image_index,
+                    "block_index": image.positions[0] if image.positions else 0,
+                    "positions": ",".join(str(p) for p in image.positions),
+                    "width": image.width,
+                    "height": image.height,
+                },
+            })
+
+        return chunks
+
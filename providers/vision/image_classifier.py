@@ -0,0 +1,217 @@
+"""
+Classification locale des images avant analyse vision.
+Calcule des statistiques de pixels sur une version réduite de l'image (histogramme
+de couleurs, densité de contours et de lignes, part de blanc) pour écarter les
+images décoratives et choisir le prompt et le budget de tokens des autres.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Classes retournées par classify_image_bytes
+DECORATIVE = "decorative"  # Fond, bandeau, séparateur, aplat : aucune analyse
+TABLE = "table"            # Grille de lignes horizontales et verticales
+CHART = "chart"            # Fond clair, peu de couleurs (graphiques, schémas)
+PHOTO = "photo"            # Image riche en couleurs : description courte
+
+SAMPLE_SIDE = 256          # Plus grand côté de l'image réduite analysée
+WHITE_LEVEL = 235          # Luminance au-dessus de laquelle un pixel est « blanc »
+EDGE_THRESHOLD = 48        # Gradient minimal pour compter un contour
+LINE_CONTRAST = 12         # Écart minimal entre une ligne et ses voisines
+LINE_COVERAGE = 0.5        # Part de la largeur (ou hauteur) couverte pour compter une ligne
+
+
+@dataclass
+class ImageFeatures:
+    """Statistiques de pixels d'une image réduite."""
+    width: int                 # Largeur d'origine
+    height: int                # Hauteur d'origine
+    whitespace_ratio: float    # Part des pixels quasi blancs
+    color_count: int           # Nombre de couleurs significatives (histogramme 512 cases)
+    dominant_ratio: float      # Part de la couleur dominante
+    saturation: float          # Saturation moyenne (0-1)
+    edge_density: float        # Part des pixels sur un contour
+    horizontal_lines: int      # Lignes horizontales traversant l'image
+    vertical_lines: int        # Lignes verticales traversant l'image
+
+    @property
+    def aspect_ratio(self) -> float:
+        return self.width / self.height if self.height else 1.0
+
+
+def compute_features(image_bytes: bytes, sample_side: int = SAMPLE_SIDE) -> Optional[ImageFeatures]:
+    """
+    Calcule les statistiques de pixels d'une image.
+
+    Args:
+        image_bytes: Contenu de l'image
+        sample_side: Plus grand côté de la version réduite analysée
+
+    Returns:
+        ImageFeatures, ou None si l'image ne peut pas être décodée
+    """
+    try:
+        pix = fitz.Pixmap(image_bytes)
+        width, height = pix.width, pix.height
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n != 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        scale = sample_side / max(width, height)
+        if scale < 1:
+            pix = fitz.Pixmap(pix, max(1, round(width * scale)), max(1, round(height * scale)), None)
+    except Exception:
+        return None
+
+    w, h, stride = pix.width, pix.height, pix.stride
+    samples = pix.samples
+    total = w * h
+
+    # Luminance, histogramme de couleurs et saturation
+    gray = []
+    histogram: Dict[int, int] = {}
+    white = 0
+    saturation_sum = 0
+    for y in range(h):
+        row = samples[y * stride:y * stride + w * 3]
+        gray_row = []
+        for x in range(0, w * 3, 3):
+            r, g, b = row[x], row[x + 1], row[x + 2]
+            lum = (299 * r + 587 * g + 114 * b) // 1000
+            gray_row.append(lum)
+            if lum > WHITE_LEVEL:
+                white += 1
+            saturation_sum += max(r, g, b) - min(r, g, b)
+            key = (r >> 5) << 6 | (g >> 5) << 3 | (b >> 5)
+            histogram[key] = histogram.get(key, 0) + 1
+        gray.append(gray_row)
+
+    min_count = max(1, total // 1000)
+    color_count = sum(1 for count in histogram.values() if count >= min_count)
+    dominant_ratio = max(histogram.values()) / total
+
+    # Contours (gradient horizontal + vertical)
+    edges = 0
+    for y in range(h - 1):
+        row, below = gray[y], gray[y + 1]
+        for x in range(w - 1):
+            if abs(row[x + 1] - row[x]) + abs(below[x] - row[x]) > EDGE_THRESHOLD:
+                edges += 1
+    edge_density = edges / total
+
+    return ImageFeatures(
+        width=width,
+        height=height,
+        whitespace_ratio=white / total,
+        color_count=color_count,
+        dominant_ratio=dominant_ratio,
+        saturation=saturation_sum / total / 255,
+        edge_density=edge_density,
+        horizontal_lines=_count_lines(gray, w, h),
+        vertical_lines=_count_lines([list(col) for col in zip(*gray)], h, w),
+    )
+
+
+def _count_lines(gray, w: int, h: int) -> int:
+    """Compte les lignes (rangées) plus sombres que leurs voisines sur une grande partie de la largeur."""
+    lines = 0
+    previous_is_line = False
+    for y in range(1, h - 1):
+        above, row, below = gray[y - 1], gray[y], gray[y + 1]
+        covered = 0
+        for x in range(w):
+            value = row[x]
+            # Ligne fine (plus sombre que les deux voisines) ou bord d'une ligne épaisse
+            if (above[x] - value > LINE_CONTRAST and below[x] - value >= 0) or \
+               (below[x] - value > LINE_CONTRAST and above[x] - value >= 0):
+                covered += 1
+        is_line = covered >= LINE_COVERAGE * w
+        if is_line and not previous_is_line:
+            lines += 1
+        previous_is_line = is_line
+    return lines
+
+
+def classify_features(features: ImageFeatures) -> str:
+    """
+    Classe une image à partir de ses statistiques de pixels.
+
+    Args:
+        features: Statistiques calculées par compute_features
+
+    Returns:
+        DECORATIVE, TABLE, CHART ou PHOTO
+    """
+    aspect = features.aspect_ratio
+
+    # Bandeaux et séparateurs très allongés : trait isolé, aplat coloré ou image
+    # sans contours. Les frises, diagrammes de Gantt et tableaux larges (fond
+    # clair, plusieurs couleurs et contours) passent aux règles suivantes.
+    if aspect > 6 or aspect < 1 / 6:
+        low_colour = features.color_count <= 2 or (
+            features.dominant_ratio > 0.75 and features.whitespace_ratio < 0.1
+        )
+        if low_colour or features.edge_density < 0.01:
+            return DECORATIVE
+    # Aplats, fonds et dégradés : presque aucun contour et peu de couleurs, ou image presque vide
+    if features.whitespace_ratio > 0.995:
+        return DECORATIVE
+    if features.edge_density < 0.005 and features.color_count <= 16:
+        return DECORATIVE
+    if features.color_count <= 2 and features.edge_density < 0.02:
+        return DECORATIVE
+
+    # Grille : plusieurs lignes dans les deux directions sur fond clair
+    if features.horizontal_lines >= 3 and features.vertical_lines >= 2 and features.whitespace_ratio > 0.4:
+        return TABLE
+
+    # Fond clair et palette réduite : graphique ou schéma
+    if features.whitespace_ratio > 0.45 and features.color_count <= 48:
+        return CHART
+
+    return PHOTO
+
+
+def classify_image_bytes(image_bytes: bytes) -> Optional[str]:
+    """
+    Classe une image à partir de son contenu.
+
+    Args:
+        image_bytes: Contenu de l'image
+
+    Returns:
+        DECORATIVE, TABLE, CHART ou PHOTO, ou None si l'image ne peut pas être décodée
+    """
+    features = compute_features(image_bytes)
+    if features is None:
+        return None
+    return classify_features(features)
+
+
+def evaluate_classifier(samples: Iterable[Tuple[bytes, str]]) -> Dict[str, object]:
+    """
+    Mesure la précision du classifieur sur un jeu d'images étiquetées.
+
+    Args:
+        samples: Couples (contenu de l'image, classe attendue)
+
+    Returns:
+        Dictionnaire avec accuracy, total et confusion {(attendu, prédit): nombre}
+    """
+    confusion: Dict[Tuple[str, str], int] = {}
+    correct = 0
+    total = 0
+    for image_bytes, expected in samples:
+        predicted = classify_image_bytes(image_bytes)
+        confusion[(expected, predicted)] = confusion.get((expected, predicted), 0) + 1
+        correct += predicted == expected
+        total += 1
+
+    return {
+        "accuracy": correct / total if total else 0.0,
+        "total": total,
+        "confusion": confusion,
+    }
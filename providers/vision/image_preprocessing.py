@@ -0,0 +1,179 @@
+"""
+Préparation des images avant envoi au modèle de vision.
+Réduit la résolution selon le type d'analyse et ré-encode l'image dans le format
+le plus compact (PNG ou JPEG) avec PyMuPDF, sans dépendance supplémentaire.
+"""
+
+import logging
+import struct
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Plus grand côté autorisé par type d'analyse (pixels)
+MAX_SIDE_BY_ANALYSIS = {
+    "table": 2048,   # Texte fin des cellules : on garde de la résolution
+    "page": 2048,    # Transcription de pages numérisées
+    "chart": 1536,
+    "image": 1024,   # Description générale
+}
+DEFAULT_MAX_SIDE = 1024
+JPEG_QUALITY = 85
+
+
+@dataclass
+class PreparedImage:
+    """Image prête à être envoyée au modèle de vision."""
+    data: bytes                # Contenu encodé
+    mime_type: str             # Type MIME correspondant à l'encodage
+    width: Optional[int]       # Largeur finale (None si l'image n'a pas pu être décodée)
+    height: Optional[int]      # Hauteur finale
+    original_size: int         # Taille d'origine en octets
+
+    @property
+    def bytes_saved(self) -> int:
+        """Octets économisés par rapport à l'image d'origine."""
+        return self.original_size - len(self.data)
+
+
+def detect_mime_type(image_bytes: bytes, default: str = "image/png") -> str:
+    """
+    Détermine le type MIME d'une image à partir de sa signature.
+
+    Args:
+        image_bytes: Contenu de l'image
+        default: Type retourné si la signature est inconnue
+
+    Returns:
+        Type MIME (image/png, image/jpeg, ...)
+    """
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image_bytes.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return default
+
+
+def read_image_size(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Lit les dimensions d'une image dans son en-tête, sans la décoder.
+
+    Formats reconnus : PNG, JPEG, GIF, BMP. Pour les autres (EMF, WMF, TIFF...),
+    retourne None.
+
+    Args:
+        image_bytes: Contenu de l'image
+
+    Returns:
+        Tuple (largeur, hauteur), ou None si le format ou l'en-tête n'est pas reconnu
+    """
+    try:
+        if image_bytes.startswith(b"\x89PNG\r\n\x1a\n") and image_bytes[12:16] == b"IHDR":
+            return struct.unpack(">II", image_bytes[16:24])
+        if image_bytes.startswith((b"GIF87a", b"GIF89a")):
+            return struct.unpack("<HH", image_bytes[6:10])
+        if image_bytes.startswith(b"BM"):
+            width, height = struct.unpack("<ii", image_bytes[18:26])
+            return width, abs(height)
+        if image_bytes.startswith(b"\xff\xd8"):
+            # Parcours des segments jusqu'au marqueur SOF (Start Of Frame)
+            offset = 2
+            while offset + 9 < len(image_bytes):
+                if image_bytes[offset] != 0xFF:
+                    return None
+                marker = image_bytes[offset + 1]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    offset += 2
+                    continue
+                length = struct.unpack(">H", image_bytes[offset + 2:offset + 4])[0]
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack(">HH", image_bytes[offset + 5:offset + 9])
+                    return width, height
+                offset += 2 + length
+    except struct.error:
+        return None
+    return None
+
+
+def prepare_image(
+    image_bytes: bytes,
+    analysis_type: str = "image",
+    max_side: Optional[int] = None,
+) -> PreparedImage:
+    """
+    Réduit et ré-encode une image pour une requête multimodale.
+
+    L'image est ramenée à un plus grand côté maximal dépendant du type d'analyse,
+    convertie en RVB ou niveaux de gris sans canal alpha, puis encodée en PNG ou
+    JPEG selon le plus compact. Si le résultat n'est pas plus petit qu'un original
+    PNG/JPEG (ou si l'image ne peut pas être décodée), l'original est conservé.
+
+    Args:
+        image_bytes: Contenu de l'image
+        analysis_type: "table", "chart", "page" ou "image"
+        max_side: Plus grand côté maximal (prioritaire sur analysis_type)
+
+    Returns:
+        PreparedImage avec le contenu, le type MIME et les octets économisés
+    """
+    original_size = len(image_bytes)
+    original = PreparedImage(
+        data=image_bytes,
+        mime_type=detect_mime_type(image_bytes),
+        width=None,
+        height=None,
+        original_size=original_size,
+    )
+
+    if max_side is None:
+        max_side = MAX_SIDE_BY_ANALYSIS.get(analysis_type, DEFAULT_MAX_SIDE)
+
+    try:
+        pix = fitz.Pixmap(image_bytes)
+    except Exception as e:
+        logging.debug(f"Image non décodable par PyMuPDF, envoi tel quel: {e}")
+        return original
+
+    original.width, original.height = pix.width, pix.height
+
+    try:
+        # Couleurs : RVB ou niveaux de gris, sans transparence (requis pour JPEG)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+
+        # Réduction du plus grand côté
+        long_side = max(pix.width, pix.height)
+        resized = long_side > max_side
+        if resized:
+            scale = max_side / long_side
+            pix = fitz.Pixmap(pix, max(1, round(pix.width * scale)), max(1, round(pix.height * scale)), None)
+
+        candidates = [
+            (pix.tobytes("png"), "image/png"),
+            (pix.tobytes("jpg", jpg_quality=JPEG_QUALITY), "image/jpeg"),
+        ]
+        data, mime_type = min(candidates, key=lambda candidate: len(candidate[0]))
+
+    except Exception as e:
+        logging.debug(f"Ré-encodage impossible, envoi tel quel: {e}")
+        return original
+
+    # Un original PNG/JPEG déjà plus compact est conservé (le serveur redimensionnera)
+    if len(data) >= original_size and original.mime_type in ("image/png", "image/jpeg"):
+        return original
+
+    return PreparedImage(
+        data=data,
+        mime_type=mime_type,
+        width=pix.width,
+        height=pix.height,
+        original_size=original_size,
+    )
@@ -5,12 +5,20 @@ Utilise PyMuPDF (fitz) pour l'extraction et Albert Vision pour l'analyse.
 
 import fitz  # PyMuPDF
 import io
+import hashlib
+import heapq
 import logging
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 from .albert_vision import AlbertVision
+from .image_classifier import CHART, DECORATIVE, PHOTO, TABLE, classify_image_bytes
+from .vision_cache import VisionCache, get_vision_cache
 
 
 @dataclass
@@ -23,6 +31,28 @@ class ExtractedImage:
     height: int                # Hauteur en pixels
     image_type: str            # Type (png, jpeg, etc.)
     bbox: Tuple[float, float, float, float]  # Bounding box (x0, y0, x1, y1)
+    source: str = "image"      # "image" (image intégrée) ou "page" (rendu de page entière)
+    pages: List[int] = field(default_factory=list)  # Toutes les pages où l'image apparaît
+    content_hash: Optional[str] = None  # SHA-256 du contenu (dédoublonnage)
+    content_class: Optional[str] = None  # Classe locale (table, chart, photo, decorative)
+    positions: List[int] = field(default_factory=list)  # DOCX : blocs de texte précédant chaque occurrence
+    # Pages et positions définitives une fois le parcours au-delà de cette page
+    # (None : seulement à la fin du parcours)
+    settled_after_page: Optional[int] = None
+
+    def __post_init__(self):
+        if not self.pages:
+            self.pages = [self.page_number]
+
+
+@dataclass
+class PageRoute:
+    """Décision de traitement vision pour une page, issue du pré-passage local."""
+    page_number: int           # Numéro de page (1-indexed)
+    route: str                 # "skip", "images" ou "render"
+    text_chars: int            # Nombre de caractères de la couche texte
+    image_coverage: float      # Part de la surface de la page couverte par des images (0-1)
+    image_count: int           # Nombre d'images placées sur la page
 
 
 @dataclass
@@ -46,6 +76,32 @@ class PDFImageExtractor:
     MIN_IMAGE_HEIGHT = 100
     MIN_IMAGE_AREA = 10000  # pixels²
 
+    # Routage par page (pré-passage local, sans appel vision)
+    ROUTE_SKIP = "skip"        # La couche texte suffit (ou page vide)
+    ROUTE_IMAGES = "images"    # Analyser les images intégrées
+    ROUTE_RENDER = "render"    # Page sans texte (scan) : rendu complet envoyé à la vision
+    MIN_TEXT_CHARS = 50        # En dessous, la page est considérée sans couche texte
+    TEXT_COVERED_COVERAGE = 0.85  # Image pleine page + texte = scan déjà océrisé
+    MIN_IMAGE_COVERAGE = 0.02  # Images trop petites sur la page (puces, logos)
+    MIN_DRAWINGS_RENDER = 20   # Tracés vectoriels sur une page sans texte (graphique vectoriel)
+    RENDER_DPI = 150
+
+    # Analyse concurrente (le débit global reste borné par le limiteur Albert partagé)
+    MAX_WORKERS = 4
+
+    # Photos et illustrations : description courte
+    PHOTO_PROMPT = "Décris brièvement cette image de document et les informations utiles qu'elle contient."
+    PHOTO_MAX_TOKENS = 512
+
+    # Requêtes multi-images : petites photos et graphiques regroupés par lot
+    BATCH_SIZE = 4
+    BATCH_MAX_PIXELS = 640 * 640
+    CHART_BATCH_MAX_TOKENS = 768  # Par image
+
+    PAGE_RENDER_PROMPT = """Cette image est une page de document numérisée.
+Retranscris fidèlement tout le texte visible, dans l'ordre de lecture.
+Reproduis les tableaux au format Markdown et décris brièvement les graphiques ou schémas."""
+
     def __init__(
         self,
         vision_provider: Optional[AlbertVision] = None,
@@ -53,6 +109,13 @@ class PDFImageExtractor:
         analyze_charts: bool = True,
         min_width: int = MIN_IMAGE_WIDTH,
         min_height: int = MIN_IMAGE_HEIGHT,
+        route_pages: bool = True,
+        min_text_chars: int = MIN_TEXT_CHARS,
+        render_dpi: int = RENDER_DPI,
+        max_workers: int = MAX_WORKERS,
+        analysis_timeout: Optional[float] = None,
+        skip_decorative: bool = True,
+        batch_size: int = BATCH_SIZE,
     ):
         """
         Initialise l'extracteur d'images PDF.
@@ -63,59 +126,280 @@ class PDFImageExtractor:
             analyze_charts: Analyser les graphiques détectés
             min_width: Largeur minimale des images à extraire
             min_height: Hauteur minimale des images à extraire
+            route_pages: Décider page par page (ignorer / images / rendu) avant la vision
+            min_text_chars: Seuil de caractères en dessous duquel une page est « sans texte »
+            render_dpi: Résolution du rendu des pages sans texte
+            max_workers: Nombre d'analyses vision menées en parallèle (1 = séquentiel)
+            analysis_timeout: Délai maximal d'un appel vision en secondes (None = délai du client)
+            skip_decorative: Écarter les images décoratives (fonds, bandeaux, aplats) avant la vision
+            batch_size: Nombre maximal d'images par requête multi-images (1 = une requête par image)
         """
         self.vision = vision_provider
         self.analyze_tables = analyze_tables
         self.analyze_charts = analyze_charts
         self.min_width = min_width
         self.min_height = min_height
+        self.route_pages = route_pages
+        self.min_text_chars = min_text_chars
+        self.render_dpi = render_dpi
+        self.max_workers = max(1, max_workers)
+        self.analysis_timeout = analysis_timeout
+        self.skip_decorative = skip_decorative
+        self.batch_size = max(1, batch_size)
+
+    def route_page(self, page: "fitz.Page") -> PageRoute:
+        """
+        Décide localement du traitement vision d'une page.
+
+        Mesure la densité de la couche texte et la part de la page couverte
+        par des images, puis choisit :
+        - "render" : page sans texte contenant des images ou des tracés (scan, figure vectorielle)
+        - "images" : page avec texte et figures, seules les images intégrées sont analysées
+        - "skip"   : texte seul, page vide, ou scan déjà océrisé (la couche texte suffit)
+
+        Args:
+            page: Page PyMuPDF
+
+        Returns:
+            PageRoute avec la décision et les mesures
+        """
+        text_chars = len(page.get_text().strip())
+
+        page_area = abs(page.rect)
+        covered = 0.0
+        image_count = 0
+        for info in page.get_image_info():
+            rect = fitz.Rect(info["bbox"]) & page.rect
+            if rect.is_empty:
+                continue
+            covered += abs(rect)
+            image_count += 1
+        image_coverage = min(covered / page_area, 1.0) if page_area else 0.0
+
+        if text_chars < self.min_text_chars:
+            if image_coverage >= self.MIN_IMAGE_COVERAGE:
+                route = self.ROUTE_RENDER
+            elif len(page.get_drawings()) >= self.MIN_DRAWINGS_RENDER:
+                route = self.ROUTE_RENDER
+            else:
+                route = self.ROUTE_SKIP
+        elif image_coverage >= self.TEXT_COVERED_COVERAGE:
+            # Image pleine page sous une couche texte : le contenu est déjà dans le texte
+            route = self.ROUTE_SKIP
+        elif image_coverage >= self.MIN_IMAGE_COVERAGE:
+            route = self.ROUTE_IMAGES
+        else:
+            route = self.ROUTE_SKIP
+
+        return PageRoute(
+            page_number=page.number + 1,
+            route=route,
+            text_chars=text_chars,
+            image_coverage=image_coverage,
+            image_count=image_count,
+        )
+
+    def plan_pages(self, pdf_bytes: bytes) -> List[PageRoute]:
+        """
+        Calcule la décision de routage de chaque page du PDF.
+
+        Args:
+            pdf_bytes: Contenu du fichier PDF
+
+        Returns:
+            Liste des décisions, dans l'ordre des pages
+        """
+        routes = []
+        try:
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+                for page in doc:
+                    routes.append(self.route_page(page))
+        except Exception as e:
+            logging.error(f"Erreur ouverture PDF: {e}")
+        return routes
+
+    def render_pages(
+        self,
+        pdf_bytes: bytes,
+        page_numbers: Iterable[int],
+        max_pages: int = 20,
+    ) -> List[ExtractedImage]:
+        """
+        Rend des pages entières en PNG pour l'analyse vision.
+
+        Args:
+            pdf_bytes: Contenu du fichier PDF
+            page_numbers: Numéros de pages à rendre (1-indexed)
+            max_pages: Nombre maximum de pages à rendre
+
+        Returns:
+            Liste d'images de pages (source="page")
+        """
+        return list(islice(self.iter_rendered_pages(pdf_bytes, page_numbers), max_pages))
+
+    def iter_rendered_pages(
+        self,
+        pdf_bytes: bytes,
+        page_numbers: Iterable[int],
+    ) -> Iterator[ExtractedImage]:
+        """
+        Rend les pages demandées une à une (générateur).
+
+        Args:
+            pdf_bytes: Contenu du fichier PDF
+            page_numbers: Numéros de pages à rendre (1-indexed), dans l'ordre
+
+        Yields:
+            Images de pages (source="page")
+        """
+        try:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        except Exception as e:
+            logging.error(f"Erreur ouverture PDF: {e}")
+            return
+
+        with doc:
+            for page_number in page_numbers:
+                try:
+                    page = doc[page_number - 1]
+                    pix = page.get_pixmap(dpi=self.render_dpi)
+                    rendered = ExtractedImage(
+                        page_number=page_number,
+                        image_index=0,
+                        image_bytes=pix.tobytes("png"),
+                        width=pix.width,
+                        height=pix.height,
+                        image_type="png",
+                        bbox=tuple(page.rect),
+                        source="page",
+                        settled_after_page=0,
+                    )
+                    pix = None
+                except Exception as e:
+                    logging.warning(f"Erreur rendu page {page_number}: {e}")
+                    continue
+                yield rendered
 
     def extract_images_from_pdf(
         self,
         pdf_bytes: bytes,
         max_images: int = 50,
+        pages: Optional[Iterable[int]] = None,
     ) -> List[ExtractedImage]:
         """
         Extrait toutes les images significatives d'un PDF.
 
+        Les dimensions sont filtrées à partir de la liste des images de la page,
+        avant tout décodage. Une image répétée (même xref ou même contenu, ex: logo,
+        en-tête, filigrane) n'est extraite qu'une fois, avec toutes ses pages.
+
         Args:
             pdf_bytes: Contenu du fichier PDF
-            max_images: Nombre maximum d'images à extraire
+            max_images: Nombre maximum d'images distinctes à extraire
+            pages: Numéros de pages à parcourir (1-indexed), toutes si None
 
         Returns:
-            Liste des images extraites
+            Liste des images extraites (distinctes)
+        """
+        return list(self.iter_images_from_pdf(pdf_bytes, max_images, pages))
+
+    def iter_images_from_pdf(
+        self,
+        pdf_bytes: bytes,
+        max_images: int = 50,
+        pages: Optional[Iterable[int]] = None,
+    ) -> Iterator[ExtractedImage]:
         """
-        images = []
+        Extrait les images significatives au fil des pages (générateur).
+
+        Un premier passage sur la liste des images (métadonnées seules) associe
+        chaque xref à toutes ses pages ; les octets ne sont ensuite décodés qu'au
+        moment où l'image est émise. Voir extract_images_from_pdf pour les filtres.
+
+        Args:
+            pdf_bytes: Contenu du fichier PDF
+            max_images: Nombre maximum d'images distinctes à extraire
+            pages: Numéros de pages à parcourir (1-indexed), toutes si None
 
+        Yields:
+            Images extraites (distinctes), dans l'ordre des pages
+        """
         try:
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
-            for page_num in range(len(doc)):
+        except Exception as e:
+            logging.error(f"Erreur ouverture PDF: {e}")
+            return
+
+        with doc:
+            page_indexes = range(len(doc)) if pages is None else sorted(p - 1 for p in pages)
+
+            # Passage métadonnées : pages de chaque xref (logos, en-têtes répétés) et
+            # dernière page de chaque taille d'image (un même contenu sous un autre
+            # xref a forcément la même taille : voir settled_after_page)
+            xref_pages: Dict[int, List[int]] = {}
+            size_last_page: Dict[Tuple[int, int], int] = {}
+            for page_num in page_indexes:
+                for img_info in doc[page_num].get_images(full=True):
+                    pages_of_xref = xref_pages.setdefault(img_info[0], [])
+                    if page_num + 1 not in pages_of_xref:
+                        pages_of_xref.append(page_num + 1)
+                    size_last_page[(img_info[2], img_info[3])] = page_num + 1
+
+            # Les images retenues gardent leurs octets jusqu'à leur analyse seulement
+            # (voir iter_analyzed_images) ; ces index ne retiennent que l'objet.
+            by_xref: Dict[int, ExtractedImage] = {}
+            by_hash: Dict[str, ExtractedImage] = {}
+            rejected_xrefs = set()
+            rejected_hashes = set()
+            count = 0
+
+            for page_num in page_indexes:
+                if count >= max_images:
+                    break
                 page = doc[page_num]
                 image_list = page.get_images(full=True)
 
                 for img_index, img_info in enumerate(image_list):
-                    if len(images) >= max_images:
+                    if count >= max_images:
                         break
 
                     try:
-                        xref = img_info[0]
-                        base_image = doc.extract_image(xref)
+                        # (xref, smask, width, height, bpc, colorspace, ...)
+                        xref, _, width, height = img_info[:4]
 
-                        if not base_image:
+                        # Image rejetée ou déjà émise (ses pages sont déjà rattachées)
+                        if xref in rejected_xrefs or xref in by_xref:
                             continue
 
-                        width = base_image["width"]
-                        height = base_image["height"]
-
-                        # Filtrer les petites images
+                        # Filtrer les petites images sans décoder leur contenu
                         if width < self.min_width or height < self.min_height:
                             continue
                         if width * height < self.MIN_IMAGE_AREA:
                             continue
 
+                        base_image = doc.extract_image(xref)
+                        if not base_image:
+                            continue
+
                         image_bytes = base_image["image"]
-                        image_type = base_image["ext"]
+                        content_hash = hashlib.sha256(image_bytes).hexdigest()
+
+                        # Même contenu sous un autre xref
+                        if content_hash in by_hash:
+                            by_xref[xref] = by_hash[content_hash]
+                            for page_number in xref_pages[xref]:
+                                self._add_page(by_hash[content_hash], page_number)
+                            continue
+                        if content_hash in rejected_hashes:
+                            rejected_xrefs.add(xref)
+                            continue
+
+                        # Classification locale : les images décoratives ne vont pas à la vision
+                        content_class = classify_image_bytes(image_bytes)
+                        if self.skip_decorative and content_class == DECORATIVE:
+                            rejected_xrefs.add(xref)
+                            rejected_hashes.add(content_hash)
+                            continue
 
                         # Récupérer la bounding box si disponible
                         bbox = (0, 0, width, height)
@@ -123,31 +407,41 @@ class PDFImageExtractor:
                             bbox = tuple(img_rect)
                             break
 
-                        images.append(ExtractedImage(
+                        image = ExtractedImage(
                             page_number=page_num + 1,
                             image_index=img_index,
                             image_bytes=image_bytes,
-                            width=width,
-                            height=height,
-                            image_type=image_type,
+                            width=base_image["width"],
+                            height=base_image["height"],
+                            image_type=base_image["ext"],
                             bbox=bbox,
-                        ))
+                            pages=list(xref_pages[xref]),
+                            content_hash=content_hash,
+                            content_class=content_class,
+                            settled_after_page=size_last_page[(width, height)],
+                        )
+                        base_image = None
+                        by_xref[xref] = image
+                        by_hash[content_hash] = image
 
                     except Exception as e:
                         logging.warning(f"Erreur extraction image page {page_num + 1}: {e}")
                         continue
 
-            doc.close()
-
-        except Exception as e:
-            logging.error(f"Erreur ouverture PDF: {e}")
+                    count += 1
+                    yield image
 
-        return images
+    @staticmethod
+    def _add_page(image: ExtractedImage, page_number: int) -> None:
+        """Rattache une page supplémentaire à une image déjà extraite."""
+        if page_number not in image.pages:
+            image.pages.append(page_number)
 
     def classify_image(self, image: ExtractedImage) -> Tuple[bool, bool]:
         """
         Classifie une image comme tableau et/ou graphique.
-        Heuristique basée sur les dimensions.
+        Utilise le classifieur local de pixels ; heuristique basée sur les
+        dimensions si l'image ne peut pas être décodée.
 
         Args:
             image: Image à classifier
@@ -155,6 +449,10 @@ class PDFImageExtractor:
         Returns:
             Tuple (is_table, is_chart)
         """
+        content_class = self._content_class(image)
+        if content_class is not None:
+            return content_class == TABLE, content_class == CHART
+
         aspect_ratio = image.width / image.height if image.height > 0 else 1
 
         # Heuristiques simples
@@ -166,6 +464,13 @@ class PDFImageExtractor:
 
         return is_likely_table, is_likely_chart
 
+    @staticmethod
+    def _content_class(image: ExtractedImage) -> Optional[str]:
+        """Classe locale de l'image, calculée une seule fois."""
+        if image.content_class is None and image.source == "image":
+            image.content_class = classify_image_bytes(image.image_bytes)
+        return image.content_class
+
     def analyze_image(
         self,
         image: ExtractedImage,
@@ -193,6 +498,9 @@ class PDFImageExtractor:
                 extracted_data=None,
             )
 
+        if image.source == "page":
+            return self._analyze_rendered_page(image)
+
         is_table, is_chart = self.classify_image(image)
 
         if force_table:
@@ -208,7 +516,8 @@ class PDFImageExtractor:
                 # Analyser comme tableau
                 description = self.vision.analyze_table(
                     image.image_bytes,
-                    extract_data=True
+                    extract_data=True,
+                    timeout=self.analysis_timeout,
                 )
                 extracted_data = description  # Le markdown du tableau
                 is_table = True
@@ -216,15 +525,28 @@ class PDFImageExtractor:
 
             elif is_chart and self.analyze_charts:
                 # Analyser comme graphique
-                description = self.vision.analyze_chart(image.image_bytes)
+                description = self.vision.analyze_chart(
+                    image.image_bytes,
+                    timeout=self.analysis_timeout,
+                )
                 is_chart = True
                 is_table = False
 
+            elif image.content_class == PHOTO:
+                # Photo ou illustration : description courte
+                description = self.vision.analyze_image(
+                    image.image_bytes,
+                    prompt=self.PHOTO_PROMPT,
+                    max_tokens=self.PHOTO_MAX_TOKENS,
+                    timeout=self.analysis_timeout,
+                )
+
             else:
                 # Description générale
                 description = self.vision.analyze_image(
                     image.image_bytes,
-                    prompt="Décris cette image de document. Est-ce un tableau, un graphique, ou autre chose ?"
+                    prompt="Décris cette image de document. Est-ce un tableau, un graphique, ou autre chose ?",
+                    timeout=self.analysis_timeout,
                 )
 
         except Exception as e:
@@ -239,6 +561,184 @@ class PDFImageExtractor:
             extracted_data=extracted_data,
         )
 
+    def _analyze_rendered_page(self, image: ExtractedImage) -> AnalyzedImage:
+        """Transcrit une page rendue (scan sans couche texte) avec la vision."""
+        try:
+            description = self.vision.analyze_image(
+                image.image_bytes,
+                prompt=self.PAGE_RENDER_PROMPT,
+                max_tokens=2048,
+                timeout=self.analysis_timeout,
+                analysis_type="page",
+            )
+        except Exception as e:
+            logging.error(f"Erreur analyse page: {e}")
+            description = f"[Erreur d'analyse] Page {image.page_number}"
+
+        return AnalyzedImage(
+            extracted_image=image,
+            description=description,
+            is_table=False,
+            is_chart=False,
+            extracted_data=None,
+        )
+
+    def select_images(
+        self,
+        pdf_bytes: bytes,
+        max_images: int = 20,
+    ) -> List[ExtractedImage]:
+        """
+        Sélectionne les images à envoyer à la vision selon le routage par page.
+
+        Args:
+            pdf_bytes: Contenu du PDF
+            max_images: Nombre maximum d'images à traiter
+
+        Returns:
+            Images intégrées et rendus de pages, dans l'ordre des pages
+        """
+        return list(self.iter_selected_images(pdf_bytes, max_images))
+
+    def iter_selected_images(
+        self,
+        pdf_bytes: bytes,
+        max_images: int = 20,
+    ) -> Iterator[ExtractedImage]:
+        """
+        Émet au fil des pages les images à envoyer à la vision (générateur).
+
+        Args:
+            pdf_bytes: Contenu du PDF
+            max_images: Nombre maximum d'images à traiter
+
+        Yields:
+            Images intégrées et rendus de pages, dans l'ordre des pages
+        """
+        if not self.route_pages:
+            yield from self.iter_images_from_pdf(pdf_bytes, max_images)
+            return
+
+        routes = self.plan_pages(pdf_bytes)
+        image_pages = [r.page_number for r in routes if r.route == self.ROUTE_IMAGES]
+        render_pages = [r.page_number for r in routes if r.route == self.ROUTE_RENDER]
+        skipped = len(routes) - len(image_pages) - len(render_pages)
+        logging.info(
+            f"Routage PDF: {len(image_pages)} page(s) images, "
+            f"{len(render_pages)} page(s) rendues, {skipped} page(s) ignorées"
+        )
+
+        streams = []
+        if render_pages:
+            streams.append(self.iter_rendered_pages(pdf_bytes, render_pages))
+        if image_pages:
+            streams.append(self.iter_images_from_pdf(pdf_bytes, max_images, pages=image_pages))
+
+        # Fusion dans l'ordre des pages, budget commun
+        merged = heapq.merge(*streams, key=lambda img: (img.page_number, img.image_index))
+        yield from islice(merged, max_images)
+
+    def iter_analyzed_images(
+        self,
+        images: Iterable[ExtractedImage],
+        release_bytes: bool = True,
+    ) -> Iterator[AnalyzedImage]:
+        """
+        Analyse des images au fil de l'eau (générateur).
+
+        Les images sont consommées à la demande, regroupées en lots (voir
+        plan_batches) et au plus max_workers lots sont en cours d'analyse :
+        la mémoire dépend de la concurrence, pas du nombre d'images.
+
+        Args:
+            images: Images à analyser (liste ou générateur)
+            release_bytes: Libérer les octets d'une image dès sa description
+                produite (image_bytes vaut alors b"") ; à réserver aux images
+                produites pour l'occasion, pas à celles fournies par l'appelant
+
+        Yields:
+            Images analysées, dans l'ordre de soumission des lots
+        """
+        groups = self._iter_groups(images)
+
+        if self.vision is None or self.max_workers == 1:
+            for group in groups:
+                yield from self._run_group(group, release_bytes)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vision") as executor:
+            in_flight = deque()
+            for group in groups:
+                # Contexte copié : les appels vision gardent la priorité de l'appelant
+                in_flight.append(executor.submit(
+                    contextvars.copy_context().run, self._run_group, group, release_bytes
+                ))
+                while len(in_flight) >= self.max_workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    def iter_image_chunks(
+        self,
+        pdf_bytes: bytes,
+        document_name: str,
+        max_images: int = 20,
+    ) -> Iterator[dict]:
+        """
+        Extrait, analyse et émet les chunks d'images au fil de l'eau.
+        Les premiers chunks sont disponibles avant la fin du parcours du document
+        (voir _iter_chunks).
+
+        Args:
+            pdf_bytes: Contenu du PDF
+            document_name: Nom du document source
+            max_images: Nombre maximum d'images à traiter
+
+        Yields:
+            Chunks pour l'indexation (voir generate_image_chunks)
+        """
+        yield from self._iter_chunks(self.iter_selected_images(pdf_bytes, max_images), document_name)
+
+    def _iter_chunks(self, images: Iterable[ExtractedImage], document_name: str) -> Iterator[dict]:
+        """
+        Analyse des images émises au fil du parcours et émet leurs chunks.
+
+        Une image déjà émise peut encore recevoir des pages (même contenu sous
+        un autre xref, voir _add_page) ou des positions (DOCX) : son chunk
+        n'est émis qu'une fois le parcours au-delà de settled_after_page,
+        ou à la fin du parcours.
+
+        Args:
+            images: Images dans l'ordre des pages (générateur)
+            document_name: Nom du document source
+
+        Yields:
+            Chunks pour l'indexation (voir generate_image_chunks)
+        """
+        scan = {"page": 0, "done": False}
+
+        def tracked_images() -> Iterator[ExtractedImage]:
+            for image in images:
+                # Les pages précédant celle-ci sont entièrement parcourues
+                scan["page"] = image.page_number
+                yield image
+            scan["done"] = True
+
+        pending: List[AnalyzedImage] = []
+        for analyzed in self.iter_analyzed_images(tracked_images()):
+            pending.append(analyzed)
+            settled = [a for a in pending if scan["done"] or self._is_settled(a.extracted_image, scan["page"])]
+            if settled:
+                settled_ids = {id(a) for a in settled}
+                pending = [a for a in pending if id(a) not in settled_ids]
+                yield from self.generate_image_chunks(settled, document_name)
+        yield from self.generate_image_chunks(pending, document_name)
+
+    @staticmethod
+    def _is_settled(image: ExtractedImage, scanned_page: int) -> bool:
+        """Indique si les pages d'une image ne peuvent plus changer."""
+        return image.settled_after_page is not None and scanned_page > image.settled_after_page
+
     def extract_and_analyze_all(
         self,
         pdf_bytes: bytes,
@@ -246,23 +746,139 @@ class PDFImageExtractor:
     ) -> List[AnalyzedImage]:
         """
         Extrait et analyse toutes les images d'un PDF.
+        Avec le routage par page, seules les pages qui apportent une information
+        absente de la couche texte sont envoyées à la vision.
 
         Args:
             pdf_bytes: Contenu du PDF
             max_images: Nombre maximum d'images à traiter
 
         Returns:
-            Liste des images analysées
+            Liste des images analysées, dans l'ordre des pages
         """
-        images = self.extract_images_from_pdf(pdf_bytes, max_images)
+        analyzed = list(self.iter_analyzed_images(self.iter_selected_images(pdf_bytes, max_images)))
+        analyzed.sort(key=lambda a: (a.extracted_image.page_number, a.extracted_image.image_index))
+        return analyzed
 
-        analyzed = []
-        for image in images:
-            analyzed_image = self.analyze_image(image)
-            analyzed.append(analyzed_image)
+    def analyze_images(self, images: List[ExtractedImage]) -> List[AnalyzedImage]:
+        """
+        Analyse une liste d'images, en parallèle si max_workers > 1.
+        Les petites photos et les graphiques sont regroupés en requêtes multi-images.
+        Les erreurs d'un appel n'interrompent pas les autres (voir analyze_image).
+
+        Args:
+            images: Images à analyser
+
+        Returns:
+            Images analysées, dans le même ordre que l'entrée
+        """
+        position = {id(image): i for i, image in enumerate(images)}
+        results: List[Optional[AnalyzedImage]] = [None] * len(images)
+        # Images de l'appelant : leurs octets sont conservés
+        for analyzed in self.iter_analyzed_images(images, release_bytes=False):
+            results[position[id(analyzed.extracted_image)]] = analyzed
+        return results
+
+    def plan_batches(self, images: List[ExtractedImage]) -> List[List[int]]:
+        """
+        Regroupe les images pouvant partager une requête multi-images.
 
+        Seules les petites images de même classe (photo ou graphique) sont
+        regroupées, par lots de batch_size dans l'ordre des pages ; les autres
+        (tableaux, pages rendues, images non classées) restent seules.
+
+        Args:
+            images: Images à analyser
+
+        Returns:
+            Lots d'index dans la liste d'entrée, dans l'ordre de soumission
+        """
+        position = {id(image): i for i, image in enumerate(images)}
+        return [[position[id(image)] for image in group] for group in self._iter_groups(images)]
+
+    def _iter_groups(self, images: Iterable[ExtractedImage]) -> Iterator[List[ExtractedImage]]:
+        """
+        Forme les lots au fil de l'eau : un lot est émis dès qu'il est plein,
+        les lots incomplets à la fin. Au plus un lot ouvert par classe.
+        """
+        open_batches: Dict[str, List[ExtractedImage]] = {}
+
+        for image in images:
+            kind = self._batch_kind(image)
+            if kind is None:
+                yield [image]
+                continue
+            batch = open_batches.setdefault(kind, [])
+            batch.append(image)
+            if len(batch) >= self.batch_size:
+                yield open_batches.pop(kind)
+
+        yield from open_batches.values()
+
+    def _run_group(self, group: List[ExtractedImage], release_bytes: bool = True) -> List[AnalyzedImage]:
+        """Analyse un lot puis, si demandé, libère les octets de ses images."""
+        if len(group) == 1:
+            analyzed = [self.analyze_image(group[0])]
+        else:
+            analyzed = self._analyze_batch(group)
+        if release_bytes:
+            for image in group:
+                image.image_bytes = b""
         return analyzed
 
+    def _batch_kind(self, image: ExtractedImage) -> Optional[str]:
+        """Classe de lot d'une image, ou None si elle doit être analysée seule."""
+        if self.vision is None or self.batch_size == 1 or image.source != "image":
+            return None
+        if image.width * image.height > self.BATCH_MAX_PIXELS:
+            return None
+        content_class = self._content_class(image)
+        if content_class == PHOTO or (content_class == CHART and self.analyze_charts):
+            return content_class
+        return None
+
+    def _analyze_batch(self, batch: List[ExtractedImage]) -> List[AnalyzedImage]:
+        """Analyse un lot en une requête ; repli sur des appels unitaires si la réponse est inexploitable."""
+        is_chart = batch[0].content_class == CHART
+        if is_chart:
+            prompt, max_tokens, analysis_type = self.vision.CHART_PROMPT, self.CHART_BATCH_MAX_TOKENS, "chart"
+        else:
+            prompt, max_tokens, analysis_type = self.PHOTO_PROMPT, self.PHOTO_MAX_TOKENS, "image"
+
+        try:
+            descriptions = self.vision.analyze_images(
+                [image.image_bytes for image in batch],
+                prompt=prompt,
+                max_tokens_per_image=max_tokens,
+                timeout=self.analysis_timeout,
+                analysis_type=analysis_type,
+            )
+        except Exception as e:
+            logging.warning(f"Lot de {len(batch)} images non exploitable, analyse unitaire: {e}")
+            return [self.analyze_image(image) for image in batch]
+
+        return [
+            AnalyzedImage(
+                extracted_image=image,
+                description=description,
+                is_table=False,
+                is_chart=is_chart,
+                extracted_data=None,
+            )
+            for image, description in zip(batch, descriptions)
+        ]
+
+    @staticmethod
+    def _chunk_content(img: AnalyzedImage) -> Tuple[str, str, str]:
+        """Libellé, type de chunk et contenu indexé d'une image analysée."""
+        if img.extracted_image.source == "page":
+            return "PAGE NUMÉRISÉE", "page", img.description
+        if img.is_table and img.extracted_data:
+            return "TABLEAU", "table", img.extracted_data
+        if img.is_chart:
+            return "GRAPHIQUE", "chart", img.description
+        return "IMAGE", "image", img.description
+
     def generate_image_chunks(
         self,
         analyzed_images: List[AnalyzedImage],
@@ -282,22 +898,22 @@ class PDFImageExtractor:
         chunks = []
 
         for img in analyzed_images:
-            # Construire le texte du chunk
-            if img.is_table and img.extracted_data:
-                text = f"[TABLEAU - Page {img.extracted_image.page_number}]\n{img.extracted_data}"
-                chunk_type = "table"
-            elif img.is_chart:
-                text = f"[GRAPHIQUE - Page {img.extracted_image.page_number}]\n{img.description}"
-                chunk_type = "chart"
+            # Une image répétée est indexée une fois, avec toutes ses pages
+            pages = img.extracted_image.pages
+            if len(pages) > 1:
+                location = "Pages " + ", ".join(str(p) for p in pages)
             else:
-                text = f"[IMAGE - Page {img.extracted_image.page_number}]\n{img.description}"
-                chunk_type = "image"
+                location = f"Page {img.extracted_image.page_number}"
+
+            label, chunk_type, content = self._chunk_content(img)
+            text = f"[{label} - {location}]\n{content}"
 
             chunks.append({
                 "text": text,
                 "metadata": {
                     "filename": document_name,
                     "page": img.extracted_image.page_number,
+                    "pages": ",".join(str(p) for p in pages),
                     "type": chunk_type,
                     "is_visual_content": True,
                     "width": img.extracted_image.width,
@@ -313,6 +929,11 @@ def extract_pdf_with_vision(
     document_name: str,
     vision_api_key: Optional[str] = None,
     max_images: int = 20,
+    max_workers: int = PDFImageExtractor.MAX_WORKERS,
+    analysis_timeout: Optional[float] = None,
+    batch_size: int = PDFImageExtractor.BATCH_SIZE,
+    use_cache: bool = True,
+    vision_cache: Optional[VisionCache] = None,
 ) -> Tuple[str, List[dict]]:
     """
     Fonction utilitaire pour extraire le texte ET les images d'un PDF.
@@ -322,6 +943,11 @@ def extract_pdf_with_vision(
         document_name: Nom du document
         vision_api_key: Clé API Albert pour la vision (optionnel)
         max_images: Nombre maximum d'images à analyser
+        max_workers: Nombre d'analyses vision menées en parallèle
+        analysis_timeout: Délai maximal d'un appel vision en secondes
+        batch_size: Nombre maximal d'images par requête multi-images
+        use_cache: Réutiliser les analyses déjà faites (cache persistant)
+        vision_cache: Cache à utiliser (par défaut get_vision_cache())
 
     Returns:
         Tuple (texte_complet, liste_de_chunks_images)
@@ -340,8 +966,18 @@ def extract_pdf_with_vision(
     image_chunks = []
     if vision_api_key:
         try:
-            vision = AlbertVision(api_key=vision_api_key)
-            extractor = PDFImageExtractor(vision_provider=vision)
+            if use_cache and vision_cache is None:
+                vision_cache = get_vision_cache()
+            vision = AlbertVision(
+                api_key=vision_api_key,
+                cache=vision_cache if use_cache else None,
+            )
+            extractor = PDFImageExtractor(
+                vision_provider=vision,
+                max_workers=max_workers,
+                analysis_timeout=analysis_timeout,
+                batch_size=batch_size,
+            )
             analyzed_images = extractor.extract_and_analyze_all(pdf_bytes, max_images)
             image_chunks = extractor.generate_image_chunks(analyzed_images, document_name)
         except Exception as e:
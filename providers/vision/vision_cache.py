@@ -0,0 +1,202 @@
+"""
+Cache persistant des analyses vision.
+Les réponses du modèle sont stockées sur disque (SQLite), indexées par le SHA-256
+de l'image, du prompt et du nom du modèle : ré-indexer un document déjà analysé
+ne relance aucun appel multimodal.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join("vision_cache", "vision_cache.sqlite3")
+DEFAULT_MAX_SIZE_MB = 200
+
+
+class VisionCache:
+    """
+    Cache disque des réponses vision, borné en taille (éviction LRU).
+    Thread-safe : utilisable depuis l'analyse concurrente de PDFImageExtractor.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+    ):
+        """
+        Initialise le cache.
+
+        Args:
+            path: Fichier SQLite du cache (ou variable d'env VISION_CACHE_PATH)
+            max_size_mb: Taille maximale des réponses stockées, en Mo
+        """
+        self.path = path or os.getenv("VISION_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS vision_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_vision_cache_access ON vision_cache(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, prompt: str, model: str) -> str:
+        """
+        Calcule la clé de cache d'une analyse.
+
+        Args:
+            image_bytes: Contenu de l'image
+            prompt: Prompt envoyé au modèle
+            model: Nom du modèle de vision
+
+        Returns:
+            Empreinte SHA-256 hexadécimale
+        """
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(image_bytes).digest())
+        digest.update(prompt.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(model.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Retourne la réponse en cache, ou None.
+
+        Args:
+            key: Clé calculée par make_key
+
+        Returns:
+            Réponse du modèle si présente
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM vision_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE vision_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self._stats["hits"] += 1
+            return row[0]
+
+    def set(self, key: str, model: str, response: str) -> None:
+        """
+        Enregistre une réponse, puis évince les entrées les moins récemment
+        utilisées si la taille maximale est dépassée.
+
+        Args:
+            key: Clé calculée par make_key
+            model: Nom du modèle (pour purge ciblée)
+            response: Réponse du modèle
+        """
+        size = len(response.encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO vision_cache "
+                "(key, model, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._stats["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Supprime les entrées les plus anciennes jusqu'à repasser sous la taille maximale."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM vision_cache").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM vision_cache ORDER BY last_access ASC"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM vision_cache WHERE key = ?", evicted)
+        self._stats["evictions"] += len(evicted)
+        logging.info(f"Cache vision: {len(evicted)} entrée(s) évincée(s)")
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM vision_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Retourne les métriques du cache depuis son ouverture.
+
+        Returns:
+            Dictionnaire hits, misses, writes, evictions, hit_rate, entries, size_bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM vision_cache"
+            ).fetchone()
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        return stats
+
+    def close(self) -> None:
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, VisionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_vision_cache(path: Optional[str] = None) -> VisionCache:
+    """
+    Retourne le cache vision partagé pour un fichier donné, en le créant au premier appel.
+
+    Args:
+        path: Fichier SQLite du cache (ou variable d'env VISION_CACHE_PATH)
+
+    Returns:
+        VisionCache partagé par tout le processus
+    """
+    path = path or os.getenv("VISION_CACHE_PATH", DEFAULT_CACHE_PATH)
+    with _caches_lock:
+        if path not in _caches:
+            max_size_mb = float(os.getenv("VISION_CACHE_MAX_MB", DEFAULT_MAX_SIZE_MB))
+            _caches[path] = VisionCache(path, max_size_mb=max_size_mb)
+        return _caches[path]
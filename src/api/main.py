@@ -3,26 +3,37 @@ API FastAPI - Point d'entrée de l'application
 Architecture Hexagonale : API Layer avec Wiring/Injection
 """
 
+import asyncio
+import json
 import logging
-from fastapi import FastAPI, HTTPException, status, UploadFile, File
+import time
+from typing import AsyncIterator, Iterator
+from fastapi import FastAPI, HTTPException, Request, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime
 
 from .schemas.requests import QueryRequest
 from .schemas.responses import (
     QueryResponse,
     HealthResponse,
+    ReadinessResponse,
     ErrorResponse,
     SourceDTO,
     DocumentIndexResponse
 )
 
-from ..config import get_container
+from .rate_limit import RateLimitMiddleware
+from ..config import Config, get_container
+from ..domain.entities.query import RAGStreamEvent, SearchResult
 from ..application.use_cases.query_rag import QueryRAGUseCase, RAGError
 from ..application.use_cases.search_similar import SearchSimilarUseCase, SearchError
 from ..application.use_cases.index_document import IndexDocumentUseCase, IndexError
 from ..application.use_cases.delete_documents import DeleteDocumentsUseCase, DeleteError
 from ..infrastructure.adapters.document_parser_adapter import DocumentParserAdapter
+from providers.concurrency import PRIORITY_INGESTION, call_priority, get_governor
+from providers.token_bucket import create_token_bucket
 
 
 # Configuration du logging
@@ -42,6 +53,19 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Limitation de débit par client (ajoutée avant CORS : les réponses 429 portent les en-têtes CORS)
+if Config.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        bucket=create_token_bucket(
+            Config.RATE_LIMIT_BACKEND,
+            capacity=Config.RATE_LIMIT_BURST,
+            refill_rate=Config.RATE_LIMIT_PER_MINUTE / 60.0,
+            path=Config.RATE_LIMIT_DB_PATH,
+        ),
+        trust_proxy=Config.RATE_LIMIT_TRUST_PROXY,
+    )
+
 # CORS (si le frontend est sur un autre domaine)
 app.add_middleware(
     CORSMiddleware,
@@ -57,13 +81,43 @@ async def startup_event():
     """Événement de démarrage de l'application."""
     logger.info("🚀 Démarrage de l'API Aristote RAG (Architecture Hexagonale)")
     container = get_container()
-    logger.info(f"✅ Configuration chargée (ChromaDB: {container.config.CHROMA_DB_PATH})")
+    chroma_location = (
+        f"serveur {container.config.CHROMA_SERVER_HOST}:{container.config.CHROMA_SERVER_PORT}"
+        if container.config.CHROMA_SERVER_HOST else container.config.CHROMA_DB_PATH
+    )
+    logger.info(f"✅ Configuration chargée (ChromaDB: {chroma_location})")
+
+    # Préchauffage en tâche de fond : /health répond aussitôt, /ready une fois terminé
+    app.state.warmup_task = asyncio.create_task(_warm_up(container))
+
+
+async def _warm_up(container) -> None:
+    """Prépare les composants (index, providers, connexions) avant le premier trafic."""
+    started = time.perf_counter()
+    components = await run_in_threadpool(container.warm_up, container.config.WARMUP_PING_PROVIDERS)
+    app.state.warmup_ms = round((time.perf_counter() - started) * 1000)
+    ready = [name for name, state in components.items() if state["ready"]]
+    logger.info(
+        f"🔥 Préchauffage terminé en {app.state.warmup_ms} ms : "
+        f"{', '.join(ready) or 'aucun composant prêt'}"
+    )
+
+    # Composant requis indisponible (panne passagère au démarrage) : relances
+    # périodiques, /ready repasse à 200 dès qu'il répond
+    while not container.readiness()["ready"]:
+        await asyncio.sleep(container.config.WARMUP_RETRY_INTERVAL)
+        if await run_in_threadpool(container.retry_warm_up, container.config.WARMUP_PING_PROVIDERS):
+            logger.info("✅ Composants requis disponibles après relance du préchauffage")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Événement d'arrêt de l'application."""
     logger.info("🛑 Arrêt de l'API Aristote RAG")
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    get_container().shutdown()
 
 
 @app.get("/", response_model=HealthResponse)
@@ -79,7 +133,7 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """
-    Health check de l'API.
+    Health check de l'API (liveness : le processus répond).
 
     Returns:
         HealthResponse: Statut de l'API
@@ -91,6 +145,119 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Métriques des appels sortants vers Albert (régulateur partagé du processus).
+
+    Returns:
+        Appels en cours et en file d'attente, limites, temps d'attente
+    """
+    return {"albert": get_governor().stats()}
+
+
+def _source_dto(source: SearchResult) -> SourceDTO:
+    """Convertit un résultat de recherche du domaine en DTO API."""
+    return SourceDTO(
+        chunk_id=source.chunk_id,
+        text=source.text,
+        score=source.score,
+        filename=source.metadata.get("filename", "unknown"),
+        document_id=source.metadata.get("document_id")
+    )
+
+
+def _format_sse(event: str, data) -> str:
+    """Formate un événement Server-Sent Events (données JSON)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream_rag_events(
+    events: Iterator[RAGStreamEvent],
+    http_request: Request
+) -> AsyncIterator[str]:
+    """
+    Relaie les événements d'une réponse RAG en Server-Sent Events.
+
+    Le générateur du use case est synchrone (appels HTTP bloquants) : chaque
+    étape tourne dans le pool de threads. Si le client se déconnecte, le
+    générateur est fermé, ce qui ferme la requête LLM amont.
+
+    Args:
+        events: Événements produits par QueryRAGUseCase.execute_stream
+        http_request: Requête HTTP (détection de la déconnexion)
+
+    Yields:
+        Événements SSE "sources", "token", "done" ou "error"
+    """
+    finished = object()
+    try:
+        while True:
+            if await http_request.is_disconnected():
+                logger.info("🔌 Client déconnecté, génération interrompue")
+                break
+
+            try:
+                event = await run_in_threadpool(next, events, finished)
+            except RAGError as e:
+                logger.error(f"❌ Erreur RAG (streaming): {e}")
+                yield _format_sse("error", {"detail": str(e)})
+                break
+            except Exception as e:
+                logger.error(f"❌ Erreur inattendue (streaming): {e}", exc_info=True)
+                yield _format_sse("error", {"detail": "Une erreur inattendue s'est produite"})
+                break
+
+            if event is finished:
+                break
+            if event.type == "sources":
+                yield _format_sse("sources", [_source_dto(s).model_dump() for s in event.data])
+            else:
+                yield _format_sse(event.type, event.data)
+    finally:
+        try:
+            events.close()
+        except ValueError:
+            # Étape encore en cours dans un thread : le générateur sera fermé
+            # (et la requête amont avec lui) dès qu'il ne sera plus référencé
+            pass
+
+
+@app.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={503: {"model": ReadinessResponse, "description": "Instance pas encore prête"}}
+)
+async def readiness_check():
+    """
+    Readiness de l'API : préchauffage terminé et composants requis disponibles
+    (VectorStore, providers par défaut). À utiliser pour router le trafic.
+
+    Returns:
+        ReadinessResponse: État et durée de préchauffage de chaque composant
+            (HTTP 503 tant que l'instance n'est pas prête)
+    """
+    readiness = get_container().readiness()
+    if readiness["ready"]:
+        status_label = "ready"
+    elif not readiness["warmed_up"]:
+        status_label = "warming_up"
+    else:
+        status_label = "not_ready"
+
+    body = ReadinessResponse(
+        status=status_label,
+        components=readiness["components"],
+        warmup_ms=getattr(app.state, "warmup_ms", None)
+    )
+    if not readiness["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=body.model_dump()
+        )
+    return body
+
+
 @app.post(
     "/query",
     response_model=QueryResponse,
@@ -135,8 +302,9 @@ async def query_rag(request: QueryRequest):
         if request.filter_document:
             filter_metadata = {"filename": request.filter_document}
 
-        # Exécution du use case
-        rag_response = use_case.execute(
+        # Exécution du use case (hors de la boucle asyncio : les requêtes concurrentes ne s'attendent pas)
+        rag_response = await run_in_threadpool(
+            use_case.execute,
             query_text=request.query,
             n_results=request.n_results,
             temperature=request.temperature,
@@ -145,16 +313,7 @@ async def query_rag(request: QueryRequest):
         )
 
         # Conversion en DTO API (séparation domaine/API)
-        sources_dto = [
-            SourceDTO(
-                chunk_id=source.chunk_id,
-                text=source.text,
-                score=source.score,
-                filename=source.metadata.get("filename", "unknown"),
-                document_id=source.metadata.get("document_id")
-            )
-            for source in rag_response.sources
-        ]
+        sources_dto = [_source_dto(source) for source in rag_response.sources]
 
         return QueryResponse(
             query_id=rag_response.id,
@@ -187,6 +346,75 @@ async def query_rag(request: QueryRequest):
         )
 
 
+@app.post(
+    "/query/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Flux Server-Sent Events"},
+        400: {"model": ErrorResponse, "description": "Requête invalide"},
+        500: {"model": ErrorResponse, "description": "Erreur serveur"}
+    }
+)
+async def query_rag_stream(request: QueryRequest, http_request: Request):
+    """
+    Endpoint pour une requête RAG diffusée au fil de la génération (SSE).
+
+    Événements émis : "sources" (liste de SourceDTO), "token" (fragment de
+    texte), puis "done" (query_id, model_name, usage, timings) ou "error".
+
+    Args:
+        request: Requête utilisateur avec paramètres
+        http_request: Requête HTTP brute (détection de la déconnexion du client)
+
+    Returns:
+        StreamingResponse: Flux text/event-stream
+
+    Raises:
+        HTTPException: Si les providers ne peuvent pas être initialisés
+    """
+    logger.info(f"📥 Requête RAG (streaming) reçue : '{request.query[:50]}...'")
+
+    try:
+        # WIRING : Récupération des ports depuis le conteneur
+        container = get_container()
+        use_case = QueryRAGUseCase(
+            embedding_port=container.get_embedding_port(request.embedding_provider),
+            vector_store_port=container.get_vector_store(),
+            llm_port=container.get_llm_port(request.llm_provider)
+        )
+
+    except ValueError as e:
+        logger.error(f"❌ Erreur validation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Erreur inattendue: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Une erreur inattendue s'est produite"
+        )
+
+    filter_metadata = None
+    if request.filter_document:
+        filter_metadata = {"filename": request.filter_document}
+
+    events = use_case.execute_stream(
+        query_text=request.query,
+        n_results=request.n_results,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+        filter_metadata=filter_metadata
+    )
+
+    return StreamingResponse(
+        _stream_rag_events(events, http_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/documents")
 async def list_documents():
     """
@@ -226,12 +454,13 @@ async def list_documents():
         500: {"model": ErrorResponse, "description": "Erreur serveur"}
     }
 )
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(file: UploadFile = File(...), analyze_images: bool = Form(False)):
     """
     Upload et indexe un document.
 
     Args:
         file: Fichier à indexer (PDF, DOCX, TXT)
+        analyze_images: Analyser les images du document avec Albert Vision (PDF, DOCX)
 
     Returns:
         DocumentIndexResponse: Informations sur le document indexé
@@ -267,11 +496,11 @@ async def upload_document(file: UploadFile = File(...)):
             )
 
         # Parser le document
-        parser = DocumentParserAdapter(chunk_size=1000, chunk_overlap=200)
-        document = parser.parse_document(file_bytes, file.filename)
+        container = get_container()
+        vision = container.get_vision_provider() if analyze_images else None
+        parser = DocumentParserAdapter(chunk_size=1000, chunk_overlap=200, vision=vision)
 
         # Indexer le document
-        container = get_container()
         embedding_port = container.get_embedding_port()
         vector_store_port = container.get_vector_store()
 
@@ -280,7 +509,11 @@ async def upload_document(file: UploadFile = File(...)):
             vector_store_port=vector_store_port
         )
 
-        indexed_doc = use_case.execute(document)
+        # Hors de la boucle asyncio, en priorité ingestion : les requêtes RAG
+        # reçues pendant l'indexation passent avant les appels du document
+        with call_priority(PRIORITY_INGESTION):
+            document = await run_in_threadpool(parser.parse_document, file_bytes, file.filename)
+            indexed_doc = await run_in_threadpool(use_case.execute, document)
 
         logger.info(f"✅ Document {file.filename} indexé ({indexed_doc.chunks_count} chunks)")
 
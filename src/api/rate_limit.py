@@ -0,0 +1,146 @@
+"""
+Middleware de limitation de débit de l'API (seaux à jetons).
+Chaque client — identifié par son adresse IP — dispose d'un seau de jetons ; chaque route a un coût (un upload coûte plus
+qu'une requête). Au-delà, l'API répond 429 avec un en-tête Retry-After.
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+# Coût par route ("MÉTHODE chemin") ; les routes absentes coûtent DEFAULT_ROUTE_COST
+DEFAULT_ROUTE_COSTS: Dict[str, float] = {
+    "GET /": 0,
+    "GET /health": 0,
+    "GET /ready": 0,
+    "GET /metrics": 0,
+    "GET /docs": 0,
+    "GET /redoc": 0,
+    "GET /openapi.json": 0,
+    "POST /query": 2,
+    "POST /query/stream": 2,
+    "POST /documents/upload": 10,
+    "DELETE /documents": 5,
+}
+DEFAULT_ROUTE_COST = 1
+
+
+def client_key(scope: Scope, trust_proxy: bool = False) -> str:
+    """
+    Identifie le client d'une requête.
+
+    Args:
+        scope: Scope ASGI de la requête
+        trust_proxy: Utiliser X-Forwarded-For (API derrière un reverse proxy)
+
+    Returns:
+        "ip:<adresse>"
+    """
+    # Les en-têtes X-API-Key / Authorization ne sont pas vérifiés par l'API :
+    # s'en servir comme identité permettrait de changer de seau à chaque requête.
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+    if trust_proxy and headers.get("x-forwarded-for"):
+        # Seule la dernière adresse est ajoutée par le proxy de confiance,
+        # les précédentes sont fournies par le client
+        return f"ip:{headers['x-forwarded-for'].split(',')[-1].strip()}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'inconnu'}"
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI appliquant un seau à jetons par client.
+    Écrit en ASGI pur : les réponses en streaming (SSE) traversent sans mise en mémoire.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        bucket,
+        route_costs: Optional[Dict[str, float]] = None,
+        default_cost: float = DEFAULT_ROUTE_COST,
+        trust_proxy: bool = False,
+    ):
+        """
+        Initialise le middleware.
+
+        Args:
+            app: Application ASGI
+            bucket: Stockage des seaux (MemoryTokenBucket ou SQLiteTokenBucket)
+            route_costs: Coût par "MÉTHODE chemin" (DEFAULT_ROUTE_COSTS par défaut)
+            default_cost: Coût des routes absentes de route_costs
+            trust_proxy: Identifier les clients par X-Forwarded-For
+        """
+        self.app = app
+        self.bucket = bucket
+        self.route_costs = DEFAULT_ROUTE_COSTS if route_costs is None else route_costs
+        self.default_cost = default_cost
+        self.trust_proxy = trust_proxy
+
+    def route_cost(self, method: str, path: str) -> float:
+        """Coût en jetons d'une route."""
+        return self.route_costs.get(f"{method} {path.rstrip('/') or '/'}", self.default_cost)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.route_cost(scope["method"], scope["path"])
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope, self.trust_proxy)
+        try:
+            if self.bucket.blocking:
+                decision = await run_in_threadpool(self.bucket.take, key, cost)
+            else:
+                decision = self.bucket.take(key, cost)
+        except Exception as e:
+            # Stockage indisponible : ne pas bloquer l'API
+            logger.error(f"❌ Limitation de débit indisponible: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        limit_headers = [
+            (b"x-ratelimit-limit", str(int(self.bucket.capacity)).encode()),
+            (b"x-ratelimit-remaining", str(int(decision.remaining)).encode()),
+        ]
+
+        if not decision.allowed:
+            logger.warning(f"⏳ Limite atteinte pour {key} ({scope['method']} {scope['path']}, coût {cost})")
+            await self._send_rejection(send, decision.retry_after_seconds, limit_headers)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _send_rejection(send: Send, retry_after: int, limit_headers) -> None:
+        """Répond 429 avec Retry-After."""
+        body = json.dumps({
+            "error": "Trop de requêtes",
+            "detail": f"Limite de débit atteinte, réessayer dans {retry_after} s",
+            "error_code": "RATE_LIMITED",
+        }, ensure_ascii=False).encode("utf-8")
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ] + limit_headers
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
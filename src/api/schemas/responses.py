@@ -4,7 +4,7 @@ Schémas Pydantic pour les RÉPONSES API
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -81,6 +81,36 @@ class HealthResponse(BaseModel):
     architecture: str = "hexagonal"
 
 
+class ComponentReadinessDTO(BaseModel):
+    """État de préparation d'un composant."""
+
+    ready: bool
+    required: bool
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness : l'instance peut-elle recevoir du trafic ?"""
+
+    status: str  # "ready", "warming_up" ou "not_ready"
+    components: Dict[str, ComponentReadinessDTO]
+    warmup_ms: Optional[int] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "ready",
+                "components": {
+                    "vector_store": {"ready": True, "required": True, "duration_ms": 412},
+                    "embedding:albert": {"ready": True, "required": True, "duration_ms": 230},
+                    "llm:albert": {"ready": True, "required": True, "duration_ms": 180}
+                },
+                "warmup_ms": 822
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     """Réponse d'erreur."""
 
@@ -4,9 +4,10 @@ Architecture Hexagonale : Application Layer
 """
 
 import logging
-from typing import List, Optional, Dict
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from ...domain.entities.query import Query, RAGResponse, SearchResult
+from ...domain.entities.query import Query, RAGResponse, RAGStreamEvent, SearchResult
 from ...domain.ports.embedding_port import EmbeddingPort, EmbeddingError
 from ...domain.ports.vector_store_port import VectorStorePort, VectorStoreError
 from ...domain.ports.llm_port import LLMPort, LLMError
@@ -72,25 +73,11 @@ class QueryRAGUseCase:
         )
 
         try:
-            # Étape 1 : Générer l'embedding de la requête
-            query_embedding = self._embedding_port.embed_text(query_text)
-            query.embedding = query_embedding
-
-            # Étape 2 : Rechercher les chunks pertinents
-            search_results = self._vector_store_port.search_similar(
-                query_embedding=query_embedding,
-                n_results=n_results,
-                filter_metadata=filter_metadata
+            # Étapes 1 à 3 : embedding de la requête, recherche, contexte
+            search_results, context_text = self._retrieve(
+                query, n_results, filter_metadata
             )
 
-            if not search_results:
-                logger.warning("Aucun contexte trouvé pour la requête")
-                # Possibilité de retourner une réponse vide ou lever une erreur
-                context_text = "Aucun contexte disponible."
-            else:
-                # Étape 3 : Construire le contexte à partir des résultats
-                context_text = self._build_context(search_results)
-
             # Étape 4 : Construire le prompt augmenté
             system_prompt = self._build_system_prompt()
             augmented_prompt = self._build_augmented_prompt(query_text, context_text)
@@ -135,6 +122,138 @@ class QueryRAGUseCase:
             logger.error(f"Erreur inattendue lors du traitement RAG: {e}")
             raise RAGError(f"Erreur inattendue: {e}")
 
+    def execute_stream(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        filter_metadata: Optional[Dict] = None
+    ) -> Iterator[RAGStreamEvent]:
+        """
+        Répond à une requête avec augmentation RAG, au fil de la génération.
+
+        Émet d'abord les sources retrouvées, puis les fragments de la réponse,
+        puis un événement final (modèle, consommation de tokens, durées en ms).
+        Fermer le générateur interrompt la génération en cours.
+
+        Args:
+            query_text: Texte de la requête
+            n_results: Nombre de résultats à récupérer
+            temperature: Température LLM (0-1)
+            max_tokens: Nombre max de tokens
+            filter_metadata: Filtres sur les métadonnées
+
+        Yields:
+            RAGStreamEvent "sources" (List[SearchResult]), "token" (str) puis "done" (dict)
+
+        Raises:
+            RAGError: Si le traitement échoue
+        """
+        try:
+            query = Query(text=query_text)
+        except ValueError as e:
+            raise RAGError(f"Requête invalide: {e}")
+
+        logger.info(
+            f"Requête RAG (streaming) : '{query_text[:50]}...' "
+            f"(n_results={n_results}, temp={temperature})"
+        )
+
+        started = time.perf_counter()
+        usage: Dict[str, int] = {}
+        first_token_at = None
+        length = 0
+        stream = None
+
+        try:
+            search_results, context_text = self._retrieve(query, n_results, filter_metadata)
+            retrieved_at = time.perf_counter()
+            yield RAGStreamEvent(type="sources", data=search_results)
+
+            stream = self._llm_port.generate_stream(
+                prompt=self._build_augmented_prompt(query_text, context_text),
+                system_prompt=self._build_system_prompt(),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                usage=usage
+            )
+            for delta in stream:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                length += len(delta)
+                yield RAGStreamEvent(type="token", data=delta)
+
+        except EmbeddingError as e:
+            logger.error(f"Erreur génération embedding: {e}")
+            raise RAGError(f"Échec génération embedding: {e}")
+
+        except VectorStoreError as e:
+            logger.error(f"Erreur recherche vectorielle: {e}")
+            raise RAGError(f"Échec recherche: {e}")
+
+        except LLMError as e:
+            logger.error(f"Erreur génération LLM: {e}")
+            raise RAGError(f"Échec génération réponse: {e}")
+
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors du traitement RAG: {e}")
+            raise RAGError(f"Erreur inattendue: {e}")
+
+        finally:
+            # Arrêt anticipé (client parti) : la requête LLM amont est fermée
+            if stream is not None:
+                stream.close()
+
+        finished = time.perf_counter()
+        logger.info(
+            f"Réponse RAG diffusée ({len(search_results)} sources, {length} caractères)"
+        )
+        yield RAGStreamEvent(type="done", data={
+            "query_id": query.id,
+            "model_name": self._llm_port.get_model_name(),
+            "usage": usage,
+            "timings": {
+                "retrieval_ms": round((retrieved_at - started) * 1000),
+                "first_token_ms": round((first_token_at - started) * 1000) if first_token_at else None,
+                "total_ms": round((finished - started) * 1000),
+            },
+        })
+
+    def _retrieve(
+        self,
+        query: Query,
+        n_results: int,
+        filter_metadata: Optional[Dict]
+    ) -> Tuple[List[SearchResult], str]:
+        """
+        Recherche les chunks pertinents et construit le contexte.
+
+        Args:
+            query: Requête validée (son embedding est renseigné)
+            n_results: Nombre de résultats à récupérer
+            filter_metadata: Filtres sur les métadonnées
+
+        Returns:
+            Tuple (résultats de recherche, contexte formaté)
+        """
+        # Étape 1 : Générer l'embedding de la requête
+        query.embedding = self._embedding_port.embed_text(query.text)
+
+        # Étape 2 : Rechercher les chunks pertinents
+        search_results = self._vector_store_port.search_similar(
+            query_embedding=query.embedding,
+            n_results=n_results,
+            filter_metadata=filter_metadata
+        )
+
+        if not search_results:
+            logger.warning("Aucun contexte trouvé pour la requête")
+            return search_results, "Aucun contexte disponible."
+
+        # Étape 3 : Construire le contexte à partir des résultats
+        return search_results, self._build_context(search_results)
+
     def _build_context(self, search_results: List[SearchResult]) -> str:
         """
         Construit le contexte textuel à partir des résultats de recherche.
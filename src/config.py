@@ -6,7 +6,9 @@ Architecture Hexagonale : Point de câblage
 
 import os
 import logging
-from typing import Tuple
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
 
 from .domain.ports.embedding_port import EmbeddingPort
 from .domain.ports.llm_port import LLMPort
@@ -18,6 +20,9 @@ from .infrastructure.adapters.ollama_embedding_adapter import OllamaEmbeddingAda
 from .infrastructure.adapters.aristote_llm_adapter import AristoteLLMAdapter
 from .infrastructure.adapters.albert_llm_adapter import AlbertLLMAdapter
 
+from providers.http_pool import close_http_pools
+from providers.vision import AlbertVision, get_vision_cache
+
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,14 @@ class Config:
     CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
     CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME", "documents")
 
+    # Serveur Chroma propriétaire de la base (vide = base ouverte par ce processus).
+    # Obligatoire dès que plusieurs processus partagent la base (workers uvicorn, app v1)
+    CHROMA_SERVER_HOST = os.getenv("CHROMA_SERVER_HOST", "")
+    CHROMA_SERVER_PORT = int(os.getenv("CHROMA_SERVER_PORT", "8000"))
+
+    # Nombre de workers uvicorn (variable lue par uvicorn lui-même)
+    API_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
     # Clés API
     ARISTOTE_API_KEY = os.getenv("ARISTOTE_API_KEY", "")
     ALBERT_API_KEY = os.getenv("ALBERT_API_KEY", "")
@@ -41,12 +54,30 @@ class Config:
     ARISTOTE_MODEL = os.getenv("ARISTOTE_MODEL", "meta-llama/Llama-3.3-70B-Instruct")
     ALBERT_LLM_MODEL = os.getenv("ALBERT_LLM_MODEL", "openweight-medium")  # Anciennement albert-large
     OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+    ALBERT_VISION_MODEL = os.getenv("ALBERT_VISION_MODEL", AlbertVision.DEFAULT_MODEL)
+
+    # Limitation de débit de l'API (seau à jetons par client) ; "sqlite" pour plusieurs workers
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "30"))
+    RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", os.path.join("rate_limit", "token_buckets.sqlite3"))
+    RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+    # Préchauffage : contacter les providers au démarrage (connexions ouvertes avant le premier trafic)
+    WARMUP_PING_PROVIDERS = os.getenv("WARMUP_PING_PROVIDERS", "true").lower() == "true"
+    # Intervalle (s) entre deux relances du préchauffage tant que l'instance n'est pas prête
+    WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "15"))
 
 
 class DependencyContainer:
     """
     Conteneur d'injection de dépendances.
     ⚠️ C'EST ICI qu'on câble les adapters avec les use cases.
+
+    Une instance par (type, provider, modèle) est conservée : alterner entre
+    Albert et Aristote d'une requête à l'autre ne reconstruit aucun adapter.
+    Les constructions sont protégées par un verrou (requêtes concurrentes).
     """
 
     def __init__(self, config: Config = None):
@@ -57,9 +88,32 @@ class DependencyContainer:
             config: Configuration (utilise Config() par défaut)
         """
         self.config = config or Config()
-        self._vector_store: VectorStorePort = None
-        self._embedding_port: EmbeddingPort = None
-        self._llm_port: LLMPort = None
+        self._instances: Dict[Tuple[str, str, str], object] = {}
+        self._lock = threading.RLock()
+        self._readiness: Dict[str, Dict] = {}
+        self._warmed_up = False
+
+    def _get_or_create(self, key: Tuple[str, str, str], factory: Callable[[], object]):
+        """
+        Retourne l'instance associée à une clé, en la construisant une seule fois.
+
+        Args:
+            key: (type, provider, modèle)
+            factory: Fonction sans argument construisant l'instance
+
+        Returns:
+            Instance partagée
+        """
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            # Une autre requête a pu construire l'instance pendant l'attente du verrou
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = factory()
+                self._instances[key] = instance
+            return instance
 
     def get_vector_store(self) -> VectorStorePort:
         """
@@ -68,13 +122,27 @@ class DependencyContainer:
         Returns:
             VectorStorePort implémenté par ChromaDBAdapter
         """
-        if self._vector_store is None:
-            logger.info(f"Initialisation VectorStore (ChromaDB) : {self.config.CHROMA_DB_PATH}")
-            self._vector_store = ChromaDBAdapter(
+        def build() -> VectorStorePort:
+            if self.config.CHROMA_SERVER_HOST:
+                logger.info(
+                    f"Initialisation VectorStore (serveur Chroma) : "
+                    f"{self.config.CHROMA_SERVER_HOST}:{self.config.CHROMA_SERVER_PORT}"
+                )
+            else:
+                logger.info(f"Initialisation VectorStore (ChromaDB) : {self.config.CHROMA_DB_PATH}")
+                if self.config.API_WORKERS > 1:
+                    logger.warning(
+                        f"{self.config.API_WORKERS} workers ouvrent la même base ChromaDB : "
+                        f"définir CHROMA_SERVER_HOST pour qu'un seul serveur la possède"
+                    )
+            return ChromaDBAdapter(
                 persist_directory=self.config.CHROMA_DB_PATH,
-                collection_name=self.config.CHROMA_COLLECTION_NAME
+                collection_name=self.config.CHROMA_COLLECTION_NAME,
+                server_host=self.config.CHROMA_SERVER_HOST or None,
+                server_port=self.config.CHROMA_SERVER_PORT
             )
-        return self._vector_store
+
+        return self._get_or_create(("vector_store", "chromadb", self.config.CHROMA_COLLECTION_NAME), build)
 
     def get_embedding_port(self, provider: str = None) -> EmbeddingPort:
         """
@@ -95,36 +163,31 @@ class DependencyContainer:
             if not self.config.ALBERT_API_KEY:
                 raise ValueError("ALBERT_API_KEY est requis pour utiliser Albert Embeddings")
 
-            if self._embedding_port is None or not isinstance(self._embedding_port, AlbertEmbeddingAdapter):
+            def build() -> EmbeddingPort:
                 logger.info("Initialisation EmbeddingPort (Albert)")
-                self._embedding_port = AlbertEmbeddingAdapter(
-                    api_key=self.config.ALBERT_API_KEY
-                )
+                return AlbertEmbeddingAdapter(api_key=self.config.ALBERT_API_KEY)
+
+            return self._get_or_create(("embedding", "albert", AlbertEmbeddingAdapter.MODEL_NAME), build)
 
         elif provider == "ollama":
-            if self._embedding_port is None or not isinstance(self._embedding_port, OllamaEmbeddingAdapter):
+            def build() -> EmbeddingPort:
                 logger.info(f"Initialisation EmbeddingPort (Ollama: {self.config.OLLAMA_EMBEDDING_MODEL})")
                 try:
-                    self._embedding_port = OllamaEmbeddingAdapter(
-                        model_name=self.config.OLLAMA_EMBEDDING_MODEL
-                    )
+                    return OllamaEmbeddingAdapter(model_name=self.config.OLLAMA_EMBEDDING_MODEL)
                 except Exception as e:
                     logger.warning(f"Ollama non disponible ({e}). Basculement vers Albert.")
                     # Fallback vers Albert si Ollama n'est pas disponible
+                    # (conservé : Ollama n'est pas re-sondé à chaque requête)
                     if self.config.ALBERT_API_KEY:
-                        self._embedding_port = AlbertEmbeddingAdapter(
-                            api_key=self.config.ALBERT_API_KEY
-                        )
-                    else:
-                        raise ValueError(
-                            "Ollama n'est pas disponible et ALBERT_API_KEY n'est pas configurée. "
-                            "Configurez l'une des deux options."
-                        )
+                        return self.get_embedding_port("albert")
+                    raise ValueError(
+                        "Ollama n'est pas disponible et ALBERT_API_KEY n'est pas configurée. "
+                        "Configurez l'une des deux options."
+                    )
 
-        else:
-            raise ValueError(f"Provider d'embedding invalide: {provider}. Utilisez 'ollama' ou 'albert'.")
+            return self._get_or_create(("embedding", "ollama", self.config.OLLAMA_EMBEDDING_MODEL), build)
 
-        return self._embedding_port
+        raise ValueError(f"Provider d'embedding invalide: {provider}. Utilisez 'ollama' ou 'albert'.")
 
     def get_llm_port(self, provider: str = None) -> LLMPort:
         """
@@ -145,32 +208,201 @@ class DependencyContainer:
             if not self.config.ARISTOTE_API_KEY:
                 raise ValueError("ARISTOTE_API_KEY est requis pour utiliser Aristote")
 
-            if self._llm_port is None or not isinstance(self._llm_port, AristoteLLMAdapter):
+            def build() -> LLMPort:
                 logger.info(f"Initialisation LLMPort (Aristote: {self.config.ARISTOTE_MODEL})")
-                self._llm_port = AristoteLLMAdapter(
+                return AristoteLLMAdapter(
                     api_key=self.config.ARISTOTE_API_KEY,
                     model_name=self.config.ARISTOTE_MODEL
                 )
 
+            return self._get_or_create(("llm", "aristote", self.config.ARISTOTE_MODEL), build)
+
         elif provider == "albert":
             if not self.config.ALBERT_API_KEY:
                 raise ValueError("ALBERT_API_KEY est requis pour utiliser Albert")
 
-            if self._llm_port is None or not isinstance(self._llm_port, AlbertLLMAdapter):
+            def build() -> LLMPort:
                 logger.info(f"Initialisation LLMPort (Albert: {self.config.ALBERT_LLM_MODEL})")
-                self._llm_port = AlbertLLMAdapter(
+                return AlbertLLMAdapter(
                     api_key=self.config.ALBERT_API_KEY,
                     model_name=self.config.ALBERT_LLM_MODEL
                 )
 
-        else:
-            raise ValueError(f"Provider LLM invalide: {provider}. Utilisez 'aristote' ou 'albert'.")
+            return self._get_or_create(("llm", "albert", self.config.ALBERT_LLM_MODEL), build)
+
+        raise ValueError(f"Provider LLM invalide: {provider}. Utilisez 'aristote' ou 'albert'.")
+
+    def get_vision_provider(self) -> AlbertVision:
+        """
+        Retourne le provider de vision Albert (singleton, avec cache persistant).
+
+        Returns:
+            AlbertVision
+
+        Raises:
+            ValueError: Si la clé API manque
+        """
+        if not self.config.ALBERT_API_KEY:
+            raise ValueError("ALBERT_API_KEY est requis pour analyser les images")
+
+        def build() -> AlbertVision:
+            logger.info(f"Initialisation Vision (Albert: {self.config.ALBERT_VISION_MODEL})")
+            return AlbertVision(
+                api_key=self.config.ALBERT_API_KEY,
+                model=self.config.ALBERT_VISION_MODEL,
+                cache=get_vision_cache(),
+            )
+
+        return self._get_or_create(("vision", "albert", self.config.ALBERT_VISION_MODEL), build)
 
-        return self._llm_port
+    def configured_providers(self) -> Dict[str, List[str]]:
+        """
+        Liste les providers utilisables avec la configuration courante.
+
+        Returns:
+            {"embedding": [...], "llm": [...]}, le provider par défaut en premier
+        """
+        available = {
+            "embedding": {"albert": bool(self.config.ALBERT_API_KEY), "ollama": True},
+            "llm": {
+                "albert": bool(self.config.ALBERT_API_KEY),
+                "aristote": bool(self.config.ARISTOTE_API_KEY),
+            },
+        }
+        defaults = {
+            "embedding": self.config.DEFAULT_EMBEDDING_PROVIDER,
+            "llm": self.config.DEFAULT_LLM_PROVIDER,
+        }
+        providers = {}
+        for kind, flags in available.items():
+            # Ollama n'est construit que s'il est le provider par défaut (sinon sonde inutile)
+            names = [defaults[kind]] + [
+                name for name, ok in flags.items()
+                if ok and name != defaults[kind] and name != "ollama"
+            ]
+            providers[kind] = names
+        return providers
+
+    def _warm_up_steps(self, ping: bool) -> List[Tuple[str, bool, Callable[[], None]]]:
+        """
+        Étapes de préchauffage des composants configurés.
+
+        Args:
+            ping: Contacter les providers (sinon simple construction)
+
+        Returns:
+            [(composant, requis, étape)]
+        """
+        providers = self.configured_providers()
+        steps: List[Tuple[str, bool, Callable[[], None]]] = [
+            ("vector_store", True, lambda: self.get_vector_store().warm_up()),
+        ]
+        for i, name in enumerate(providers["embedding"]):
+            def warm_embedding(name=name):
+                port = self.get_embedding_port(name)
+                if ping:
+                    port.embed_text("préchauffage")
+            steps.append((f"embedding:{name}", i == 0, warm_embedding))
+        for i, name in enumerate(providers["llm"]):
+            def warm_llm(name=name):
+                port = self.get_llm_port(name)
+                if ping:
+                    port.ping()
+            steps.append((f"llm:{name}", i == 0, warm_llm))
+        return steps
+
+    def _run_warm_up_step(self, component: str, required: bool, step: Callable[[], None]) -> None:
+        """Exécute une étape de préchauffage et enregistre son résultat."""
+        with self._lock:
+            self._readiness.setdefault(component, {
+                "ready": False, "required": required, "duration_ms": None, "error": None
+            })
+        started = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Préchauffage {component} impossible: {e}")
+            error = str(e)
+        with self._lock:
+            self._readiness[component].update(
+                ready=error is None,
+                duration_ms=round((time.perf_counter() - started) * 1000),
+                error=error,
+            )
+
+    def warm_up(self, ping: bool = True) -> Dict[str, Dict]:
+        """
+        Prépare les composants avant la première requête : ouverture de la
+        collection et chargement de l'index, construction des providers
+        configurés et premier appel (connexion TLS ouverte et conservée).
+
+        Args:
+            ping: Contacter les providers (sinon simple construction)
+
+        Returns:
+            {composant: {"ready": bool, "required": bool, "duration_ms": int, "error": str|None}}
+        """
+        for component, required, step in self._warm_up_steps(ping):
+            self._run_warm_up_step(component, required, step)
+
+        with self._lock:
+            self._warmed_up = True
+        return self.readiness()["components"]
+
+    def retry_warm_up(self, ping: bool = True) -> bool:
+        """
+        Relance le préchauffage des composants requis encore indisponibles
+        (panne passagère d'un provider au démarrage).
+
+        Args:
+            ping: Contacter les providers (sinon simple construction)
+
+        Returns:
+            True si l'instance est prête après la relance
+        """
+        with self._lock:
+            failed = {name for name, state in self._readiness.items()
+                      if state["required"] and not state["ready"]}
+        for component, required, step in self._warm_up_steps(ping):
+            if component in failed:
+                self._run_warm_up_step(component, required, step)
+        return self.readiness()["ready"]
+
+    def readiness(self) -> Dict:
+        """
+        État de préparation des composants (voir warm_up).
+
+        Returns:
+            {"ready": bool, "warmed_up": bool, "components": {...}} ;
+            prêt quand le préchauffage est terminé et que les composants requis
+            (VectorStore, providers par défaut) sont disponibles
+        """
+        with self._lock:
+            components = {name: dict(state) for name, state in self._readiness.items()}
+            warmed_up = self._warmed_up
+        ready = warmed_up and all(
+            state["ready"] for state in components.values() if state["required"]
+        )
+        return {"ready": ready, "warmed_up": warmed_up, "components": components}
+
+    def shutdown(self) -> None:
+        """Libère les instances et ferme les connexions HTTP partagées."""
+        with self._lock:
+            for instance in self._instances.values():
+                close = getattr(instance, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as e:
+                        logger.warning(f"Erreur fermeture {type(instance).__name__}: {e}")
+            self._instances.clear()
+        close_http_pools()
 
 
 # Instance globale du conteneur (singleton)
 _container: DependencyContainer = None
+_container_lock = threading.Lock()
 
 
 def get_container() -> DependencyContainer:
@@ -182,11 +414,14 @@ def get_container() -> DependencyContainer:
     """
     global _container
     if _container is None:
-        _container = DependencyContainer()
+        with _container_lock:
+            if _container is None:
+                _container = DependencyContainer()
     return _container
 
 
 def reset_container():
     """Réinitialise le conteneur (utile pour les tests)."""
     global _container
-    _container = None
+    with _container_lock:
+        _container = None
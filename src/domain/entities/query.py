@@ -5,7 +5,7 @@ Architecture Hexagonale : Couche Domain
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 from uuid import uuid4
 
 
@@ -58,3 +58,11 @@ class RAGResponse:
     def sources_count(self) -> int:
         """Retourne le nombre de sources utilisées."""
         return len(self.sources)
+
+
+@dataclass
+class RAGStreamEvent:
+    """Représente un événement d'une réponse RAG diffusée au fil de l'eau."""
+
+    type: str  # "sources", "token" ou "done"
+    data: Any = None
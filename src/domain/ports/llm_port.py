@@ -4,7 +4,7 @@ Architecture Hexagonale : Domain Layer
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 
 
 class LLMPort(ABC):
@@ -58,6 +58,47 @@ class LLMPort(ABC):
         """
         pass
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """
+        Génère une réponse textuelle au fil de l'eau (générateur de fragments).
+
+        Fermer le générateur avant la fin interrompt la requête amont.
+        Par défaut, la réponse complète est émise en un seul fragment.
+
+        Args:
+            prompt: Prompt utilisateur
+            system_prompt: Prompt système (optionnel)
+            temperature: Température de génération (0-1)
+            max_tokens: Nombre maximum de tokens
+            usage: Dictionnaire complété en fin de génération avec la consommation
+                de tokens (prompt_tokens, completion_tokens, total_tokens) si le
+                provider la communique
+
+        Yields:
+            Fragments de texte générés
+
+        Raises:
+            LLMError: Si la génération échoue
+        """
+        yield self.generate(prompt, system_prompt, temperature, max_tokens)
+
+    def ping(self) -> None:
+        """
+        Vérifie que le service répond, sans génération (optionnel).
+        Ouvre au passage la connexion HTTP réutilisée par les requêtes suivantes.
+
+        Raises:
+            LLMError: Si le service est injoignable
+        """
+        pass
+
     @abstractmethod
     def get_model_name(self) -> str:
         """Retourne le nom du modèle utilisé."""
@@ -92,6 +92,15 @@ class VectorStorePort(ABC):
         """
         pass
 
+    def warm_up(self) -> None:
+        """
+        Charge l'index en mémoire avant la première requête (optionnel).
+
+        Raises:
+            VectorStoreError: Si l'index ne peut pas être chargé
+        """
+        pass
+
 
 class VectorStoreError(Exception):
     """Exception levée lors d'une erreur de base vectorielle."""
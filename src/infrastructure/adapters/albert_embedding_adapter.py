@@ -7,6 +7,9 @@ import logging
 from typing import List
 from openai import OpenAI
 
+from providers.concurrency import get_governor
+from providers.http_pool import get_http_client
+
 from ...domain.ports.embedding_port import EmbeddingPort, EmbeddingError
 
 
@@ -36,7 +39,8 @@ class AlbertEmbeddingAdapter(EmbeddingPort):
         try:
             self._client = OpenAI(
                 api_key=api_key,
-                base_url=self.API_BASE
+                base_url=self.API_BASE,
+                http_client=get_http_client(self.API_BASE)
             )
             logger.info("Albert Embedding Adapter initialisé")
         except Exception as e:
@@ -60,11 +64,13 @@ class AlbertEmbeddingAdapter(EmbeddingPort):
             raise EmbeddingError("Le texte ne peut pas être vide")
 
         try:
-            response = self._client.embeddings.create(
-                model=self.MODEL_NAME,
-                input=text,
-                encoding_format="float"
-            )
+            # Quota et appels simultanés partagés avec les autres clients Albert du processus
+            with get_governor().slot():
+                response = self._client.embeddings.create(
+                    model=self.MODEL_NAME,
+                    input=text,
+                    encoding_format="float"
+                )
 
             embedding = response.data[0].embedding
 
@@ -100,11 +106,12 @@ class AlbertEmbeddingAdapter(EmbeddingPort):
 
         try:
             # Albert API accepte un batch d'inputs
-            response = self._client.embeddings.create(
-                model=self.MODEL_NAME,
-                input=texts,
-                encoding_format="float"
-            )
+            with get_governor().slot():
+                response = self._client.embeddings.create(
+                    model=self.MODEL_NAME,
+                    input=texts,
+                    encoding_format="float"
+                )
 
             embeddings = [data.embedding for data in response.data]
 
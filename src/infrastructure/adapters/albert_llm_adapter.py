@@ -4,10 +4,14 @@ Architecture Hexagonale : Infrastructure Layer
 """
 
 import logging
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from openai import OpenAI
 
+from providers.concurrency import get_governor
+from providers.http_pool import get_http_client
+
 from ...domain.ports.llm_port import LLMPort, LLMError
+from .openai_stream import stream_chat_completion
 
 
 logger = logging.getLogger(__name__)
@@ -45,7 +49,8 @@ class AlbertLLMAdapter(LLMPort):
         try:
             self._client = OpenAI(
                 api_key=api_key,
-                base_url=self.API_BASE
+                base_url=self.API_BASE,
+                http_client=get_http_client(self.API_BASE)
             )
             logger.info(f"Albert LLM Adapter initialisé (modèle: {model_name})")
         except Exception as e:
@@ -85,12 +90,14 @@ class AlbertLLMAdapter(LLMPort):
 
             messages.append({"role": "user", "content": prompt})
 
-            response = self._client.chat.completions.create(
-                model=self._model_name,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+            # Quota et appels simultanés partagés avec les autres clients Albert du processus
+            with get_governor().slot():
+                response = self._client.chat.completions.create(
+                    model=self._model_name,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
 
             content = response.choices[0].message.content
 
@@ -106,6 +113,37 @@ class AlbertLLMAdapter(LLMPort):
             logger.error(f"Erreur génération Albert: {e}")
             raise LLMError(f"Échec génération: {e}")
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """
+        Génère une réponse textuelle au fil de l'eau.
+
+        Args:
+            prompt: Prompt utilisateur
+            system_prompt: Prompt système (optionnel)
+            temperature: Température de génération (0-1)
+            max_tokens: Nombre maximum de tokens
+            usage: Dictionnaire complété avec la consommation de tokens (optionnel)
+
+        Yields:
+            Fragments de texte générés
+
+        Raises:
+            LLMError: Si la génération échoue
+        """
+        # La place d'appel est conservée jusqu'à la fin du flux
+        with get_governor().slot():
+            yield from stream_chat_completion(
+                self._client, self._model_name, prompt, system_prompt,
+                temperature, max_tokens, usage, provider_label="Albert"
+            )
+
     def generate_with_history(
         self,
         messages: List[Dict[str, str]],
@@ -130,12 +168,13 @@ class AlbertLLMAdapter(LLMPort):
             raise LLMError("L'historique de messages est vide")
 
         try:
-            response = self._client.chat.completions.create(
-                model=self._model_name,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+            with get_governor().slot():
+                response = self._client.chat.completions.create(
+                    model=self._model_name,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
 
             content = response.choices[0].message.content
 
@@ -154,6 +193,20 @@ class AlbertLLMAdapter(LLMPort):
             logger.error(f"Erreur génération avec historique Albert: {e}")
             raise LLMError(f"Échec génération: {e}")
 
+    def ping(self) -> None:
+        """
+        Vérifie que l'API répond (liste des modèles, sans génération).
+
+        Raises:
+            LLMError: Si l'API est injoignable
+        """
+        try:
+            with get_governor().slot():
+                self._client.models.list()
+        except Exception as e:
+            logger.error(f"Albert injoignable: {e}")
+            raise LLMError(f"Albert injoignable: {e}")
+
     def get_model_name(self) -> str:
         """Retourne le nom du modèle utilisé."""
         return self._model_name
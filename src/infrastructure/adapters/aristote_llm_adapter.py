@@ -4,10 +4,13 @@ Architecture Hexagonale : Infrastructure Layer
 """
 
 import logging
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from openai import OpenAI
 
+from providers.http_pool import get_http_client
+
 from ...domain.ports.llm_port import LLMPort, LLMError
+from .openai_stream import stream_chat_completion
 
 
 logger = logging.getLogger(__name__)
@@ -38,7 +41,8 @@ class AristoteLLMAdapter(LLMPort):
         try:
             self._client = OpenAI(
                 api_key=api_key,
-                base_url=self.API_BASE
+                base_url=self.API_BASE,
+                http_client=get_http_client(self.API_BASE)
             )
             logger.info(f"Aristote LLM Adapter initialisé (modèle: {model_name})")
         except Exception as e:
@@ -99,6 +103,35 @@ class AristoteLLMAdapter(LLMPort):
             logger.error(f"Erreur génération Aristote: {e}")
             raise LLMError(f"Échec génération: {e}")
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """
+        Génère une réponse textuelle au fil de l'eau.
+
+        Args:
+            prompt: Prompt utilisateur
+            system_prompt: Prompt système (optionnel)
+            temperature: Température de génération (0-1)
+            max_tokens: Nombre maximum de tokens
+            usage: Dictionnaire complété avec la consommation de tokens (optionnel)
+
+        Yields:
+            Fragments de texte générés
+
+        Raises:
+            LLMError: Si la génération échoue
+        """
+        yield from stream_chat_completion(
+            self._client, self._model_name, prompt, system_prompt,
+            temperature, max_tokens, usage, provider_label="Aristote"
+        )
+
     def generate_with_history(
         self,
         messages: List[Dict[str, str]],
@@ -147,6 +180,19 @@ class AristoteLLMAdapter(LLMPort):
             logger.error(f"Erreur génération avec historique Aristote: {e}")
             raise LLMError(f"Échec génération: {e}")
 
+    def ping(self) -> None:
+        """
+        Vérifie que l'API répond (liste des modèles, sans génération).
+
+        Raises:
+            LLMError: Si l'API est injoignable
+        """
+        try:
+            self._client.models.list()
+        except Exception as e:
+            logger.error(f"Aristote injoignable: {e}")
+            raise LLMError(f"Aristote injoignable: {e}")
+
     def get_model_name(self) -> str:
         """Retourne le nom du modèle utilisé."""
         return self._model_name
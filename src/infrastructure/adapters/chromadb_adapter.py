@@ -5,8 +5,8 @@ Architecture Hexagonale : Infrastructure Layer
 
 import logging
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
+
+from providers.chroma import create_chroma_client
 
 from ...domain.entities.document import Chunk
 from ...domain.entities.query import SearchResult
@@ -19,16 +19,27 @@ logger = logging.getLogger(__name__)
 class ChromaDBAdapter(VectorStorePort):
     """Adapter pour ChromaDB - implémente l'interface VectorStorePort."""
 
-    def __init__(self, persist_directory: str, collection_name: str = "documents"):
+    def __init__(
+        self,
+        persist_directory: str,
+        collection_name: str = "documents",
+        server_host: Optional[str] = None,
+        server_port: Optional[int] = None
+    ):
         """
         Initialise l'adapter ChromaDB.
 
         Args:
-            persist_directory: Chemin du répertoire de persistance
+            persist_directory: Chemin du répertoire de persistance (mode embarqué)
             collection_name: Nom de la collection (défaut: "documents")
+            server_host: Hôte du serveur Chroma propriétaire de la base
+                (None = mode embarqué, la base est ouverte par ce processus)
+            server_port: Port du serveur Chroma
         """
         self._persist_directory = persist_directory
         self._collection_name = collection_name
+        self._server_host = server_host
+        self._server_port = server_port
         self._client = None
         self._collection = None
         self._initialize()
@@ -36,21 +47,20 @@ class ChromaDBAdapter(VectorStorePort):
     def _initialize(self) -> None:
         """Initialise le client ChromaDB."""
         try:
-            self._client = chromadb.PersistentClient(
-                path=self._persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
+            self._client = create_chroma_client(
+                self._persist_directory,
+                host=self._server_host or "",
+                port=self._server_port
             )
             self._collection = self._client.get_or_create_collection(
                 name=self._collection_name,
                 metadata={"hnsw:space": "cosine"}
             )
-            logger.info(
-                f"ChromaDB initialisé : {self._persist_directory} "
-                f"(collection: {self._collection_name})"
+            location = (
+                f"serveur {self._server_host}:{self._server_port}" if self._server_host
+                else self._persist_directory
             )
+            logger.info(f"ChromaDB initialisé : {location} (collection: {self._collection_name})")
         except Exception as e:
             logger.error(f"Erreur initialisation ChromaDB: {e}")
             raise VectorStoreError(f"Impossible d'initialiser ChromaDB: {e}")
@@ -202,6 +212,27 @@ class ChromaDBAdapter(VectorStorePort):
             logger.error(f"Erreur comptage ChromaDB: {e}")
             raise VectorStoreError(f"Échec comptage: {e}")
 
+    def warm_up(self) -> None:
+        """
+        Charge les segments de la collection (métadonnées et index HNSW).
+
+        Une recherche sur l'embedding d'un chunk existant force le chargement
+        de l'index : la première vraie requête n'en paie plus le coût.
+
+        Raises:
+            VectorStoreError: Si l'index ne peut pas être chargé
+        """
+        try:
+            if self._collection.count() == 0:
+                return
+            sample = self._collection.get(limit=1, include=["embeddings"])
+            embeddings = sample.get("embeddings")
+            if embeddings is not None and len(embeddings) > 0:
+                self._collection.query(query_embeddings=[list(embeddings[0])], n_results=1)
+        except Exception as e:
+            logger.error(f"Erreur préchauffage ChromaDB: {e}")
+            raise VectorStoreError(f"Échec chargement de l'index: {e}")
+
     def get_indexed_documents(self) -> List[str]:
         """
         Retourne la liste des documents indexés.
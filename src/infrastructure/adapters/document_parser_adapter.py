@@ -3,11 +3,11 @@ Adapter pour parser les documents (PDF, DOCX, TXT)
 Architecture Hexagonale : Infrastructure Layer
 """
 
-import io
 import logging
-from typing import List, Tuple
-import fitz  # PyMuPDF
-from docx import Document as DocxDocument
+from typing import List, Optional, Tuple
+
+from providers.documents import PdfTable, extract_docx, extract_pdf, generate_table_chunks
+from providers.vision import AlbertVision, DOCXImageExtractor, PDFImageExtractor
 
 from ...domain.entities.document import Document, Chunk
 
@@ -17,16 +17,26 @@ logger = logging.getLogger(__name__)
 class DocumentParserAdapter:
     """Adapter pour parser différents types de documents."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        vision: Optional[AlbertVision] = None,
+        max_images: int = 20,
+    ):
         """
         Initialise l'adapter.
 
         Args:
             chunk_size: Taille des chunks en caractères
             chunk_overlap: Chevauchement entre chunks
+            vision: Provider de vision pour analyser les images (PDF, DOCX), None = texte seul
+            max_images: Nombre maximum d'images analysées par document
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.vision = vision
+        self.max_images = max_images
 
     def parse_document(self, file_bytes: bytes, filename: str) -> Document:
         """
@@ -45,8 +55,9 @@ class DocumentParserAdapter:
         logger.info(f"Parsing du document: {filename}")
 
         # Extraire le texte selon le type
+        tables: List[PdfTable] = []
         if filename.lower().endswith(".pdf"):
-            text = self._extract_text_from_pdf(file_bytes)
+            text, tables = self._extract_pdf(file_bytes)
         elif filename.lower().endswith(".docx"):
             text = self._extract_text_from_docx(file_bytes)
         elif filename.lower().endswith(".txt"):
@@ -57,11 +68,14 @@ class DocumentParserAdapter:
                 "Formats acceptés: PDF, DOCX, TXT"
             )
 
-        if not text or not text.strip():
+        if (not text or not text.strip()) and not tables and self.vision is None:
             raise ValueError(f"Le document {filename} ne contient pas de texte")
 
-        # Découper en chunks
+        # Découper en chunks (les tableaux natifs forment leurs propres chunks)
         chunks = self._create_chunks(text, filename)
+        chunks.extend(self._create_table_chunks(tables, filename, first_index=len(chunks)))
+        image_chunks = self._create_image_chunks(file_bytes, filename, first_index=len(chunks))
+        chunks.extend(image_chunks)
 
         # Créer l'entité Document
         document = Document(
@@ -71,7 +85,9 @@ class DocumentParserAdapter:
             metadata={
                 "file_type": self._get_file_type(filename),
                 "text_length": len(text),
-                "chunks_count": len(chunks)
+                "chunks_count": len(chunks),
+                "tables_count": len(tables),
+                "images_count": len(image_chunks)
             }
         )
 
@@ -82,46 +98,23 @@ class DocumentParserAdapter:
 
         return document
 
-    def _extract_text_from_pdf(self, file_bytes: bytes) -> str:
-        """Extrait le texte d'un fichier PDF."""
-        text = ""
+    def _extract_pdf(self, file_bytes: bytes) -> Tuple[str, List[PdfTable]]:
+        """Extrait le texte (hors tableaux) et les tableaux natifs d'un fichier PDF."""
         try:
-            with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-                for page in doc:
-                    text += page.get_text()
+            content = extract_pdf(file_bytes)
         except Exception as e:
             logger.error(f"Erreur extraction PDF: {e}")
             raise ValueError(f"Erreur lors de l'extraction du PDF: {e}")
-        return text
+        return content.text, content.tables
 
     def _extract_text_from_docx(self, file_bytes: bytes) -> str:
-        """Extrait le texte d'un fichier DOCX, y compris les tableaux."""
-        text_parts = []
+        """Extrait le texte d'un fichier DOCX, tableaux compris, dans l'ordre du document."""
         try:
-            doc = DocxDocument(io.BytesIO(file_bytes))
-
-            # Extraire les paragraphes
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-
-            # Extraire le contenu des tableaux
-            for table in doc.tables:
-                table_text = []
-                for row in table.rows:
-                    row_cells = [cell.text.strip() for cell in row.cells]
-                    row_text = " | ".join(row_cells)
-                    if row_text.strip():
-                        table_text.append(row_text)
-                if table_text:
-                    text_parts.append("\n".join(table_text))
-
+            return extract_docx(file_bytes).text
         except Exception as e:
             logger.error(f"Erreur extraction DOCX: {e}")
             raise ValueError(f"Erreur lors de l'extraction du DOCX: {e}")
 
-        return "\n".join(text_parts)
-
     def _create_chunks(self, text: str, filename: str) -> List[Chunk]:
         """
         Découpe le texte en chunks avec chevauchement.
@@ -167,6 +160,67 @@ class DocumentParserAdapter:
 
         return chunks
 
+    def _create_table_chunks(
+        self,
+        tables: List[PdfTable],
+        filename: str,
+        first_index: int = 0,
+    ) -> List[Chunk]:
+        """
+        Crée un chunk Markdown par tableau natif (ou par partie de grand tableau).
+
+        Args:
+            tables: Tableaux extraits du PDF
+            filename: Nom du fichier source
+            first_index: Index du premier chunk de tableau dans le document
+
+        Returns:
+            Liste de chunks
+        """
+        return [
+            Chunk(
+                text=table_chunk["text"],
+                metadata={**table_chunk["metadata"], "chunk_index": first_index + i},
+            )
+            for i, table_chunk in enumerate(generate_table_chunks(tables, filename))
+        ]
+
+    def _create_image_chunks(self, file_bytes: bytes, filename: str, first_index: int = 0) -> List[Chunk]:
+        """
+        Analyse les images du document avec la vision et crée leurs chunks.
+        Une erreur d'analyse n'empêche pas l'indexation du texte.
+
+        Args:
+            file_bytes: Contenu binaire du fichier
+            filename: Nom du fichier source
+            first_index: Index du premier chunk d'image dans le document
+
+        Returns:
+            Liste de chunks (vide sans provider de vision)
+        """
+        if self.vision is None:
+            return []
+
+        if filename.lower().endswith(".pdf"):
+            extractor = PDFImageExtractor(vision_provider=self.vision)
+        elif filename.lower().endswith(".docx"):
+            extractor = DOCXImageExtractor(vision_provider=self.vision)
+        else:
+            return []
+
+        chunks = []
+        try:
+            for image_chunk in extractor.iter_image_chunks(file_bytes, filename, self.max_images):
+                chunks.append(Chunk(
+                    text=image_chunk["text"][:10000],
+                    metadata={**image_chunk["metadata"], "chunk_index": first_index + len(chunks)},
+                ))
+        except Exception as e:
+            logger.warning(f"Erreur analyse des images de {filename}: {e}")
+
+        logger.info(f"{len(chunks)} image(s) analysée(s) dans {filename}")
+        return chunks
+
     def _get_file_type(self, filename: str) -> str:
         """Retourne le type de fichier."""
         if filename.lower().endswith(".pdf"):
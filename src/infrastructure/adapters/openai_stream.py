@@ -0,0 +1,85 @@
+"""
+Génération en streaming commune aux adapters LLM compatibles OpenAI
+Architecture Hexagonale : Infrastructure Layer
+"""
+
+import logging
+from typing import Dict, Iterator, Optional
+
+from ...domain.ports.llm_port import LLMError
+
+
+logger = logging.getLogger(__name__)
+
+
+def stream_chat_completion(
+    client,
+    model_name: str,
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1000,
+    usage: Optional[Dict[str, int]] = None,
+    provider_label: str = "LLM"
+) -> Iterator[str]:
+    """
+    Génère une réponse au fil de l'eau via l'API chat completions.
+
+    Args:
+        client: Client OpenAI du provider
+        model_name: Nom du modèle
+        prompt: Prompt utilisateur
+        system_prompt: Prompt système (optionnel)
+        temperature: Température de génération (0-1)
+        max_tokens: Nombre maximum de tokens
+        usage: Dictionnaire complété avec la consommation de tokens (optionnel)
+        provider_label: Nom du provider dans les messages d'erreur
+
+    Yields:
+        Fragments de texte générés
+
+    Raises:
+        LLMError: Si la génération échoue
+    """
+    if not prompt or not prompt.strip():
+        raise LLMError("Le prompt ne peut pas être vide")
+
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    try:
+        stream = client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+    except Exception as e:
+        logger.error(f"Erreur streaming {provider_label}: {e}")
+        raise LLMError(f"Échec génération: {e}")
+
+    length = 0
+    try:
+        for chunk in stream:
+            # Dernier fragment : consommation de tokens, sans contenu
+            if usage is not None and getattr(chunk, "usage", None):
+                usage.update(
+                    prompt_tokens=chunk.usage.prompt_tokens,
+                    completion_tokens=chunk.usage.completion_tokens,
+                    total_tokens=chunk.usage.total_tokens
+                )
+            if chunk.choices and chunk.choices[0].delta.content:
+                length += len(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        logger.error(f"Erreur streaming {provider_label}: {e}")
+        raise LLMError(f"Échec génération: {e}")
+    finally:
+        # Ferme la connexion HTTP : interrompt la génération si le client abandonne
+        stream.close()
+
+    logger.info(f"Réponse générée en streaming ({length} caractères)")
@@ -10,6 +10,12 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(autouse=True)
+def isolated_vision_cache(tmp_path, monkeypatch):
+    """Redirige le cache vision par défaut vers un dossier temporaire."""
+    monkeypatch.setenv("VISION_CACHE_PATH", str(tmp_path / "vision_cache.sqlite3"))
+
+
 @pytest.fixture
 def mock_env_albert_key(monkeypatch):
     """Fixture pour simuler la clé API Albert."""
@@ -0,0 +1,196 @@
+"""
+Jeu d'images étiquetées pour mesurer le classifieur local d'images.
+Les images sont générées avec PyMuPDF (dessin vectoriel rendu en pixmap),
+de façon déterministe, pour couvrir les cas rencontrés dans les documents
+administratifs : tableaux, graphiques, photos et éléments décoratifs.
+"""
+
+import random
+from typing import Callable, List, Tuple
+
+import fitz  # PyMuPDF
+
+
+def _render(width: int, height: int, draw: Callable[[fitz.Page], None], dpi: int = 72) -> bytes:
+    """Dessine sur une page de la taille demandée et retourne le rendu PNG."""
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    draw(page)
+    png = page.get_pixmap(dpi=dpi).tobytes("png")
+    doc.close()
+    return png
+
+
+def _table(rows: int, cols: int, width: int, height: int, header_fill=None, dpi: int = 72) -> bytes:
+    def draw(page):
+        margin = 10
+        cell_w = (width - 2 * margin) / cols
+        cell_h = (height - 2 * margin) / rows
+        if header_fill:
+            page.draw_rect(fitz.Rect(margin, margin, width - margin, margin + cell_h),
+                           color=None, fill=header_fill)
+        for r in range(rows + 1):
+            y = margin + r * cell_h
+            page.draw_line((margin, y), (width - margin, y), color=(0, 0, 0), width=1)
+        for c in range(cols + 1):
+            x = margin + c * cell_w
+            page.draw_line((x, margin), (x, height - margin), color=(0, 0, 0), width=1)
+        for r in range(rows):
+            for c in range(cols):
+                page.insert_text((margin + c * cell_w + 4, margin + r * cell_h + cell_h * 0.65),
+                                 f"{(r * 37 + c * 11) % 1000},{r}", fontsize=min(10, cell_h * 0.5))
+    return _render(width, height, draw, dpi)
+
+
+def _bar_chart(bars: int, width: int, height: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    palette = [(0.2, 0.4, 0.8), (0.9, 0.5, 0.1), (0.3, 0.7, 0.3), (0.8, 0.2, 0.2)]
+
+    def draw(page):
+        x0, y0 = 40, height - 30
+        page.draw_line((x0, 20), (x0, y0), color=(0, 0, 0), width=1)
+        page.draw_line((x0, y0), (width - 20, y0), color=(0, 0, 0), width=1)
+        bar_w = (width - x0 - 40) / bars
+        for i in range(bars):
+            bar_h = rng.uniform(0.2, 0.9) * (y0 - 30)
+            page.draw_rect(fitz.Rect(x0 + 10 + i * bar_w, y0 - bar_h, x0 + (i + 0.7) * bar_w, y0),
+                           color=None, fill=palette[i % len(palette)])
+            page.insert_text((x0 + 10 + i * bar_w, y0 + 15), f"T{i + 1}", fontsize=8)
+        page.insert_text((x0, 14), "Évolution des effectifs", fontsize=10)
+    return _render(width, height, draw)
+
+
+def _line_chart(width: int, height: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+
+    def draw(page):
+        x0, y0 = 40, height - 30
+        page.draw_line((x0, 20), (x0, y0), color=(0, 0, 0), width=1)
+        page.draw_line((x0, y0), (width - 20, y0), color=(0, 0, 0), width=1)
+        for color in ((0.1, 0.3, 0.9), (0.9, 0.2, 0.2)):
+            points = [fitz.Point(x0 + i * (width - x0 - 30) / 11, y0 - rng.uniform(0.1, 0.9) * (y0 - 30))
+                      for i in range(12)]
+            page.draw_polyline(points, color=color, width=2)
+        page.insert_text((x0, 14), "Taux de réussite", fontsize=10)
+    return _render(width, height, draw)
+
+
+def _timeline(width: int, height: int, seed: int) -> bytes:
+    """Frise / diagramme de Gantt : barres colorées sur un axe des mois, très allongé."""
+    rng = random.Random(seed)
+    palette = [(0.2, 0.4, 0.8), (0.9, 0.5, 0.1), (0.3, 0.7, 0.3), (0.8, 0.2, 0.2)]
+
+    def draw(page):
+        rows = 4
+        row_h = (height - 30) / rows
+        page.draw_line((20, height - 20), (width - 20, height - 20), color=(0, 0, 0), width=1)
+        for m in range(12):
+            x = 20 + m * (width - 40) / 12
+            page.draw_line((x, height - 24), (x, height - 16), color=(0, 0, 0), width=1)
+            page.insert_text((x + 2, height - 4), f"M{m + 1}", fontsize=8)
+        for r in range(rows):
+            start = rng.uniform(0, 0.6) * (width - 40)
+            length = rng.uniform(0.15, 0.4) * (width - 40)
+            y = 8 + r * row_h
+            page.draw_rect(fitz.Rect(20 + start, y, 20 + start + length, y + row_h * 0.6),
+                           color=None, fill=palette[r % len(palette)])
+            page.insert_text((24 + start, y + row_h * 0.45), f"Lot {r + 1}", fontsize=7, color=(1, 1, 1))
+    return _render(width, height, draw)
+
+
+def _pie_chart(width: int, height: int) -> bytes:
+    def draw(page):
+        center = fitz.Point(width / 2, height / 2)
+        radius = min(width, height) * 0.35
+        start = fitz.Point(center.x + radius, center.y)
+        colors = [(0.2, 0.4, 0.8), (0.9, 0.5, 0.1), (0.3, 0.7, 0.3), (0.8, 0.2, 0.2)]
+        for angle, color in zip((120, 90, 80, 70), colors):
+            shape = page.new_shape()
+            end = shape.draw_sector(center, start, angle, fullSector=True)
+            shape.finish(color=(1, 1, 1), fill=color)
+            shape.commit()
+            start = end
+    return _render(width, height, draw)
+
+
+def _photo(width: int, height: int, seed: int, block: int) -> bytes:
+    """Mosaïque de blocs colorés bruités, proche d'une photographie réduite."""
+    rng = random.Random(seed)
+    samples = bytearray(width * height * 3)
+    base = [rng.randrange(256) for _ in range(3)]
+    for by in range(0, height, block):
+        for bx in range(0, width, block):
+            color = [max(0, min(255, c + rng.randint(-60, 60))) for c in base]
+            for y in range(by, min(by + block, height)):
+                for x in range(bx, min(bx + block, width)):
+                    i = (y * width + x) * 3
+                    samples[i:i + 3] = bytes(max(0, min(255, c + rng.randint(-25, 25))) for c in color)
+    return fitz.Pixmap(fitz.csRGB, width, height, bytes(samples), False).tobytes("png")
+
+
+def _solid(width: int, height: int, color: Tuple[int, int, int]) -> bytes:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+    pix.set_rect(pix.irect, color)
+    return pix.tobytes("png")
+
+
+def _gradient(width: int, height: int) -> bytes:
+    samples = bytearray()
+    for _ in range(height):
+        for x in range(width):
+            v = int(255 * x / max(1, width - 1))
+            samples += bytes((v, 80, 255 - v))
+    return fitz.Pixmap(fitz.csRGB, width, height, bytes(samples), False).tobytes("png")
+
+
+def _banner(width: int, height: int) -> bytes:
+    def draw(page):
+        page.draw_rect(page.rect, color=None, fill=(0.0, 0.2, 0.5))
+        page.insert_text((10, height * 0.7), "République Française", fontsize=height * 0.5, color=(1, 1, 1))
+    return _render(width, height, draw)
+
+
+def _divider(width: int, height: int) -> bytes:
+    def draw(page):
+        page.draw_line((0, height / 2), (width, height / 2), color=(0.6, 0.6, 0.6), width=2)
+    return _render(width, height, draw)
+
+
+def chart_png(width: int = 400, height: int = 300, seed: int = 0) -> bytes:
+    """Graphique en barres (image non décorative) pour les tests d'extraction."""
+    return _bar_chart(6, width, height, seed)
+
+
+def decorative_png(width: int = 400, height: int = 300) -> bytes:
+    """Aplat de couleur (image décorative) pour les tests d'extraction."""
+    return _solid(width, height, (0, 51, 128))
+
+
+def labeled_images() -> List[Tuple[str, bytes, str]]:
+    """
+    Retourne le jeu étiqueté.
+
+    Returns:
+        Liste de (nom, contenu PNG, classe attendue)
+    """
+    return [
+        ("table_5x4", _table(5, 4, 400, 220), "table"),
+        ("table_10x6_header", _table(10, 6, 600, 400, header_fill=(0.85, 0.85, 0.85)), "table"),
+        ("table_3x3_hires", _table(3, 3, 300, 150, dpi=216), "table"),
+        ("table_20x8_dense", _table(20, 8, 800, 700), "table"),
+        ("table_wide", _table(2, 12, 1200, 120), "table"),
+        ("bar_chart_6", _bar_chart(6, 400, 300, seed=1), "chart"),
+        ("bar_chart_12", _bar_chart(12, 600, 350, seed=2), "chart"),
+        ("line_chart", _line_chart(500, 300, seed=3), "chart"),
+        ("line_chart_small", _line_chart(300, 220, seed=4), "chart"),
+        ("pie_chart", _pie_chart(300, 300), "chart"),
+        ("timeline_wide", _timeline(1400, 180, seed=8), "chart"),
+        ("photo_fine", _photo(320, 240, seed=5, block=4), "photo"),
+        ("photo_coarse", _photo(300, 300, seed=6, block=16), "photo"),
+        ("photo_portrait", _photo(240, 320, seed=7, block=8), "photo"),
+        ("solid_background", _solid(400, 300, (240, 240, 250)), "decorative"),
+        ("blank_white", _solid(300, 300, (255, 255, 255)), "decorative"),
+        ("gradient", _gradient(400, 200), "decorative"),
+        ("banner", _banner(900, 80), "decorative"),
+        ("divider", _divider(600, 40), "decorative"),
+    ]
@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour le stockage des artefacts d'extraction.
+"""
+
+import pytest
+import gzip
+import os
+import sys
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.documents import ArtifactStore, ExtractionArtifact, extract_pdf
+
+
+@pytest.fixture
+def store(tmp_path) -> ArtifactStore:
+    return ArtifactStore(str(tmp_path / "artifacts"))
+
+
+@pytest.fixture
+def artifact() -> ExtractionArtifact:
+    return ExtractionArtifact(
+        content_hash="abc123",
+        filename="rapport.pdf",
+        text="Première page.\nDeuxième page.\n",
+        page_starts=[0, 15],
+        table_chunks=[{
+            "id": 4,
+            "text": "[TABLEAU - Page 2]\n| A | B |",
+            "metadata": {"filename": "rapport.pdf", "page": 2, "type": "table"},
+            "embedding": [0.1, 0.2],
+        }],
+    )
+
+
+class TestArtifactStore:
+    """Tests pour ArtifactStore."""
+
+    def test_roundtrip(self, store, artifact):
+        """L'artefact relu est identique, sans identifiant ni embedding de chunk."""
+        store.save(artifact)
+        loaded = store.load("abc123")
+
+        assert loaded.text == artifact.text
+        assert loaded.page_starts == [0, 15]
+        assert loaded.image_chunks is None
+        assert loaded.table_chunks == [{
+            "text": "[TABLEAU - Page 2]\n| A | B |",
+            "metadata": {"filename": "rapport.pdf", "page": 2, "type": "table"},
+        }]
+
+    def test_file_is_compressed(self, store, artifact):
+        """Un fichier gzip par empreinte de contenu."""
+        store.save(artifact)
+        path = os.path.join(store.directory, "abc123.json.gz")
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert "Deuxième page" in f.read()
+
+    def test_missing_or_corrupted(self, store):
+        """Artefact absent ou illisible : None."""
+        assert store.load("inconnu") is None
+
+        with open(os.path.join(store.directory, "casse.json.gz"), "wb") as f:
+            f.write(b"pas du gzip")
+        assert store.load("casse") is None
+
+    def test_set_image_chunks(self, store, artifact):
+        """Les chunks d'images sont ajoutés à l'artefact existant."""
+        assert store.set_image_chunks("abc123", [{"text": "x", "metadata": {}}]) is False
+
+        store.save(artifact)
+        image_chunks = [{"text": "[IMAGE - Page 1]\nUn logo", "metadata": {"type": "image"}}]
+        assert store.set_image_chunks("abc123", image_chunks) is True
+
+        loaded = store.load("abc123")
+        assert loaded.image_chunks == image_chunks
+        assert loaded.text == artifact.text
+
+    def test_delete_and_clear(self, store, artifact):
+        store.save(artifact)
+        store.delete("abc123")
+        assert store.load("abc123") is None
+
+        store.save(artifact)
+        store.clear()
+        assert os.listdir(store.directory) == []
+
+
+class TestPageMap:
+    """Tests pour le découpage en pages."""
+
+    def test_extract_pdf_page_starts(self):
+        """extract_pdf donne le début de chaque page dans le texte."""
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Page un")
+        doc.new_page().insert_text((72, 72), "Page deux")
+        data = doc.tobytes()
+        doc.close()
+
+        content = extract_pdf(data)
+
+        assert len(content.page_starts) == 2
+        assert content.page_starts[0] == 0
+        assert content.text[content.page_starts[1]:].startswith("Page deux")
@@ -0,0 +1,57 @@
+"""
+Tests unitaires pour la création du client ChromaDB (mode embarqué ou serveur).
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("chromadb")
+
+from providers import chroma
+from providers.chroma import create_chroma_client, get_server_address
+
+
+class TestCreateChromaClient:
+    """Tests pour create_chroma_client."""
+
+    def test_embedded_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CHROMA_SERVER_HOST", raising=False)
+        with patch.object(chroma.chromadb, "PersistentClient") as persistent, \
+                patch.object(chroma.chromadb, "HttpClient") as http:
+            create_chroma_client(str(tmp_path / "db"))
+
+        assert persistent.call_args.kwargs["path"] == str(tmp_path / "db")
+        http.assert_not_called()
+
+    def test_server_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("CHROMA_SERVER_HOST", "chroma")
+        monkeypatch.setenv("CHROMA_SERVER_PORT", "8001")
+        with patch.object(chroma.chromadb, "PersistentClient") as persistent, \
+                patch.object(chroma.chromadb, "HttpClient") as http:
+            create_chroma_client(str(tmp_path / "db"))
+
+        assert http.call_args.kwargs["host"] == "chroma"
+        assert http.call_args.kwargs["port"] == 8001
+        persistent.assert_not_called()
+
+    def test_explicit_empty_host_forces_embedded(self, tmp_path, monkeypatch):
+        """host="" ignore l'environnement (choix déjà fait par la configuration)."""
+        monkeypatch.setenv("CHROMA_SERVER_HOST", "chroma")
+        with patch.object(chroma.chromadb, "PersistentClient") as persistent, \
+                patch.object(chroma.chromadb, "HttpClient") as http:
+            create_chroma_client(str(tmp_path / "db"), host="")
+
+        persistent.assert_called_once()
+        http.assert_not_called()
+
+    def test_server_address(self, monkeypatch):
+        monkeypatch.delenv("CHROMA_SERVER_HOST", raising=False)
+        assert get_server_address() is None
+
+        monkeypatch.setenv("CHROMA_SERVER_HOST", " localhost ")
+        monkeypatch.delenv("CHROMA_SERVER_PORT", raising=False)
+        assert get_server_address() == ("localhost", 8000)
@@ -0,0 +1,248 @@
+"""
+Tests unitaires pour la limitation de débit partagée.
+"""
+
+import pytest
+import os
+import sys
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers import concurrency
+from providers.concurrency import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INGESTION,
+    PRIORITY_INTERACTIVE,
+    Governor,
+    GovernorTimeout,
+    RateLimiter,
+    call_priority,
+    current_priority,
+    get_governor,
+    get_rate_limiter,
+)
+
+
+class TestRateLimiter:
+    """Tests pour RateLimiter."""
+
+    def test_acquire_within_quota(self):
+        """Les acquisitions sous le quota sont immédiates."""
+        limiter = RateLimiter(requests_per_minute=3)
+
+        assert all(limiter.acquire(timeout=0) for _ in range(3))
+
+    def test_acquire_over_quota_times_out(self):
+        """Au-delà du quota, l'acquisition attend puis expire."""
+        limiter = RateLimiter(requests_per_minute=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        assert limiter.acquire(timeout=0.05) is False
+
+    def test_window_slides(self):
+        """Un créneau se libère à la fin de la fenêtre."""
+        limiter = RateLimiter(requests_per_minute=1, period=0.1)
+        limiter.acquire()
+
+        assert limiter.acquire(timeout=1) is True
+
+    def test_zero_means_unlimited(self):
+        """Un quota de 0 désactive la limitation."""
+        limiter = RateLimiter(requests_per_minute=0)
+
+        assert all(limiter.acquire(timeout=0) for _ in range(1000))
+
+
+class TestGetRateLimiter:
+    """Tests pour le registre de limiteurs partagés."""
+
+    def test_same_instance_per_name(self):
+        """Un même nom retourne toujours le même limiteur."""
+        assert get_rate_limiter("test-shared") is get_rate_limiter("test-shared")
+
+    def test_quota_from_env(self, monkeypatch):
+        """Le quota est lu depuis <NOM>_RATE_LIMIT_RPM à la création."""
+        monkeypatch.setenv("TESTENV_RATE_LIMIT_RPM", "7")
+        with patch.dict(concurrency._limiters, clear=True):
+            limiter = get_rate_limiter("testenv")
+
+        assert limiter.requests_per_minute == 7
+
+    def test_invalid_env_falls_back_to_default(self, monkeypatch, caplog):
+        """Une valeur non entière est ignorée avec un avertissement."""
+        monkeypatch.setenv("TESTBAD_RATE_LIMIT_RPM", "100/min")
+        monkeypatch.setenv("TESTBAD_MAX_CONCURRENCY", "")
+        monkeypatch.setenv("TESTBAD_INTERACTIVE_RESERVED", "deux")
+        with patch.dict(concurrency._limiters, clear=True), patch.dict(concurrency._governors, clear=True):
+            governor = get_governor("testbad")
+
+        assert governor.rate_limiter.requests_per_minute == concurrency.DEFAULT_REQUESTS_PER_MINUTE
+        assert governor.max_concurrency == concurrency.DEFAULT_MAX_CONCURRENCY
+        assert governor.interactive_reserved == concurrency.DEFAULT_INTERACTIVE_RESERVED
+        assert "TESTBAD_RATE_LIMIT_RPM" in caplog.text
+        assert "TESTBAD_INTERACTIVE_RESERVED" in caplog.text
+
+
+class TestGovernor:
+    """Tests pour Governor (appels simultanés, file d'attente, métriques)."""
+
+    def test_concurrency_limit_queues(self):
+        """Au-delà de max_concurrency, l'appel attend qu'une place se libère."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=1)
+        assert governor.acquire(timeout=0)
+        assert governor.acquire(timeout=0.05) is False
+
+        threading.Timer(0.05, governor.release).start()
+        assert governor.acquire(timeout=2) is True
+        governor.release()
+
+        stats = governor.stats()
+        assert stats["in_flight"] == 0
+        assert stats["acquired"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["max_wait_ms"] >= 40
+
+    def test_queue_depth(self):
+        """Les appels en attente apparaissent dans les métriques."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=1)
+        governor.acquire()
+        waiter = threading.Thread(target=governor.acquire)
+        waiter.start()
+        deadline = time.monotonic() + 2
+        while governor.stats()["queued"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert governor.stats()["queued"] == 1
+        governor.release()
+        waiter.join(timeout=2)
+        stats = governor.stats()
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 1
+
+    def test_slot_releases_on_error(self):
+        governor = Governor("test", RateLimiter(0), max_concurrency=1)
+        with pytest.raises(RuntimeError):
+            with governor.slot():
+                raise RuntimeError("échec")
+
+        assert governor.stats()["in_flight"] == 0
+
+    def test_slot_timeout(self):
+        governor = Governor("test", RateLimiter(0), max_concurrency=1)
+        with governor.slot():
+            with pytest.raises(GovernorTimeout):
+                with governor.slot(timeout=0.01):
+                    pass
+
+    def test_rate_limit_timeout_releases_place(self):
+        """Quota par minute épuisé : la place d'appel est rendue à l'expiration."""
+        governor = Governor("test", RateLimiter(1), max_concurrency=1)
+        with governor.slot():
+            pass
+
+        assert governor.acquire(timeout=0.05) is False
+        assert governor.stats()["in_flight"] == 0
+
+    def test_pause(self):
+        """Après un 429, les nouveaux appels attendent la fin de la pause."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=0)
+        governor.pause(0.1)
+
+        start = time.monotonic()
+        with governor.slot():
+            pass
+        assert time.monotonic() - start >= 0.09
+
+    def test_get_governor_shares_rate_limiter(self, monkeypatch):
+        monkeypatch.setenv("TESTGOV_MAX_CONCURRENCY", "3")
+        with patch.dict(concurrency._limiters, clear=True), patch.dict(concurrency._governors, clear=True):
+            governor = get_governor("testgov")
+
+            assert governor is get_governor("testgov")
+            assert governor.rate_limiter is get_rate_limiter("testgov")
+            assert governor.max_concurrency == 3
+
+
+class TestPriorities:
+    """Tests pour la priorité des appels (questions avant ingestion et arrière-plan)."""
+
+    def test_priority_order(self):
+        """Les appels en attente sont servis par priorité, pas par ordre d'arrivée."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=1, interactive_reserved=0)
+        governor.acquire()
+        served = []
+
+        def call(priority, name):
+            with governor.slot(priority=priority):
+                served.append(name)
+
+        threads = []
+        for priority, name in [(PRIORITY_BACKGROUND, "background"), (PRIORITY_INGESTION, "ingestion"),
+                               (PRIORITY_INTERACTIVE, "interactive")]:
+            thread = threading.Thread(target=call, args=(priority, name))
+            thread.start()
+            threads.append(thread)
+            deadline = time.monotonic() + 2
+            while governor.stats()["queued"] < len(threads) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        governor.release()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert served == ["interactive", "ingestion", "background"]
+
+    def test_reserved_places(self):
+        """Les dernières places restent libres pour les questions."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=3, interactive_reserved=1)
+        assert governor.acquire(timeout=0, priority=PRIORITY_INGESTION)
+        assert governor.acquire(timeout=0, priority=PRIORITY_BACKGROUND)
+        assert governor.acquire(timeout=0, priority=PRIORITY_BACKGROUND) is False
+
+        assert governor.acquire(timeout=0, priority=PRIORITY_INTERACTIVE)
+        assert governor.stats()["in_flight"] == 3
+
+    def test_reservation_leaves_one_place(self):
+        """Au moins une place reste ouverte aux appels non interactifs."""
+        governor = Governor("test", RateLimiter(0), max_concurrency=2, interactive_reserved=5)
+        assert governor.interactive_reserved == 1
+        assert governor.acquire(timeout=0, priority=PRIORITY_BACKGROUND)
+
+    def test_rate_limit_share(self):
+        """Une part du quota par minute est réservée aux questions."""
+        governor = Governor("test", RateLimiter(10), max_concurrency=0)
+        for _ in range(9):
+            assert governor.acquire(timeout=0, priority=PRIORITY_BACKGROUND)
+            governor.release()
+
+        assert governor.acquire(timeout=0.01, priority=PRIORITY_BACKGROUND) is False
+        assert governor.acquire(timeout=0, priority=PRIORITY_INTERACTIVE)
+
+    def test_context_priority(self):
+        """La priorité suit le contexte, y compris dans un pool via copy_context()."""
+        assert current_priority() == PRIORITY_INTERACTIVE
+        with call_priority(PRIORITY_BACKGROUND):
+            assert current_priority() == PRIORITY_BACKGROUND
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert executor.submit(contextvars.copy_context().run, current_priority).result() == PRIORITY_BACKGROUND
+        assert current_priority() == PRIORITY_INTERACTIVE
+
+    def test_stats_by_priority(self):
+        governor = Governor("test", RateLimiter(0), max_concurrency=2)
+        with call_priority(PRIORITY_INGESTION):
+            with governor.slot():
+                pass
+
+        priorities = governor.stats()["priorities"]
+        assert priorities["ingestion"]["acquired"] == 1
+        assert priorities["interactive"]["acquired"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
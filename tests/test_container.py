@@ -0,0 +1,152 @@
+"""
+Tests unitaires pour le conteneur d'injection de dépendances.
+"""
+
+import pytest
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("chromadb")
+
+from src import config as config_module
+from src.config import Config, DependencyContainer
+
+
+@pytest.fixture
+def config():
+    cfg = Config()
+    cfg.ALBERT_API_KEY = "albert-key"
+    cfg.ARISTOTE_API_KEY = "aristote-key"
+    cfg.DEFAULT_LLM_PROVIDER = "albert"
+    cfg.DEFAULT_EMBEDDING_PROVIDER = "albert"
+    return cfg
+
+
+@pytest.fixture
+def adapters():
+    """Adapters remplacés par des mocks (une nouvelle instance par construction)."""
+    names = ["AlbertLLMAdapter", "AristoteLLMAdapter", "AlbertEmbeddingAdapter",
+             "OllamaEmbeddingAdapter", "ChromaDBAdapter"]
+    patchers = {name: patch.object(config_module, name) for name in names}
+    mocks = {name: p.start() for name, p in patchers.items()}
+    for mock in mocks.values():
+        mock.side_effect = lambda *args, **kwargs: MagicMock()
+    mocks["AlbertEmbeddingAdapter"].MODEL_NAME = "openweight-embeddings"
+    yield mocks
+    for p in patchers.values():
+        p.stop()
+
+
+class TestDependencyContainer:
+    """Tests pour DependencyContainer."""
+
+    def test_one_instance_per_provider(self, config, adapters):
+        """Alterner entre providers ne reconstruit pas les adapters."""
+        container = DependencyContainer(config)
+
+        albert = container.get_llm_port("albert")
+        aristote = container.get_llm_port("aristote")
+
+        assert container.get_llm_port("albert") is albert
+        assert container.get_llm_port("aristote") is aristote
+        assert albert is not aristote
+        assert adapters["AlbertLLMAdapter"].call_count == 1
+        assert adapters["AristoteLLMAdapter"].call_count == 1
+
+    def test_ollama_fallback_is_kept(self, config, adapters):
+        """Ollama indisponible : bascule vers Albert, sans re-sonder Ollama."""
+        adapters["OllamaEmbeddingAdapter"].side_effect = Exception("connexion refusée")
+        container = DependencyContainer(config)
+
+        first = container.get_embedding_port("ollama")
+
+        assert container.get_embedding_port("ollama") is first
+        assert container.get_embedding_port("albert") is first
+        assert adapters["OllamaEmbeddingAdapter"].call_count == 1
+
+    def test_concurrent_init_builds_once(self, config, adapters):
+        container = DependencyContainer(config)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(container.get_llm_port("albert")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert adapters["AlbertLLMAdapter"].call_count == 1
+        assert all(r is results[0] for r in results)
+
+    def test_warm_up(self, config, adapters):
+        """Le préchauffage construit, sonde et chronomètre les composants configurés."""
+        container = DependencyContainer(config)
+        assert container.readiness()["ready"] is False
+
+        components = container.warm_up()
+
+        assert set(components) == {"vector_store", "embedding:albert", "llm:albert", "llm:aristote"}
+        assert all(state["ready"] and state["duration_ms"] is not None for state in components.values())
+        assert components["llm:aristote"]["required"] is False
+        container.get_vector_store().warm_up.assert_called_once()
+        container.get_embedding_port("albert").embed_text.assert_called_once()
+        container.get_llm_port("albert").ping.assert_called_once()
+        assert adapters["OllamaEmbeddingAdapter"].call_count == 0
+        assert container.readiness()["ready"] is True
+
+    def test_warm_up_without_ping(self, config, adapters):
+        container = DependencyContainer(config)
+
+        container.warm_up(ping=False)
+
+        container.get_llm_port("albert").ping.assert_not_called()
+
+    def test_warm_up_reports_errors(self, config, adapters):
+        """Un provider par défaut indisponible rend l'instance non prête."""
+        config.ARISTOTE_API_KEY = ""
+        config.DEFAULT_LLM_PROVIDER = "aristote"
+        container = DependencyContainer(config)
+
+        components = container.warm_up()
+
+        assert "ARISTOTE_API_KEY" in components["llm:aristote"]["error"]
+        assert components["llm:albert"]["ready"] is True
+        assert container.readiness()["ready"] is False
+
+    def test_retry_warm_up_recovers(self, config, adapters):
+        """Panne passagère au démarrage : la relance rend l'instance prête."""
+        container = DependencyContainer(config)
+        llm = container.get_llm_port("albert")
+        llm.ping.side_effect = [Exception("503"), None]
+
+        container.warm_up()
+        assert container.readiness()["ready"] is False
+
+        assert container.retry_warm_up() is True
+        assert container.readiness()["components"]["llm:albert"]["error"] is None
+        # Seuls les composants requis en échec sont relancés
+        container.get_vector_store().warm_up.assert_called_once()
+
+    def test_optional_component_failure_keeps_ready(self, config, adapters):
+        adapters["AristoteLLMAdapter"].side_effect = Exception("timeout")
+        container = DependencyContainer(config)
+
+        components = container.warm_up()
+
+        assert components["llm:aristote"]["ready"] is False
+        assert container.readiness()["ready"] is True
+
+    def test_shutdown_closes_instances(self, config, adapters):
+        container = DependencyContainer(config)
+        llm = container.get_llm_port("albert")
+
+        with patch.object(config_module, "close_http_pools") as close_pools:
+            container.shutdown()
+
+        llm.close.assert_called_once()
+        close_pools.assert_called_once()
+        assert container.get_llm_port("albert") is not llm
@@ -0,0 +1,121 @@
+"""
+Tests unitaires pour l'extraction en flux des fichiers DOCX.
+"""
+
+import pytest
+import io
+import os
+import sys
+
+import fitz  # PyMuPDF
+from docx import Document
+from docx.oxml import parse_xml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.documents import (
+    DocxContent,
+    extract_docx,
+    iter_docx_blocks,
+    iter_docx_parts,
+)
+
+
+def _png_bytes() -> bytes:
+    """Petite image PNG unie générée avec PyMuPDF."""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 10), False)
+    pix.set_rect(pix.irect, (200, 30, 30))
+    return pix.tobytes("png")
+
+
+@pytest.fixture
+def sample_docx() -> bytes:
+    """DOCX : paragraphe, tableau, paragraphe, image, paragraphe."""
+    doc = Document()
+    doc.add_paragraph("Titre")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "a"
+    table.cell(0, 1).text = "b"
+    table.cell(1, 0).text = "c"
+    table.cell(1, 1).text = "d"
+    doc.add_paragraph("Après")
+    doc.add_picture(io.BytesIO(_png_bytes()))
+    doc.add_paragraph("Fin")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+class TestExtractDocx:
+    """Tests pour extract_docx."""
+
+    def test_blocks_in_document_order(self, sample_docx):
+        """Les lignes de tableau sont émises à leur position dans le document."""
+        content = extract_docx(sample_docx)
+
+        assert isinstance(content, DocxContent)
+        assert content.blocks == ["Titre", "a | b", "c | d", "Après", "Fin"]
+        assert content.text == "Titre\na | b\nc | d\nAprès\nFin"
+
+    def test_image_references(self, sample_docx):
+        """Les images sont collectées pendant la même passe, avec leur position."""
+        content = extract_docx(sample_docx)
+
+        assert len(content.images) == 1
+        ref = content.images[0]
+        assert ref.target.startswith("word/media/")
+        assert ref.target.endswith(".png")
+        assert ref.block_index == 4
+
+    def test_iter_blocks_yields_images(self, sample_docx):
+        """iter_docx_blocks émet les images entre les blocs de texte."""
+        kinds = [kind for kind, _ in iter_docx_blocks(sample_docx)]
+
+        assert kinds == ["text", "text", "text", "text", "image", "text"]
+
+    def test_text_box_read_once(self):
+        """Zone de texte (mc:AlternateContent) : mc:Fallback ignoré quand mc:Choice est présent."""
+        box = '<w:txbxContent><w:p><w:r><w:t>Encadré</w:t></w:r></w:p></w:txbxContent>'
+        doc = Document()
+        paragraph = doc.add_paragraph("Avant ")
+        paragraph.add_run()._r.append(parse_xml(
+            '<mc:AlternateContent '
+            'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+            'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+            'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+            'xmlns:v="urn:schemas-microsoft-com:vml">'
+            f'<mc:Choice Requires="wps"><w:drawing><wps:wsp><wps:txbx>{box}</wps:txbx></wps:wsp></w:drawing></mc:Choice>'
+            f'<mc:Fallback><w:pict><v:shape><v:textbox>{box}</v:textbox></v:shape></w:pict></mc:Fallback>'
+            '</mc:AlternateContent>'
+        ))
+        doc.add_paragraph("Après")
+        buffer = io.BytesIO()
+        doc.save(buffer)
+
+        content = extract_docx(buffer.getvalue())
+
+        assert content.blocks == ["Avant Encadré", "Après"]
+
+    def test_invalid_file_raises(self):
+        """Un fichier qui n'est pas un paquet OOXML lève une erreur."""
+        with pytest.raises(Exception):
+            extract_docx(b"not a docx")
+
+
+class TestIterDocxParts:
+    """Tests pour iter_docx_parts."""
+
+    def test_reads_image_bytes(self, sample_docx):
+        """Les octets des images sont lus depuis le paquet."""
+        content = extract_docx(sample_docx)
+        parts = dict(iter_docx_parts(sample_docx, [ref.target for ref in content.images]))
+
+        image_bytes = parts[content.images[0].target]
+        assert image_bytes == _png_bytes()
+
+    def test_missing_part_is_skipped(self, sample_docx):
+        """Une partie absente du paquet est ignorée."""
+        parts = list(iter_docx_parts(sample_docx, ["word/media/absent.png"]))
+
+        assert parts == []
@@ -0,0 +1,167 @@
+"""
+Tests unitaires pour l'extraction et l'analyse des images des fichiers DOCX.
+"""
+
+import pytest
+import io
+import os
+import re
+import sys
+import zipfile
+from unittest.mock import MagicMock
+
+import fitz  # PyMuPDF
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.vision import DOCXImageExtractor
+from tests.fixtures.labeled_images import chart_png, decorative_png
+
+
+def _small_png() -> bytes:
+    """Icône de 20x10 pixels."""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 10), False)
+    pix.set_rect(pix.irect, (200, 30, 30))
+    return pix.tobytes("png")
+
+
+@pytest.fixture
+def illustrated_docx() -> bytes:
+    """DOCX : graphique répété deux fois, icône, image décorative, second graphique."""
+    doc = Document()
+    doc.add_paragraph("Introduction")
+    doc.add_picture(io.BytesIO(chart_png(seed=1)))
+    doc.add_paragraph("Suite")
+    doc.add_picture(io.BytesIO(_small_png()))
+    doc.add_picture(io.BytesIO(decorative_png()))
+    doc.add_picture(io.BytesIO(chart_png(seed=2)))
+    doc.add_paragraph("Rappel")
+    doc.add_picture(io.BytesIO(chart_png(seed=1)))
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _split_last_occurrence(docx_bytes: bytes) -> bytes:
+    """
+    Fait pointer la dernière occurrence d'une image répétée vers une copie de
+    sa partie (même contenu sous une autre partie, comme après un copier-coller
+    entre documents).
+    """
+    source = zipfile.ZipFile(io.BytesIO(docx_bytes))
+    document = source.read("word/document.xml").decode("utf-8")
+    rels = source.read("word/_rels/document.xml.rels").decode("utf-8")
+
+    rel_id = re.findall(r'r:embed="(rId\d+)"', document)[-1]
+    target = re.search(rf'Id="{rel_id}"[^>]*Target="([^"]+)"|Target="([^"]+)"[^>]*Id="{rel_id}"', rels)
+    target = target.group(1) or target.group(2)
+    index = document.rindex(f'r:embed="{rel_id}"')
+    document = document[:index] + 'r:embed="rIdCopy"' + document[index + len(f'r:embed="{rel_id}"'):]
+    rels = rels.replace(
+        "</Relationships>",
+        '<Relationship Id="rIdCopy" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+        'Target="media/copy.png"/></Relationships>',
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        for name in source.namelist():
+            if name == "word/document.xml":
+                package.writestr(name, document)
+            elif name == "word/_rels/document.xml.rels":
+                package.writestr(name, rels)
+            else:
+                package.writestr(name, source.read(name))
+        package.writestr("word/media/copy.png", source.read(f"word/{target}"))
+    return buffer.getvalue()
+
+
+class TestDOCXImageExtraction:
+    """Tests pour l'extraction des images DOCX."""
+
+    def test_filters_and_deduplicates(self, illustrated_docx):
+        """Icônes et images décoratives écartées, image répétée extraite une fois."""
+        extractor = DOCXImageExtractor()
+
+        images = extractor.extract_images_from_docx(illustrated_docx)
+
+        assert len(images) == 2
+        assert [img.image_index for img in images] == [0, 1]
+        assert all((img.width, img.height) == (400, 300) for img in images)
+
+    def test_repeated_image_keeps_all_positions(self, illustrated_docx):
+        """L'image répétée garde la position de chacune de ses occurrences."""
+        extractor = DOCXImageExtractor()
+
+        images = extractor.extract_images_from_docx(illustrated_docx)
+
+        assert images[0].positions == [1, 3]
+        assert images[1].positions == [2]
+
+    def test_same_content_under_another_part(self, illustrated_docx):
+        """Même contenu sous une autre partie : positions rattachées, y compris au-delà du plafond."""
+        docx_bytes = _split_last_occurrence(illustrated_docx)
+        extractor = DOCXImageExtractor()
+
+        images = extractor.extract_images_from_docx(docx_bytes)
+        capped = extractor.extract_images_from_docx(docx_bytes, max_images=1)
+
+        assert images[0].positions == [1, 3]
+        assert len(capped) == 1
+        assert capped[0].positions == [1, 3]
+
+    def test_max_images(self, illustrated_docx):
+        """Le nombre d'images distinctes est borné."""
+        extractor = DOCXImageExtractor()
+
+        assert len(extractor.extract_images_from_docx(illustrated_docx, max_images=1)) == 1
+
+    def test_invalid_file(self):
+        """Un fichier invalide ne produit aucune image."""
+        assert DOCXImageExtractor().extract_images_from_docx(b"not a docx") == []
+
+
+class TestDOCXImageAnalysis:
+    """Tests pour l'analyse et les chunks des images DOCX."""
+
+    def test_chunks_with_position_metadata(self, illustrated_docx):
+        """Chaque image distincte produit un chunk avec ses positions."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "Graphique des effectifs"
+        vision.analyze_images.return_value = ["Graphique A", "Graphique B"]
+        extractor = DOCXImageExtractor(vision_provider=vision, max_workers=2)
+
+        chunks = list(extractor.iter_image_chunks(illustrated_docx, "rapport.docx"))
+
+        assert len(chunks) == 2
+        first = min(chunks, key=lambda c: c["metadata"]["image_index"])
+        assert first["text"].startswith("[GRAPHIQUE 1 - Document rapport.docx]")
+        assert first["metadata"]["positions"] == "1,3"
+        assert first["metadata"]["block_index"] == 1
+        assert first["metadata"]["is_visual_content"] is True
+
+    def test_chunks_include_positions_found_later(self, illustrated_docx):
+        """Le chunk d'une image émise tôt reprend les positions trouvées ensuite sous une autre partie."""
+        vision = MagicMock()
+        vision.analyze_chart.return_value = "Graphique"
+        extractor = DOCXImageExtractor(vision_provider=vision, max_workers=1, batch_size=1)
+
+        chunks = list(extractor.iter_image_chunks(_split_last_occurrence(illustrated_docx), "rapport.docx"))
+
+        first = min(chunks, key=lambda c: c["metadata"]["image_index"])
+        assert first["metadata"]["positions"] == "1,3"
+
+    def test_bytes_released_after_analysis(self, illustrated_docx):
+        """Les octets des images sont libérés une fois analysées."""
+        vision = MagicMock()
+        vision.analyze_chart.return_value = "Graphique"
+        extractor = DOCXImageExtractor(vision_provider=vision, batch_size=1)
+
+        analyzed = extractor.extract_and_analyze_all(illustrated_docx)
+
+        assert [a.extracted_image.image_index for a in analyzed] == [0, 1]
+        assert [a.description for a in analyzed] == ["Graphique", "Graphique"]
+        assert all(a.extracted_image.image_bytes == b"" for a in analyzed)
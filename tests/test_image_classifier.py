@@ -0,0 +1,80 @@
+"""
+Tests unitaires pour le classifieur local d'images.
+Mesure la précision sur le jeu étiqueté de tests/fixtures/labeled_images.py.
+"""
+
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.vision.image_classifier import (
+    CHART,
+    DECORATIVE,
+    PHOTO,
+    TABLE,
+    classify_image_bytes,
+    compute_features,
+    evaluate_classifier,
+)
+from tests.fixtures.labeled_images import labeled_images
+
+
+@pytest.fixture(scope="module")
+def labeled():
+    """Jeu d'images étiquetées (généré une seule fois)."""
+    return labeled_images()
+
+
+class TestClassifierAccuracy:
+    """Précision du classifieur sur le jeu étiqueté."""
+
+    def test_accuracy_on_labeled_set(self, labeled):
+        """Au moins 90 % des images du jeu sont correctement classées."""
+        result = evaluate_classifier((image, label) for _, image, label in labeled)
+
+        errors = {k: v for k, v in result["confusion"].items() if k[0] != k[1]}
+        assert result["accuracy"] >= 0.9, f"Confusions: {errors}"
+
+    def test_no_informative_image_rejected(self, labeled):
+        """Aucun tableau ni graphique n'est écarté comme décoratif."""
+        for name, image, label in labeled:
+            if label in (TABLE, CHART):
+                assert classify_image_bytes(image) != DECORATIVE, name
+
+    def test_elongated_images(self, labeled):
+        """Très allongées : frises et tableaux larges conservés, bandeaux et séparateurs écartés."""
+        classes = {name: classify_image_bytes(image) for name, image, _ in labeled}
+
+        assert classes["timeline_wide"] == CHART
+        assert classes["table_wide"] == TABLE
+        assert classes["banner"] == DECORATIVE
+        assert classes["divider"] == DECORATIVE
+
+    def test_all_classes_covered(self, labeled):
+        """Le jeu couvre les quatre classes."""
+        assert {label for _, _, label in labeled} == {TABLE, CHART, PHOTO, DECORATIVE}
+
+
+class TestComputeFeatures:
+    """Tests pour compute_features."""
+
+    def test_undecodable_returns_none(self):
+        """Un contenu qui n'est pas une image retourne None."""
+        assert compute_features(b"fake") is None
+        assert classify_image_bytes(b"fake") is None
+
+    def test_table_has_grid_lines(self, labeled):
+        """Un tableau présente des lignes dans les deux directions."""
+        table = next(image for name, image, _ in labeled if name == "table_5x4")
+
+        features = compute_features(table)
+
+        assert features.horizontal_lines >= 6
+        assert features.vertical_lines >= 5
+        assert features.whitespace_ratio > 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Tests unitaires pour la préparation des images avant analyse vision.
+"""
+
+import pytest
+import base64
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.vision.image_preprocessing import (
+    MAX_SIDE_BY_ANALYSIS,
+    detect_mime_type,
+    prepare_image,
+    read_image_size,
+)
+from providers.vision.albert_vision import AlbertVision
+
+
+def _noisy_png(width: int, height: int, alpha: bool = False) -> bytes:
+    """Image PNG bruitée (peu compressible), comme une photo ou un scan."""
+    n = 4 if alpha else 3
+    pix = fitz.Pixmap(fitz.csRGB, width, height, os.urandom(width * height * n), alpha)
+    return pix.tobytes("png")
+
+
+class TestDetectMimeType:
+    """Tests pour detect_mime_type."""
+
+    def test_signatures(self):
+        """Les signatures courantes sont reconnues."""
+        assert detect_mime_type(b"\x89PNG\r\n\x1a\n....") == "image/png"
+        assert detect_mime_type(b"\xff\xd8\xff\xe0....") == "image/jpeg"
+        assert detect_mime_type(b"GIF89a....") == "image/gif"
+        assert detect_mime_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+
+    def test_unknown_uses_default(self):
+        """Une signature inconnue retourne le type par défaut."""
+        assert detect_mime_type(b"fake") == "image/png"
+
+
+class TestReadImageSize:
+    """Tests pour read_image_size."""
+
+    def test_png_and_jpeg_headers(self):
+        """Les dimensions sont lues dans l'en-tête PNG et JPEG."""
+        pix = fitz.Pixmap(fitz.csRGB, 123, 45, os.urandom(123 * 45 * 3), False)
+
+        assert read_image_size(pix.tobytes("png")) == (123, 45)
+        assert read_image_size(pix.tobytes("jpg")) == (123, 45)
+
+    def test_unknown_format(self):
+        """Un format non reconnu retourne None."""
+        assert read_image_size(b"\x01\x00\x00\x00EMF") is None
+
+
+class TestPrepareImage:
+    """Tests pour prepare_image."""
+
+    def test_large_image_downscaled_per_analysis_type(self):
+        """Le plus grand côté est plafonné selon le type d'analyse."""
+        image_bytes = _noisy_png(2400, 1200)
+
+        table = prepare_image(image_bytes, "table")
+        generic = prepare_image(image_bytes, "image")
+
+        assert max(table.width, table.height) == MAX_SIDE_BY_ANALYSIS["table"]
+        assert max(generic.width, generic.height) == MAX_SIDE_BY_ANALYSIS["image"]
+        assert generic.width / generic.height == pytest.approx(2.0, rel=0.01)
+        assert generic.bytes_saved > 0
+
+    def test_mime_matches_encoding(self):
+        """Le type MIME annoncé correspond au contenu encodé."""
+        prepared = prepare_image(_noisy_png(1800, 1800), "chart")
+
+        assert prepared.mime_type == detect_mime_type(prepared.data)
+        assert len(prepared.data) < prepared.original_size
+
+    def test_alpha_removed(self):
+        """Une image avec transparence est aplatie et reste décodable."""
+        prepared = prepare_image(_noisy_png(1200, 600, alpha=True), "image")
+
+        assert fitz.Pixmap(prepared.data).alpha == 0
+
+    def test_small_image_kept_when_not_smaller(self):
+        """Une petite image déjà compacte est envoyée telle quelle."""
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+        pix.clear_with(255)
+        image_bytes = pix.tobytes("png")
+
+        prepared = prepare_image(image_bytes, "image")
+
+        assert prepared.data == image_bytes
+        assert prepared.mime_type == "image/png"
+        assert prepared.bytes_saved == 0
+
+    def test_undecodable_bytes_passed_through(self):
+        """Un contenu non décodable est envoyé tel quel."""
+        prepared = prepare_image(b"not an image", "table")
+
+        assert prepared.data == b"not an image"
+        assert prepared.width is None
+
+
+class TestAlbertVisionPreprocessing:
+    """Tests pour la préparation des images dans AlbertVision."""
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_payload_uses_prepared_image(self, mock_openai_class):
+        """L'image envoyée est réduite et son type MIME est correct."""
+        mock_client = MagicMock()
+        mock_openai_class.return_value = mock_client
+        vision = AlbertVision(api_key="test-key")
+        image_bytes = _noisy_png(2400, 1600)
+
+        vision.analyze_chart(image_bytes)
+
+        messages = mock_client.chat.completions.create.call_args[1]["messages"]
+        url = messages[0]["content"][1]["image_url"]["url"]
+        header, b64_data = url.split(",", 1)
+        sent = base64.b64decode(b64_data)
+        assert header == f"data:{detect_mime_type(sent)};base64"
+        assert max(fitz.Pixmap(sent).width, fitz.Pixmap(sent).height) == MAX_SIDE_BY_ANALYSIS["chart"]
+        assert vision.preprocessing_stats["bytes_saved"] == len(image_bytes) - len(sent)
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_preprocessing_can_be_disabled(self, mock_openai_class):
+        """Avec preprocess=False, les octets sont envoyés sans modification."""
+        mock_client = MagicMock()
+        mock_openai_class.return_value = mock_client
+        vision = AlbertVision(api_key="test-key", preprocess=False)
+        image_bytes = _noisy_png(600, 600)
+
+        vision.analyze_image(image_bytes)
+
+        messages = mock_client.chat.completions.create.call_args[1]["messages"]
+        url = messages[0]["content"][1]["image_url"]["url"]
+        assert base64.b64decode(url.split(",", 1)[1]) == image_bytes
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
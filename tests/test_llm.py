@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from providers.llm.base import LLMProvider
 from providers.llm.aristote import AristoteLLM
 from providers.llm.albert import AlbertLLM
+from providers.http_pool import get_http_client
 
 
 class TestLLMProviderInterface:
@@ -53,6 +54,7 @@ class TestAristoteLLM:
         mock_openai.assert_called_once_with(
             api_key="test-key",
             base_url="https://api.test.com/v1",
+            http_client=get_http_client("https://api.test.com/v1"),
         )
 
     @patch('providers.llm.aristote.OpenAI')
@@ -4,6 +4,8 @@ Tests unitaires pour l'extracteur d'images PDF.
 
 import pytest
 import os
+import threading
+import time
 from unittest.mock import Mock, patch, MagicMock
 import sys
 
@@ -13,8 +15,55 @@ from providers.vision.pdf_image_extractor import (
     PDFImageExtractor,
     ExtractedImage,
     AnalyzedImage,
+    PageRoute,
     extract_pdf_with_vision,
 )
+import fitz  # PyMuPDF
+
+from tests.fixtures.labeled_images import chart_png, decorative_png
+
+
+LOREM = (
+    "Le chatbot RAG indexe les documents administratifs et répond aux questions "
+    "en citant ses sources. "
+) * 4
+
+
+def _png_bytes(width: int = 400, height: int = 300) -> bytes:
+    """Image PNG (graphique en barres) générée avec PyMuPDF."""
+    return chart_png(width, height)
+
+
+@pytest.fixture
+def routed_pdf() -> bytes:
+    """
+    PDF de 5 pages :
+    1. texte seul
+    2. texte + figure
+    3. scan (image pleine page, sans texte)
+    4. page vide
+    5. scan océrisé (image pleine page + couche texte)
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 400), LOREM)
+
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 300), LOREM)
+    page.insert_image(fitz.Rect(100, 350, 500, 650), stream=_png_bytes())
+
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=_png_bytes(600, 800))
+
+    doc.new_page()
+
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=_png_bytes(600, 800))
+    page.insert_textbox(fitz.Rect(50, 50, 550, 400), LOREM)
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
 
 
 class TestExtractedImage:
@@ -284,6 +333,470 @@ class TestPDFImageExtractor:
         assert "[IMAGE" in chunks[0]["text"]
 
 
+class TestPageRouting:
+    """Tests pour le routage des pages avant l'analyse vision."""
+
+    def test_plan_pages(self, routed_pdf):
+        """Chaque page reçoit la décision attendue."""
+        extractor = PDFImageExtractor()
+
+        routes = extractor.plan_pages(routed_pdf)
+
+        assert [r.route for r in routes] == ["skip", "images", "render", "skip", "skip"]
+        assert all(isinstance(r, PageRoute) for r in routes)
+        assert routes[2].text_chars == 0
+        assert routes[2].image_coverage > PDFImageExtractor.TEXT_COVERED_COVERAGE
+        assert routes[1].image_count == 1
+
+    def test_select_images_follows_routes(self, routed_pdf):
+        """Seules la figure de la page 2 et le rendu de la page 3 sont retenus."""
+        extractor = PDFImageExtractor()
+
+        images = extractor.select_images(routed_pdf)
+
+        assert [(img.page_number, img.source) for img in images] == [(2, "image"), (3, "page")]
+        assert images[1].image_type == "png"
+
+    def test_select_images_without_routing(self, routed_pdf):
+        """Sans routage, toutes les images intégrées sont extraites."""
+        extractor = PDFImageExtractor(route_pages=False)
+
+        images = extractor.select_images(routed_pdf)
+
+        # Les pages 3 et 5 portent la même image : extraite une seule fois
+        assert [img.pages for img in images] == [[2], [3, 5]]
+        assert all(img.source == "image" for img in images)
+
+    def test_rendered_page_uses_transcription_prompt(self, routed_pdf):
+        """Les pages rendues sont transcrites, puis indexées comme pages numérisées."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "Texte de la page"
+        extractor = PDFImageExtractor(vision_provider=vision)
+
+        page_image = extractor.render_pages(routed_pdf, [3])[0]
+        analyzed = extractor.analyze_image(page_image)
+        chunks = extractor.generate_image_chunks([analyzed], "scan.pdf")
+
+        _, kwargs = vision.analyze_image.call_args
+        assert kwargs["prompt"] == PDFImageExtractor.PAGE_RENDER_PROMPT
+        assert chunks[0]["metadata"]["type"] == "page"
+        assert chunks[0]["text"].startswith("[PAGE NUMÉRISÉE - Page 3]")
+
+
+class TestImageDeduplication:
+    """Tests pour le filtrage par métadonnées et le dédoublonnage des images."""
+
+    @staticmethod
+    def _branded_pdf() -> bytes:
+        """PDF de 3 pages portant chacune le même logo (xref partagé), une figure et une icône."""
+        doc = fitz.open()
+        logo = _png_bytes(300, 120)
+        figure = _png_bytes(400, 300)
+        for _ in range(3):
+            page = doc.new_page()
+            page.insert_image(fitz.Rect(20, 20, 320, 140), stream=logo)
+            page.insert_image(fitz.Rect(100, 300, 500, 600), stream=figure)
+            page.insert_image(fitz.Rect(20, 700, 40, 720), stream=_png_bytes(20, 20))
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        return pdf_bytes
+
+    def test_repeated_images_extracted_once(self):
+        """Logo et figure répétés ne sont extraits qu'une fois, avec toutes leurs pages."""
+        extractor = PDFImageExtractor()
+
+        images = extractor.extract_images_from_pdf(self._branded_pdf())
+
+        assert len(images) == 2
+        assert all(img.pages == [1, 2, 3] for img in images)
+        assert all(img.content_hash for img in images)
+
+    def test_small_and_repeated_images_not_decoded(self):
+        """Icônes et xrefs déjà vus sont écartés avant extract_image."""
+        pdf_bytes = self._branded_pdf()
+        extractor = PDFImageExtractor()
+
+        with patch.object(fitz.Document, "extract_image", autospec=True,
+                          side_effect=fitz.Document.extract_image) as mock_extract:
+            extractor.extract_images_from_pdf(pdf_bytes)
+
+        # Une seule extraction par image distincte, l'icône n'est jamais décodée
+        assert mock_extract.call_count == 2
+
+    def test_same_content_under_different_xrefs(self):
+        """Deux xrefs au contenu identique (documents fusionnés) sont dédoublonnés par hash."""
+        doc = fitz.open()
+        for _ in range(2):
+            part = fitz.open()
+            part.new_page().insert_image(fitz.Rect(100, 300, 500, 600), stream=_png_bytes())
+            doc.insert_pdf(part)
+            part.close()
+        pdf_bytes = doc.tobytes()
+        doc.close()
+
+        images = PDFImageExtractor().extract_images_from_pdf(pdf_bytes)
+
+        assert len(images) == 1
+        assert images[0].pages == [1, 2]
+
+    def test_decorative_images_skipped(self):
+        """Les aplats et fonds sont écartés avant la vision, y compris répétés."""
+        doc = fitz.open()
+        for _ in range(2):
+            page = doc.new_page()
+            page.insert_image(fitz.Rect(0, 0, 400, 300), stream=decorative_png())
+            page.insert_image(fitz.Rect(100, 400, 500, 700), stream=_png_bytes())
+        pdf_bytes = doc.tobytes()
+        doc.close()
+
+        images = PDFImageExtractor().extract_images_from_pdf(pdf_bytes)
+        kept_all = PDFImageExtractor(skip_decorative=False).extract_images_from_pdf(pdf_bytes)
+
+        assert [img.content_class for img in images] == ["chart"]
+        assert len(kept_all) == 2
+
+    def test_chunk_lists_all_pages(self):
+        """Le chunk d'une image répétée mentionne toutes ses pages."""
+        extractor = PDFImageExtractor()
+        extracted = ExtractedImage(
+            page_number=1,
+            image_index=0,
+            image_bytes=b"fake",
+            width=300,
+            height=120,
+            image_type="png",
+            bbox=(0, 0, 300, 120),
+            pages=[1, 2, 3],
+        )
+        analyzed = AnalyzedImage(
+            extracted_image=extracted,
+            description="Logo du ministère",
+            is_table=False,
+            is_chart=False,
+            extracted_data=None,
+        )
+
+        chunks = extractor.generate_image_chunks([analyzed], "note.pdf")
+
+        assert chunks[0]["text"].startswith("[IMAGE - Pages 1, 2, 3]")
+        assert chunks[0]["metadata"]["page"] == 1
+        assert chunks[0]["metadata"]["pages"] == "1,2,3"
+
+
+class TestLocalClassification:
+    """Tests pour le choix du prompt à partir du classifieur local."""
+
+    @staticmethod
+    def _image(content_class):
+        return ExtractedImage(
+            page_number=1,
+            image_index=0,
+            image_bytes=b"fake",
+            width=800,
+            height=400,
+            image_type="png",
+            bbox=(0, 0, 800, 400),
+            content_class=content_class,
+        )
+
+    def test_local_class_overrides_aspect_heuristic(self):
+        """Une image large classée photo n'est plus traitée comme un tableau."""
+        extractor = PDFImageExtractor()
+
+        assert extractor.classify_image(self._image("photo")) == (False, False)
+        assert extractor.classify_image(self._image("table")) == (True, False)
+
+    def test_photo_uses_short_prompt(self):
+        """Les photos reçoivent un prompt de description courte et un petit budget de tokens."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "Photo d'un bâtiment"
+        extractor = PDFImageExtractor(vision_provider=vision)
+
+        extractor.analyze_image(self._image("photo"))
+
+        vision.analyze_table.assert_not_called()
+        _, kwargs = vision.analyze_image.call_args
+        assert kwargs["max_tokens"] == PDFImageExtractor.PHOTO_MAX_TOKENS
+
+    def test_table_uses_table_prompt(self):
+        """Les tableaux détectés localement passent par analyze_table."""
+        vision = MagicMock()
+        vision.analyze_table.return_value = "| A |"
+        extractor = PDFImageExtractor(vision_provider=vision)
+
+        analyzed = extractor.analyze_image(self._image("table"))
+
+        vision.analyze_table.assert_called_once()
+        assert analyzed.is_table is True
+
+
+class TestBatchedAnalysis:
+    """Tests pour le regroupement des images en requêtes multi-images."""
+
+    @staticmethod
+    def _image(page, content_class, width=300, height=200):
+        return ExtractedImage(
+            page_number=page,
+            image_index=0,
+            image_bytes=f"image-{page}".encode(),
+            width=width,
+            height=height,
+            image_type="png",
+            bbox=(0, 0, width, height),
+            content_class=content_class,
+        )
+
+    def test_plan_batches_groups_small_images_by_class(self):
+        """Les petites photos et graphiques sont regroupés par classe, les autres restent seuls."""
+        extractor = PDFImageExtractor(vision_provider=MagicMock(), batch_size=2)
+        images = [
+            self._image(1, "photo"),
+            self._image(1, "chart"),
+            self._image(2, "photo"),
+            self._image(2, "table"),
+            self._image(3, "photo"),
+            self._image(3, "photo", width=2000, height=1500),
+        ]
+
+        # Un lot est soumis dès qu'il est plein, les lots incomplets à la fin
+        assert extractor.plan_batches(images) == [[0, 2], [3], [5], [1], [4]]
+
+    def test_batch_results_in_input_order(self):
+        """Un lot produit une AnalyzedImage par image, à sa place d'origine."""
+        vision = MagicMock()
+        vision.analyze_images.return_value = ["Photo 1", "Photo 3"]
+        vision.analyze_table.return_value = "| A |"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=1)
+
+        analyzed = extractor.analyze_images([
+            self._image(1, "photo"),
+            self._image(2, "table"),
+            self._image(3, "photo"),
+        ])
+
+        assert [a.description for a in analyzed] == ["Photo 1", "| A |", "Photo 3"]
+        vision.analyze_images.assert_called_once()
+
+    def test_fallback_to_single_calls_on_parse_failure(self):
+        """Si la réponse groupée est inexploitable, chaque image est analysée seule."""
+        vision = MagicMock()
+        vision.analyze_images.side_effect = ValueError("JSON invalide")
+        vision.analyze_image.side_effect = lambda image_bytes, **kwargs: image_bytes.decode()
+        extractor = PDFImageExtractor(vision_provider=vision)
+
+        analyzed = extractor.analyze_images([self._image(1, "photo"), self._image(2, "photo")])
+
+        assert [a.description for a in analyzed] == ["image-1", "image-2"]
+        assert vision.analyze_image.call_count == 2
+
+    def test_batch_size_one_disables_batching(self):
+        """batch_size=1 revient à une requête par image."""
+        extractor = PDFImageExtractor(vision_provider=MagicMock(), batch_size=1)
+
+        groups = extractor.plan_batches([self._image(1, "photo"), self._image(2, "photo")])
+
+        assert groups == [[0], [1]]
+
+
+class TestConcurrentAnalysis:
+    """Tests pour l'analyse vision concurrente."""
+
+    @staticmethod
+    def _images(count: int):
+        return [
+            ExtractedImage(
+                page_number=i + 1,
+                image_index=0,
+                image_bytes=f"image-{i}".encode(),
+                width=150,
+                height=150,
+                image_type="png",
+                bbox=(0, 0, 150, 150),
+            )
+            for i in range(count)
+        ]
+
+    def test_results_keep_page_order(self):
+        """Les résultats sont retournés dans l'ordre des pages, même si les appels finissent dans le désordre."""
+        vision = MagicMock()
+        active = {"current": 0, "max": 0}
+        lock = threading.Lock()
+
+        def slow_analysis(image_bytes, **kwargs):
+            with lock:
+                active["current"] += 1
+                active["max"] = max(active["max"], active["current"])
+            # Les premières images sont les plus lentes
+            time.sleep(0.05 * (6 - int(image_bytes.decode().split("-")[1])))
+            with lock:
+                active["current"] -= 1
+            return image_bytes.decode()
+
+        vision.analyze_image.side_effect = slow_analysis
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=3)
+
+        analyzed = extractor.analyze_images(self._images(6))
+
+        assert [a.description for a in analyzed] == [f"image-{i}" for i in range(6)]
+        assert 1 < active["max"] <= 3
+
+    def test_timeout_is_forwarded(self):
+        """Le délai par appel est transmis au provider de vision."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "ok"
+        extractor = PDFImageExtractor(vision_provider=vision, analysis_timeout=12.5)
+
+        extractor.analyze_images(self._images(1))
+
+        _, kwargs = vision.analyze_image.call_args
+        assert kwargs["timeout"] == 12.5
+
+    def test_failed_call_does_not_stop_others(self):
+        """Une erreur sur une image n'empêche pas l'analyse des autres."""
+        vision = MagicMock()
+        vision.analyze_image.side_effect = [TimeoutError("timeout"), "ok", "ok"]
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=1)
+
+        analyzed = extractor.analyze_images(self._images(3))
+
+        assert analyzed[0].description.startswith("[Erreur d'analyse]")
+        assert [a.description for a in analyzed[1:]] == ["ok", "ok"]
+
+
+class TestStreamingAnalysis:
+    """Tests pour le pipeline en flux (générateurs)."""
+
+    @staticmethod
+    def _image_stream(count: int, consumed: list):
+        for i in range(count):
+            consumed.append(i)
+            yield ExtractedImage(
+                page_number=i + 1,
+                image_index=0,
+                image_bytes=f"image-{i}".encode(),
+                width=150,
+                height=150,
+                image_type="png",
+                bbox=(0, 0, 150, 150),
+            )
+
+    def test_image_bytes_released_after_analysis(self):
+        """Les octets d'une image sont libérés dès sa description produite."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "ok"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=2)
+
+        analyzed = list(extractor.iter_analyzed_images(self._image_stream(3, [])))
+
+        assert [a.description for a in analyzed] == ["ok"] * 3
+        assert all(a.extracted_image.image_bytes == b"" for a in analyzed)
+
+    def test_first_result_before_full_scan(self):
+        """Le premier résultat est disponible avant la fin du parcours des images."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "ok"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=2)
+        consumed = []
+
+        first = next(extractor.iter_analyzed_images(self._image_stream(10, consumed)))
+
+        assert first.extracted_image.page_number == 1
+        assert len(consumed) <= 2
+
+    def test_in_flight_bounded_by_workers(self):
+        """Au plus max_workers images sont extraites et non encore analysées."""
+        vision = MagicMock()
+        state = {"pending": 0, "max": 0}
+        lock = threading.Lock()
+        consumed = []
+
+        def counted_stream():
+            for image in self._image_stream(8, consumed):
+                with lock:
+                    state["pending"] += 1
+                    state["max"] = max(state["max"], state["pending"])
+                yield image
+
+        def slow_analysis(image_bytes, **kwargs):
+            time.sleep(0.02)
+            with lock:
+                state["pending"] -= 1
+            return "ok"
+
+        vision.analyze_image.side_effect = slow_analysis
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=3)
+
+        analyzed = list(extractor.iter_analyzed_images(counted_stream()))
+
+        assert len(analyzed) == 8
+        assert state["max"] <= 3
+
+    def test_iter_image_chunks(self, routed_pdf):
+        """Les chunks sont émis au fil des pages."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "Figure"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=1)
+
+        chunks = list(extractor.iter_image_chunks(routed_pdf, "doc.pdf"))
+
+        # Les lots multi-images incomplets sont soumis en fin de parcours
+        assert sorted(c["metadata"]["page"] for c in chunks) == [2, 3]
+
+
+    def test_iter_image_chunks_lists_later_pages(self):
+        """Une image analysée avant de réapparaître (autre xref) garde toutes ses pages."""
+        doc = fitz.open()
+        for stream in (_png_bytes(), _png_bytes(500, 300), _png_bytes()):
+            part = fitz.open()
+            part.new_page().insert_image(fitz.Rect(100, 300, 500, 600), stream=stream)
+            doc.insert_pdf(part)
+            part.close()
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        vision = MagicMock()
+        vision.analyze_chart.return_value = "Figure"
+        extractor = PDFImageExtractor(vision_provider=vision, route_pages=False, max_workers=1, batch_size=1)
+
+        chunks = list(extractor.iter_image_chunks(pdf_bytes, "doc.pdf"))
+
+        assert [c["metadata"]["pages"] for c in chunks] == ["1,3", "2"]
+        assert chunks[0]["text"].startswith("[GRAPHIQUE - Pages 1, 3]")
+
+    def test_settled_chunks_emitted_before_end_of_scan(self):
+        """Le chunk d'une image dont les pages ne peuvent plus changer est émis sans attendre la fin du parcours."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "ok"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=1, batch_size=1)
+        consumed = []
+
+        def images():
+            for image in self._image_stream(5, consumed):
+                image.settled_after_page = image.page_number
+                yield image
+
+        first = next(extractor._iter_chunks(images(), "doc.pdf"))
+
+        assert first["metadata"]["page"] == 1
+        assert len(consumed) == 2
+
+    def test_embedded_image_settles_after_last_page_of_its_size(self, routed_pdf):
+        """Une image intégrée est définitive après la dernière page portant une image de même taille."""
+        images = PDFImageExtractor().extract_images_from_pdf(routed_pdf)
+
+        assert all(img.settled_after_page >= max(img.pages) for img in images)
+
+    def test_analyze_images_keeps_caller_bytes(self):
+        """analyze_images ne vide pas les images fournies par l'appelant."""
+        vision = MagicMock()
+        vision.analyze_image.return_value = "ok"
+        extractor = PDFImageExtractor(vision_provider=vision, max_workers=2)
+        images = list(self._image_stream(3, []))
+
+        extractor.analyze_images(images)
+
+        assert [img.image_bytes for img in images] == [b"image-0", b"image-1", b"image-2"]
+
+
 class TestExtractPdfWithVision:
     """Tests pour la fonction utilitaire extract_pdf_with_vision."""
 
@@ -0,0 +1,119 @@
+"""
+Tests unitaires pour l'extraction locale des tableaux natifs des PDF.
+"""
+
+import pytest
+import os
+import sys
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.documents import (
+    PdfContent,
+    PdfTable,
+    extract_pdf,
+    generate_table_chunks,
+)
+from providers.documents.pdf_tables import rows_to_markdown
+
+
+TABLE_ROWS = [
+    ["Service", "Agents", "Budget"],
+    ["RH", "12", "1 200"],
+    ["DSI", "30", "4 500"],
+    ["Finances", "8", "900"],
+]
+
+
+def _draw_table(page, rows, x0=72, y0=100, cell_width=120, row_height=24):
+    """Dessine un tableau vectoriel (traits + texte) sur une page."""
+    cols = len(rows[0])
+    for r in range(len(rows) + 1):
+        page.draw_line((x0, y0 + r * row_height), (x0 + cols * cell_width, y0 + r * row_height))
+    for c in range(cols + 1):
+        page.draw_line((x0 + c * cell_width, y0), (x0 + c * cell_width, y0 + len(rows) * row_height))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            page.insert_text((x0 + c * cell_width + 5, y0 + r * row_height + 16), value)
+
+
+@pytest.fixture
+def table_pdf() -> bytes:
+    """PDF de 2 pages : texte + tableau vectoriel, puis texte seul."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 60), "Rapport annuel des effectifs par service")
+    _draw_table(page, TABLE_ROWS)
+    page.insert_text((72, 250), "Fin du rapport.")
+    doc.new_page().insert_text((72, 72), "Page sans tableau.")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class TestExtractPdf:
+    """Tests pour extract_pdf."""
+
+    def test_tables_detected_with_page(self, table_pdf):
+        """Le tableau vectoriel est détecté localement, avec sa page."""
+        content = extract_pdf(table_pdf)
+
+        assert isinstance(content, PdfContent)
+        assert len(content.tables) == 1
+        table = content.tables[0]
+        assert table.page_number == 1
+        assert table.rows == TABLE_ROWS
+
+    def test_table_text_removed_from_page_text(self, table_pdf):
+        """Le contenu du tableau n'est pas dupliqué dans le texte courant."""
+        content = extract_pdf(table_pdf)
+
+        assert "Rapport annuel" in content.text
+        assert "Fin du rapport." in content.text
+        assert "Page sans tableau." in content.text
+        assert "Finances" not in content.text
+
+    def test_without_table_extraction(self, table_pdf):
+        """Sans détection, le texte est celui de get_text()."""
+        content = extract_pdf(table_pdf, extract_tables=False)
+
+        with fitz.open(stream=table_pdf, filetype="pdf") as doc:
+            expected = "".join(page.get_text() for page in doc)
+        assert content.tables == []
+        assert content.text == expected
+
+
+class TestTableChunks:
+    """Tests pour la conversion Markdown et les chunks de tableaux."""
+
+    def test_markdown(self):
+        """La première ligne sert d'en-tête."""
+        assert rows_to_markdown([["A", "B"], ["1", "2"]]) == "| A | B |\n|---|---|\n| 1 | 2 |"
+
+    def test_chunk_metadata(self, table_pdf):
+        """Un chunk par tableau, étiqueté avec sa page."""
+        content = extract_pdf(table_pdf)
+        chunks = generate_table_chunks(content.tables, "rapport.pdf")
+
+        assert len(chunks) == 1
+        assert chunks[0]["text"].startswith("[TABLEAU - Page 1]\n| Service | Agents | Budget |")
+        metadata = chunks[0]["metadata"]
+        assert metadata["filename"] == "rapport.pdf"
+        assert metadata["page"] == 1
+        assert metadata["type"] == "table"
+        assert metadata["extraction"] == "native"
+
+    def test_large_table_split_with_header(self):
+        """Un grand tableau est découpé, l'en-tête répété dans chaque chunk."""
+        rows = [["Nom", "Valeur"]] + [[f"ligne {i}", str(i)] for i in range(100)]
+        table = PdfTable(page_number=3, table_index=0, bbox=(0, 0, 100, 100), rows=rows)
+
+        chunks = generate_table_chunks([table], "doc.pdf", max_chars=300)
+
+        assert len(chunks) > 1
+        assert all(len(c["text"]) <= 300 + len("[TABLEAU - Page 3]\n") for c in chunks)
+        assert all("| Nom | Valeur |" in c["text"] for c in chunks)
+        body_rows = sum(c["text"].count("| ligne ") for c in chunks)
+        assert body_rows == 100
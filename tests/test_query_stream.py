@@ -0,0 +1,137 @@
+"""
+Tests unitaires pour la génération RAG en streaming (use case et adapters LLM).
+"""
+
+import pytest
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.application.use_cases.query_rag import QueryRAGUseCase, RAGError
+from src.domain.entities.query import SearchResult
+from src.domain.ports.llm_port import LLMError, LLMPort
+from src.infrastructure.adapters.aristote_llm_adapter import AristoteLLMAdapter
+
+
+class FakeLLM(LLMPort):
+    """LLM de test : réponse découpée en fragments, fermeture tracée."""
+
+    def __init__(self, deltas: List[str]):
+        self.deltas = deltas
+        self.closed = False
+
+    def generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1000) -> str:
+        return "".join(self.deltas)
+
+    def generate_with_history(self, messages, temperature=0.7, max_tokens=1000) -> str:
+        return "".join(self.deltas)
+
+    def generate_stream(self, prompt, system_prompt=None, temperature=0.7,
+                        max_tokens=1000, usage: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        try:
+            yield from self.deltas
+            if usage is not None:
+                usage.update(prompt_tokens=10, completion_tokens=len(self.deltas), total_tokens=13)
+        finally:
+            self.closed = True
+
+    def get_model_name(self) -> str:
+        return "fake-model"
+
+
+@pytest.fixture
+def sources() -> List[SearchResult]:
+    return [SearchResult(chunk_id="c1", text="Extrait", score=0.9, metadata={"filename": "doc.pdf"})]
+
+
+def _use_case(llm: LLMPort, sources: List[SearchResult]) -> QueryRAGUseCase:
+    embedding_port = MagicMock()
+    embedding_port.embed_text.return_value = [0.1, 0.2]
+    vector_store_port = MagicMock()
+    vector_store_port.search_similar.return_value = sources
+    return QueryRAGUseCase(embedding_port, vector_store_port, llm)
+
+
+class TestExecuteStream:
+    """Tests pour QueryRAGUseCase.execute_stream."""
+
+    def test_event_order(self, sources):
+        """Sources, puis fragments, puis événement final avec usage et durées."""
+        llm = FakeLLM(["Bon", "jour", " !"])
+        events = list(_use_case(llm, sources).execute_stream("Question ?"))
+
+        assert [e.type for e in events] == ["sources", "token", "token", "token", "done"]
+        assert events[0].data == sources
+        assert "".join(e.data for e in events if e.type == "token") == "Bonjour !"
+
+        done = events[-1].data
+        assert done["model_name"] == "fake-model"
+        assert done["usage"]["completion_tokens"] == 3
+        assert set(done["timings"]) == {"retrieval_ms", "first_token_ms", "total_ms"}
+
+    def test_close_interrupts_generation(self, sources):
+        """Fermer le flux ferme la génération LLM en cours."""
+        llm = FakeLLM(["a", "b", "c"])
+        events = _use_case(llm, sources).execute_stream("Question ?")
+
+        assert next(events).type == "sources"
+        assert next(events).data == "a"
+        events.close()
+
+        assert llm.closed is True
+
+    def test_llm_error(self, sources):
+        """Une erreur LLM devient une RAGError, après l'émission des sources."""
+        llm = MagicMock(spec=LLMPort)
+        llm.generate_stream.side_effect = LLMError("quota")
+        events = _use_case(llm, sources).execute_stream("Question ?")
+
+        assert next(events).type == "sources"
+        with pytest.raises(RAGError):
+            next(events)
+
+    def test_default_generate_stream(self):
+        """Sans streaming natif, la réponse complète est émise en un fragment."""
+
+        class BlockingLLM(FakeLLM):
+            generate_stream = LLMPort.generate_stream
+
+        assert list(BlockingLLM(["x", "y"]).generate_stream("Q")) == ["xy"]
+
+
+class TestAdapterStream:
+    """Tests pour AristoteLLMAdapter.generate_stream."""
+
+    @patch('src.infrastructure.adapters.aristote_llm_adapter.OpenAI')
+    def test_stream_deltas_and_usage(self, mock_openai_class):
+        chunk1 = MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content="Hel"))])
+        chunk2 = MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content="lo"))])
+        final = MagicMock(choices=[], usage=MagicMock(prompt_tokens=5, completion_tokens=2, total_tokens=7))
+        stream = MagicMock()
+        stream.__iter__.return_value = iter([chunk1, chunk2, final])
+        mock_openai_class.return_value.chat.completions.create.return_value = stream
+
+        adapter = AristoteLLMAdapter(api_key="test-key")
+        usage = {}
+        assert list(adapter.generate_stream("Hi", usage=usage)) == ["Hel", "lo"]
+        assert usage == {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+        stream.close.assert_called_once()
+
+        call_kwargs = mock_openai_class.return_value.chat.completions.create.call_args.kwargs
+        assert call_kwargs["stream"] is True
+
+    @patch('src.infrastructure.adapters.aristote_llm_adapter.OpenAI')
+    def test_early_close_closes_connection(self, mock_openai_class):
+        chunks = [MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content=str(i)))]) for i in range(5)]
+        stream = MagicMock()
+        stream.__iter__.return_value = iter(chunks)
+        mock_openai_class.return_value.chat.completions.create.return_value = stream
+
+        deltas = AristoteLLMAdapter(api_key="test-key").generate_stream("Hi")
+        assert next(deltas) == "0"
+        deltas.close()
+
+        stream.close.assert_called_once()
@@ -0,0 +1,176 @@
+"""
+Tests unitaires pour les seaux à jetons et le middleware de limitation de l'API.
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers import token_bucket
+from providers.token_bucket import MemoryTokenBucket, SQLiteTokenBucket, create_token_bucket
+from src.api.rate_limit import RateLimitMiddleware, client_key
+
+
+class FakeClock:
+    """Horloge contrôlée par le test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch.object(token_bucket.time, "monotonic", fake), patch.object(token_bucket.time, "time", fake):
+        yield fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def bucket(request, tmp_path, clock):
+    """Seau de 5 jetons rechargé à 1 jeton par seconde, pour chaque backend."""
+    bucket = create_token_bucket(request.param, capacity=5, refill_rate=1.0, path=str(tmp_path / "tb.sqlite3"))
+    yield bucket
+    if hasattr(bucket, "close"):
+        bucket.close()
+
+
+class TestTokenBucket:
+    """Tests communs aux deux backends."""
+
+    def test_burst_then_reject(self, bucket):
+        for _ in range(5):
+            assert bucket.take("client").allowed
+
+        decision = bucket.take("client")
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(1.0)
+        assert decision.retry_after_seconds == 1
+
+    def test_refill(self, bucket, clock):
+        assert bucket.take("client", cost=5).allowed
+        assert not bucket.take("client").allowed
+
+        clock.now += 2.5
+        decision = bucket.take("client", cost=2)
+        assert decision.allowed
+        assert decision.remaining == pytest.approx(0.5)
+
+    def test_refill_capped_at_capacity(self, bucket, clock):
+        bucket.take("client")
+        clock.now += 3600
+        assert bucket.take("client", cost=5).allowed
+        assert not bucket.take("client").allowed
+
+    def test_cost_and_retry_after(self, bucket):
+        """Une demande refusée ne consomme pas de jetons."""
+        assert bucket.take("client", cost=2).allowed
+        decision = bucket.take("client", cost=4)
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(1.0)
+        assert bucket.take("client", cost=3).allowed
+
+    def test_cost_capped_at_capacity(self, bucket):
+        """Un coût supérieur à la capacité reste satisfiable (seau plein)."""
+        assert bucket.take("client", cost=8).allowed
+        assert not bucket.take("client").allowed
+
+    def test_keys_are_independent(self, bucket):
+        assert bucket.take("a", cost=5).allowed
+        assert not bucket.take("a").allowed
+        assert bucket.take("b").allowed
+
+
+class TestBackends:
+    """Tests spécifiques aux backends."""
+
+    def test_sqlite_shared_between_instances(self, tmp_path, clock):
+        """Deux instances (deux workers) sur le même fichier partagent les seaux."""
+        path = str(tmp_path / "tb.sqlite3")
+        worker1 = SQLiteTokenBucket(5, 1.0, path)
+        worker2 = SQLiteTokenBucket(5, 1.0, path)
+
+        assert worker1.take("client", cost=3).allowed
+        assert not worker2.take("client", cost=3).allowed
+        assert worker2.take("client", cost=2).allowed
+
+        worker1.close()
+        worker2.close()
+
+    def test_memory_evicts_least_recent(self, clock):
+        bucket = MemoryTokenBucket(5, 1.0, max_buckets=2)
+        bucket.take("a", cost=5)
+        bucket.take("b")
+        bucket.take("c")
+        # "a" retiré : repart plein
+        assert bucket.take("a", cost=5).allowed
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_token_bucket("redis", 5, 1.0)
+
+
+def _app(bucket) -> TestClient:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/query", ok, methods=["POST"]),
+        Route("/documents/upload", ok, methods=["POST"]),
+        Route("/health", ok),
+    ])
+    app.add_middleware(RateLimitMiddleware, bucket=bucket)
+    return TestClient(app)
+
+
+class TestMiddleware:
+    """Tests pour RateLimitMiddleware."""
+
+    def test_route_costs_and_retry_after(self, clock):
+        client = _app(MemoryTokenBucket(capacity=12, refill_rate=0.5))
+
+        response = client.post("/documents/upload")
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-remaining"] == "2"
+
+        assert client.post("/query").status_code == 200
+        response = client.post("/query")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "4"
+        assert response.json()["error_code"] == "RATE_LIMITED"
+
+    def test_free_routes(self, clock):
+        client = _app(MemoryTokenBucket(capacity=1, refill_rate=0.0))
+        client.post("/documents/upload")
+        assert client.get("/health").status_code == 200
+
+    def test_api_key_headers_do_not_bypass_limit(self, clock):
+        """Clés API non vérifiées : en changer ne donne pas un nouveau seau."""
+        client = _app(MemoryTokenBucket(capacity=10, refill_rate=0.0))
+        assert client.post("/documents/upload", headers={"X-API-Key": "k1"}).status_code == 200
+        assert client.post("/documents/upload", headers={"X-API-Key": "k2"}).status_code == 429
+        assert client.post("/documents/upload", headers={"Authorization": "Bearer k3"}).status_code == 429
+
+    def test_client_key(self):
+        scope = {"headers": [(b"x-forwarded-for", b"10.0.0.1, 172.29.0.5")], "client": ("172.18.0.2", 1234)}
+        assert client_key(scope) == "ip:172.18.0.2"
+        assert client_key(scope, trust_proxy=True) == "ip:172.29.0.5"
+        assert client_key({"headers": [(b"x-api-key", b"secret")], "client": ("1.2.3.4", 1)}) == "ip:1.2.3.4"
+
+    def test_retry_after_without_refill(self, clock):
+        """Seau sans recharge : délai annoncé borné."""
+        client = _app(MemoryTokenBucket(capacity=10, refill_rate=0.0))
+        client.post("/documents/upload")
+        response = client.post("/query")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "3600"
@@ -0,0 +1,112 @@
+"""
+Tests unitaires pour le registre de providers et les connexions HTTP partagées.
+"""
+
+import pytest
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.http_pool import get_http_client, get_http_session, host_key
+from providers.registry import ProviderRegistry, key_fingerprint
+from providers.embeddings.albert import AlbertEmbeddings
+from providers.rerank.albert_rerank import AlbertReranker
+
+
+class TestProviderRegistry:
+    """Tests pour ProviderRegistry."""
+
+    def test_same_configuration_reuses_instance(self):
+        registry = ProviderRegistry()
+        factory = MagicMock(side_effect=lambda: object())
+
+        first = registry.get("albert_llm", factory, model="m", api_key="k1")
+        second = registry.get("albert_llm", factory, model="m", api_key="k1")
+
+        assert first is second
+        assert factory.call_count == 1
+
+    def test_settings_change_builds_new_instance(self):
+        """Modèle, URL ou clé différents : nouvelle instance."""
+        registry = ProviderRegistry()
+        base = registry.get("albert_llm", object, model="m", api_key="k1")
+
+        assert registry.get("albert_llm", object, model="autre", api_key="k1") is not base
+        assert registry.get("albert_llm", object, model="m", api_key="k2") is not base
+        assert registry.get("albert_llm", object, model="m", base_url="http://x", api_key="k1") is not base
+        assert len(registry) == 4
+
+    def test_invalidate_by_key(self):
+        registry = ProviderRegistry()
+        registry.get("albert_llm", object, api_key="ancienne")
+        registry.get("albert_rerank", object, api_key="ancienne")
+        registry.get("albert_llm", object, api_key="nouvelle")
+
+        assert registry.invalidate(api_key="ancienne") == 2
+        assert len(registry) == 1
+        assert registry.invalidate() == 1
+
+    def test_lru_eviction(self):
+        registry = ProviderRegistry(max_entries=2)
+        first = registry.get("a", object)
+        registry.get("b", object)
+        registry.get("a", object)  # "a" devient la plus récente
+        registry.get("c", object)
+
+        assert registry.get("a", object) is first
+        assert registry.invalidate(provider="b") == 0
+
+    def test_concurrent_get_builds_once(self):
+        registry = ProviderRegistry()
+        factory = MagicMock(side_effect=lambda: object())
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get("p", factory, api_key="k")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert factory.call_count == 1
+        assert all(r is results[0] for r in results)
+
+    def test_key_fingerprint(self):
+        assert key_fingerprint(None) == ""
+        assert key_fingerprint("secret") == key_fingerprint("secret")
+        assert "secret" not in key_fingerprint("secret")
+        assert len(key_fingerprint("secret")) == 16
+
+
+class TestHttpPool:
+    """Tests pour les sessions et clients HTTP partagés par hôte."""
+
+    def test_host_key(self):
+        assert host_key("https://Albert.api.etalab.gouv.fr/v1/") == "https://albert.api.etalab.gouv.fr"
+
+    def test_session_shared_per_host(self):
+        session = get_http_session("https://pool.test/v1")
+
+        assert get_http_session("https://pool.test/v2") is session
+        assert get_http_session("https://autre.test/v1") is not session
+        assert get_http_client("https://pool.test/v1") is get_http_client("https://pool.test")
+
+    def test_providers_share_session(self):
+        """Embeddings et reranking Albert passent par la même session, quelle que soit la clé."""
+        embeddings = AlbertEmbeddings(api_key="k1", base_url="https://pool.test/v1")
+        reranker = AlbertReranker(api_key="k2", base_url="https://pool.test/v1")
+
+        assert embeddings._session is reranker._session is get_http_session("https://pool.test")
+
+    @patch('requests.Session.post')
+    def test_auth_header_per_request(self, mock_post):
+        mock_post.return_value = MagicMock(json=MagicMock(return_value={"data": [{"embedding": [0.5]}]}))
+        AlbertEmbeddings(api_key="k1", base_url="https://pool.test/v1").embed_query("texte")
+
+        headers = mock_post.call_args[1]["headers"]
+        assert headers["Authorization"] == "Bearer k1"
@@ -45,7 +45,7 @@ class TestAlbertReranker:
 
         assert reranker.model_name == "custom-rerank"
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_empty_documents(self, mock_post):
         """Test du reranking avec liste vide."""
         reranker = AlbertReranker(api_key="test-key")
@@ -54,7 +54,7 @@ class TestAlbertReranker:
         assert results == []
         mock_post.assert_not_called()
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_success(self, mock_post):
         """Test du reranking avec succès."""
         mock_response = MagicMock()
@@ -80,7 +80,7 @@ class TestAlbertReranker:
         assert results[1].score == 0.80
         assert results[2].score == 0.60
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_with_top_k(self, mock_post):
         """Test du reranking avec limite top_k."""
         mock_response = MagicMock()
@@ -100,7 +100,7 @@ class TestAlbertReranker:
 
         assert len(results) == 2
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_with_min_score(self, mock_post):
         """Test du reranking avec score minimum."""
         mock_response = MagicMock()
@@ -121,7 +121,7 @@ class TestAlbertReranker:
         assert len(results) == 2  # Seulement les docs avec score >= 0.5
         assert all(r.score >= 0.5 for r in results)
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_api_call_params(self, mock_post):
         """Test des paramètres de l'appel API."""
         mock_response = MagicMock()
@@ -152,7 +152,7 @@ class TestAlbertReranker:
         assert json_data["query"] == "my query"
         assert json_data["documents"] == ["doc1", "doc2"]
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_with_metadata(self, mock_post):
         """Test du reranking avec métadonnées."""
         mock_response = MagicMock()
@@ -180,7 +180,7 @@ class TestAlbertReranker:
         assert results[1][0].text == "doc1 content"
         assert results[1][1]["source"] == "file1.pdf"
 
-    @patch('providers.rerank.albert_rerank.requests.post')
+    @patch('requests.Session.post')
     def test_rerank_with_metadata_empty(self, mock_post):
         """Test du reranking avec métadonnées sur liste vide."""
         reranker = AlbertReranker(api_key="test-key")
@@ -235,5 +235,70 @@ class TestAlbertVision:
         assert "Décris cette image" in prompt_text
 
 
+class TestAlbertVisionBatch:
+    """Tests pour l'analyse multi-images en une requête."""
+
+    @staticmethod
+    def _client_returning(mock_openai_class, content):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content=content))]
+        )
+        mock_openai_class.return_value = mock_client
+        return mock_client
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_single_request_for_batch(self, mock_openai_class):
+        """Plusieurs images partent dans un seul message et chaque description est rendue."""
+        mock_client = self._client_returning(
+            mock_openai_class,
+            '```json\n{"images": [{"index": 2, "description": "Deux"}, {"index": 1, "description": "Un"}]}\n```',
+        )
+        vision = AlbertVision(api_key="test-key")
+
+        descriptions = vision.analyze_images([b"img1", b"img2"], prompt="Décris", max_tokens_per_image=100)
+
+        assert descriptions == ["Un", "Deux"]
+        mock_client.chat.completions.create.assert_called_once()
+        kwargs = mock_client.chat.completions.create.call_args[1]
+        content = kwargs["messages"][0]["content"]
+        assert sum(1 for part in content if part["type"] == "image_url") == 2
+        assert kwargs["max_tokens"] == 200
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_incomplete_response_raises(self, mock_openai_class):
+        """Une réponse sans description pour chaque image lève ValueError."""
+        self._client_returning(mock_openai_class, '{"images": [{"index": 1, "description": "Un"}]}')
+        vision = AlbertVision(api_key="test-key")
+
+        with pytest.raises(ValueError, match="manquantes"):
+            vision.analyze_images([b"img1", b"img2"])
+
+    def test_parse_batch_response_invalid(self):
+        """Un texte libre n'est pas accepté comme réponse structurée."""
+        with pytest.raises(ValueError):
+            AlbertVision.parse_batch_response("Voici les descriptions : ...", 2)
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_cached_images_not_resent(self, mock_openai_class, tmp_path):
+        """Les images déjà en cache ne sont pas renvoyées au modèle."""
+        from providers.vision.vision_cache import VisionCache
+        cache = VisionCache(str(tmp_path / "cache.sqlite3"))
+        cache.set(VisionCache.make_key(b"img1", "Décris", AlbertVision.DEFAULT_MODEL),
+                  AlbertVision.DEFAULT_MODEL, "Un (cache)")
+        mock_client = self._client_returning(
+            mock_openai_class,
+            '{"images": [{"index": 1, "description": "Deux"}, {"index": 2, "description": "Trois"}]}',
+        )
+        vision = AlbertVision(api_key="test-key", cache=cache)
+
+        descriptions = vision.analyze_images([b"img1", b"img2", b"img3"], prompt="Décris")
+
+        assert descriptions == ["Un (cache)", "Deux", "Trois"]
+        content = mock_client.chat.completions.create.call_args[1]["messages"][0]["content"]
+        assert sum(1 for part in content if part["type"] == "image_url") == 2
+        cache.close()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+Tests unitaires pour le cache persistant des analyses vision.
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.vision.vision_cache import VisionCache, get_vision_cache
+from providers.vision.albert_vision import AlbertVision
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache vision dans un dossier temporaire."""
+    vision_cache = VisionCache(str(tmp_path / "cache.sqlite3"))
+    yield vision_cache
+    vision_cache.close()
+
+
+class TestVisionCache:
+    """Tests pour VisionCache."""
+
+    def test_key_depends_on_image_prompt_and_model(self):
+        """La clé change si l'image, le prompt ou le modèle change."""
+        base = VisionCache.make_key(b"image", "prompt", "model")
+
+        assert base == VisionCache.make_key(b"image", "prompt", "model")
+        assert base != VisionCache.make_key(b"other", "prompt", "model")
+        assert base != VisionCache.make_key(b"image", "other", "model")
+        assert base != VisionCache.make_key(b"image", "prompt", "other")
+
+    def test_get_set_and_metrics(self, cache):
+        """Un miss puis un hit sont comptabilisés."""
+        key = VisionCache.make_key(b"image", "prompt", "model")
+
+        assert cache.get(key) is None
+        cache.set(key, "model", "Un graphique en barres")
+
+        assert cache.get(key) == "Un graphique en barres"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["writes"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """Les entrées survivent à la réouverture du cache."""
+        path = str(tmp_path / "cache.sqlite3")
+        key = VisionCache.make_key(b"image", "prompt", "model")
+
+        first = VisionCache(path)
+        first.set(key, "model", "description")
+        first.close()
+
+        second = VisionCache(path)
+        assert second.get(key) == "description"
+        second.close()
+
+    def test_lru_eviction(self, tmp_path):
+        """Au-delà de la taille maximale, les entrées les moins récemment lues sont évincées."""
+        cache = VisionCache(str(tmp_path / "cache.sqlite3"), max_size_mb=250 / (1024 * 1024))
+        cache.set("a", "model", "x" * 100)
+        cache.set("b", "model", "x" * 100)
+        cache.get("a")  # "b" devient la moins récemment utilisée
+
+        cache.set("c", "model", "x" * 100)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+        cache.close()
+
+    def test_get_vision_cache_shared(self, tmp_path):
+        """Un même chemin retourne toujours le même cache."""
+        path = str(tmp_path / "shared.sqlite3")
+
+        assert get_vision_cache(path) is get_vision_cache(path)
+
+
+class TestAlbertVisionCache:
+    """Tests pour l'utilisation du cache par AlbertVision."""
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_second_call_served_from_cache(self, mock_openai_class, cache):
+        """La même image avec le même prompt n'appelle l'API qu'une fois."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="| A | B |"))]
+        )
+        mock_openai_class.return_value = mock_client
+        vision = AlbertVision(api_key="test-key", cache=cache)
+
+        first = vision.analyze_table(b"image bytes")
+        second = vision.analyze_table(b"image bytes")
+
+        assert first == second == "| A | B |"
+        assert mock_client.chat.completions.create.call_count == 1
+
+    @patch('providers.vision.albert_vision.OpenAI')
+    def test_different_prompt_not_shared(self, mock_openai_class, cache):
+        """Un autre type d'analyse sur la même image relance l'API."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="réponse"))]
+        )
+        mock_openai_class.return_value = mock_client
+        vision = AlbertVision(api_key="test-key", cache=cache)
+
+        vision.analyze_table(b"image bytes")
+        vision.analyze_chart(b"image bytes")
+
+        assert mock_client.chat.completions.create.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])